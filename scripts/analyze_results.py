@@ -1,95 +1,134 @@
 #!/usr/bin/env python3
-"""Analyze allocation results."""
+"""Analyze allocation results.
 
-import json
-import pandas as pd
+Results are streamed in one pass with bounded memory, so files larger than
+RAM can be analyzed. Several files (or a directory of them) are summarized
+in parallel; with --combine they are reported as one run.
+"""
+
+import argparse
 from pathlib import Path
-from collections import Counter, defaultdict
 import sys
 
 sys.path.append(str(Path(__file__).parent.parent))
 
+from src.utils.results_summary import ResultsSummary, LEAD_TIME_BINS, LEAD_TIME_OVERFLOW, summarize_files
 
-def analyze_allocation_results(results_file):
-    """Analyze and summarize allocation results."""
-    with open(results_file, 'r') as f:
-        results = json.load(f)
-    
-    if not results:
-        print("No results to analyze")
+RESULT_SUFFIXES = (".json", ".jsonl", ".ndjson", ".csv", ".parquet", ".arrow", ".feather", ".db", ".sqlite")
+
+
+def print_report(summary: ResultsSummary, name: str):
+    """Print the analysis report for a summary."""
+    if not summary.count:
+        print(f"No results to analyze in {name}")
         return
     
-    # Convert to DataFrame for easier analysis
-    df = pd.DataFrame(results)
-    
     print(f"\n{'='*60}")
-    print(f"ALLOCATION RESULTS ANALYSIS: {results_file}")
+    print(f"ALLOCATION RESULTS ANALYSIS: {name}")
     print(f"{'='*60}")
     
     # Basic statistics
     print(f"\nBasic Statistics:")
-    print(f"  Total SKUs allocated: {len(df)}")
-    print(f"  Total cost: ${df['total_cost'].sum():,.2f}")
-    print(f"  Average cost per SKU: ${df['total_cost'].mean():,.2f}")
-    print(f"  Average lead time: {df['total_lead_time'].mean():.1f} days")
-    print(f"  Average CM3 score: {df['cm3_score'].mean():.3f}")
+    print(f"  Total SKUs allocated: {summary.count}")
+    print(f"  Total cost: ${summary.total_cost:,.2f}")
+    print(f"  Average cost per SKU: ${summary.total_cost / summary.count:,.2f}")
+    print(f"  Average lead time: {summary.total_lead_time / summary.count:.1f} days")
+    print(f"  Average CM3 score: {summary.cm3_sum / summary.count:.3f}")
     
     # Path analysis
     print(f"\nPath Analysis:")
-    path_counts = Counter([' -> '.join(path) for path in df['selected_path']])
-    print(f"  Unique paths used: {len(path_counts)}")
+    print(f"  Unique paths used: {len(summary.paths)}")
     print(f"\n  Top 5 most used paths:")
-    for path, count in path_counts.most_common(5):
-        print(f"    {path}: {count} SKUs")
+    for path, count in summary.paths.most_common(5):
+        print(f"    {' -> '.join(path)}: {count} SKUs")
     
     # Destination analysis
     print(f"\nDestination Analysis:")
-    destinations = Counter([path[-1] for path in df['selected_path']])
-    for dest, count in destinations.most_common():
+    for dest, count in summary.destinations.most_common():
         print(f"  {dest}: {count} SKUs")
     
     # Cost breakdown by path length
     print(f"\nCost by Path Length:")
-    df['path_length'] = df['selected_path'].apply(len)
-    cost_by_length = df.groupby('path_length')['total_cost'].agg(['mean', 'sum', 'count'])
-    for length, row in cost_by_length.iterrows():
-        print(f"  {length} nodes: ${row['mean']:,.2f} avg, ${row['sum']:,.2f} total ({int(row['count'])} SKUs)")
+    for length, (cost, count) in sorted(summary.cost_by_length.items()):
+        print(f"  {length} nodes: ${cost / count:,.2f} avg, ${cost:,.2f} total ({count} SKUs)")
     
     # Lead time distribution
     print(f"\nLead Time Distribution:")
-    lt_bins = [0, 10, 20, 30, 40, 50, 100]
-    lt_labels = ['0-10', '11-20', '21-30', '31-40', '41-50', '50+']
-    df['lt_bin'] = pd.cut(df['total_lead_time'], bins=lt_bins, labels=lt_labels)
-    lt_dist = df['lt_bin'].value_counts().sort_index()
-    for bin_name, count in lt_dist.items():
-        print(f"  {bin_name} days: {count} SKUs ({count/len(df)*100:.1f}%)")
+    for bin_name in [label for _, label in LEAD_TIME_BINS] + [LEAD_TIME_OVERFLOW]:
+        count = summary.lead_times[bin_name]
+        print(f"  {bin_name} days: {count} SKUs ({count/summary.count*100:.1f}%)")
     
     # Performance metrics
     print(f"\nPerformance Metrics:")
-    high_cm3 = df[df['cm3_score'] > df['cm3_score'].quantile(0.75)]
-    print(f"  High CM3 score SKUs (top 25%): {len(high_cm3)}")
-    print(f"  Average cost for high CM3: ${high_cm3['total_cost'].mean():,.2f}")
-    
-    # Export summary
-    summary_file = Path(results_file).with_suffix('.summary.txt')
+    threshold, high_count, high_cost = summary.high_cm3(0.75)
+    print(f"  CM3 score 75th percentile (estimated): {threshold:.4g}")
+    print(f"  High CM3 score SKUs (top 25%): {high_count}")
+    if high_count:
+        print(f"  Average cost for high CM3: ${high_cost / high_count:,.2f}")
+
+
+def write_summary(summary: ResultsSummary, summary_file: Path, name: str):
+    """Write the short text summary."""
     with open(summary_file, 'w') as f:
-        f.write(f"Allocation Summary for {results_file}\n")
+        f.write(f"Allocation Summary for {name}\n")
         f.write(f"{'='*50}\n")
-        f.write(f"Total SKUs: {len(df)}\n")
-        f.write(f"Total Cost: ${df['total_cost'].sum():,.2f}\n")
-        f.write(f"Average Lead Time: {df['total_lead_time'].mean():.1f} days\n")
-        f.write(f"Unique Paths: {len(path_counts)}\n")
+        f.write(f"Total SKUs: {summary.count}\n")
+        f.write(f"Total Cost: ${summary.total_cost:,.2f}\n")
+        f.write(f"Average Lead Time: {summary.total_lead_time / max(summary.count, 1):.1f} days\n")
+        f.write(f"Unique Paths: {len(summary.paths)}\n")
     
     print(f"\nSummary saved to {summary_file}")
 
 
-if __name__ == "__main__":
-    import sys
+def collect_files(targets):
+    """Expand directories into the result files they contain."""
+    files = []
+    for target in targets:
+        target = Path(target)
+        if target.is_dir():
+            files.extend(
+                path for path in sorted(target.iterdir())
+                if path.suffix in RESULT_SUFFIXES and "summary" not in path.name
+            )
+        else:
+            files.append(target)
+    return files
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Analyze allocation results")
+    parser.add_argument('paths', nargs='*', default=['results'],
+                        help='Results files or directories (JSON, JSONL, CSV, Parquet, Arrow or SQLite)')
+    parser.add_argument('--combine', action='store_true',
+                        help='Report all files as one run instead of one report per file')
+    parser.add_argument('--workers', type=int, default=None,
+                        help='Processes for summarizing files in parallel (default: CPU count)')
+    parser.add_argument('--alpha', type=float, default=0.01,
+                        help='Relative accuracy of the CM3 quantile sketch')
+    args = parser.parse_args()
+    
+    files = collect_files(args.paths)
+    if not files:
+        print("No results files found")
+        return
     
-    if len(sys.argv) > 1:
-        analyze_allocation_results(sys.argv[1])
-    else:
-        # Analyze all result files
-        for results_file in Path("results").glob("*.json"):
-            if "summary" not in str(results_file):
-                analyze_allocation_results(results_file)
+    summaries = summarize_files(files, workers=args.workers, alpha=args.alpha)
+    
+    if args.combine:
+        combined = ResultsSummary(args.alpha)
+        for summary in summaries:
+            combined.merge(summary)
+        name = f"{len(files)} files"
+        print_report(combined, name)
+        if combined.count:
+            write_summary(combined, Path(files[0]).parent / "combined.summary.txt", name)
+        return
+    
+    for path, summary in zip(files, summaries):
+        print_report(summary, str(path))
+        if summary.count:
+            write_summary(summary, Path(path).with_suffix('.summary.txt'), str(path))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,112 +1,261 @@
 #!/usr/bin/env python3
-"""Run batch allocation tests with different configurations."""
+"""Benchmark the allocation engine in-process.
 
-import subprocess
-import time
-from pathlib import Path
+Micro-benchmarks time the path finder, path evaluation, the memoization
+layer, the CSV loaders and result serialization. Macro-benchmarks run
+load, build, allocate and write end to end over the dummy datasets and
+over synthetic networks at increasing scale. Results can be saved as a
+baseline and later runs compared against it to flag regressions.
+"""
+
+import argparse
 import json
+import sys
+import tempfile
+from pathlib import Path
+from types import SimpleNamespace
 
+sys.path.append(str(Path(__file__).parent.parent))
+sys.path.append(str(Path(__file__).parent))
 
-def run_allocation(products, nodes, edges, output):
-    """Run allocation and measure time."""
-    start_time = time.time()
+from src.utils import load_products, load_nodes, load_edges, validate_network_integrity, write_results, memoize
+from src.utils.benchmarking import (
+    BenchmarkSuite, save_baseline, load_baseline, compare_results, format_results, format_comparison
+)
+from src.graph import NetworkBuilder, PathFinder
+from src.evaluators import create_evaluator, load_evaluator_config
+from src.allocation import Allocator
+from generate_test_data import generate_dataset
+
+
+BENCHMARK_DATASETS = [
+    {
+        "name": "Simple Network - Small Products",
+        "products": "data/dummy/products_small.csv",
+        "nodes": "data/dummy/nodes_simple.csv",
+        "edges": "data/dummy/node-node_simple.csv",
+        "output": "results/batch_simple_small.json"
+    },
+    {
+        "name": "Simple Network - Medium Products",
+        "products": "data/dummy/products_medium.csv",
+        "nodes": "data/dummy/nodes_simple.csv",
+        "edges": "data/dummy/node-node_simple.csv",
+        "output": "results/batch_simple_medium.json"
+    },
+    {
+        "name": "Complex Network - Small Products",
+        "products": "data/dummy/products_small.csv",
+        "nodes": "data/dummy/nodes_complex.csv",
+        "edges": "data/dummy/node-node_complex.csv",
+        "output": "results/batch_complex_small.json"
+    },
+    {
+        "name": "Complex Network - Medium Products",
+        "products": "data/dummy/products_medium.csv",
+        "nodes": "data/dummy/nodes_complex.csv",
+        "edges": "data/dummy/node-node_complex.csv",
+        "output": "results/batch_complex_medium.json"
+    },
+    {
+        "name": "Complex Network - Large Products",
+        "products": "data/dummy/products_large.csv",
+        "nodes": "data/dummy/nodes_complex.csv",
+        "edges": "data/dummy/node-node_complex.csv",
+        "output": "results/batch_complex_large.json"
+    }
+]
+
+CONFIG_PATH = "config/evaluators.json"
+
+# Stage widths (source ports, destination ports, warehouses, FCs) and
+# fan-out of the synthetic network at scale 1, modelled on nodes_complex.csv
+SYNTHETIC_WIDTHS = (3, 5, 9, 4)
+SYNTHETIC_FAN_OUT = (0, 3, 2)
+
+
+def write_synthetic_dataset(directory, scale, n_products, seed=0):
+    """Generate a synthetic network widened by ``scale`` and a catalog; returns a dataset dict."""
+    paths = generate_dataset(directory, f"x{scale}", n_products, seed,
+                             widths=[width * scale for width in SYNTHETIC_WIDTHS], fan_out=SYNTHETIC_FAN_OUT)
+    return {
+        "name": f"Synthetic Network x{scale}",
+        "products": str(paths["products"]),
+        "nodes": str(paths["nodes"]),
+        "edges": str(paths["node-node"]),
+        "output": str(Path(directory) / f"results_x{scale}.json")
+    }
+
+
+def run_end_to_end(dataset, config):
+    """Load, validate, build, allocate and write one dataset in-process."""
+    products = load_products(Path(dataset["products"]))
+    nodes = load_nodes(Path(dataset["nodes"]))
+    edges = load_edges(Path(dataset["edges"]))
+    validate_network_integrity(nodes, edges)
+    
+    builder = NetworkBuilder()
+    builder.build(nodes, edges)
+    
+    evaluator = create_evaluator(config)
+    # The evaluator cache is process-wide: start every run cold
+    evaluator.evaluate.clear_cache()
+    results = Allocator(builder, evaluator).allocate_products(products)
+    write_results(results, Path(dataset["output"]))
+    return results
+
+
+def build_suite(workdir, scales, n_products):
+    """Register micro- and macro-benchmarks; inputs and allocation outputs are written under ``workdir``."""
+    suite = BenchmarkSuite()
+    config = load_evaluator_config(Path(CONFIG_PATH))
+    datasets = [dict(dataset, output=str(Path(workdir) / Path(dataset["output"]).name))
+                for dataset in BENCHMARK_DATASETS]
+    complex_data = datasets[-1]
     
-    cmd = [
-        "python", "-m", "src.main",
-        "--products", products,
-        "--nodes", nodes,
-        "--edges", edges,
-        "--output", output
-    ]
+    synthetic = {scale: write_synthetic_dataset(workdir, scale, n_products) for scale in scales}
+    largest = synthetic[max(scales)]
     
-    result = subprocess.run(cmd, capture_output=True, text=True)
-    elapsed = time.time() - start_time
+    # Micro: path enumeration
+    def network_setup(dataset):
+        def setup():
+            builder = NetworkBuilder()
+            builder.build(load_nodes(Path(dataset["nodes"])), load_edges(Path(dataset["edges"])))
+            return builder
+        return setup
     
-    return {
-        "success": result.returncode == 0,
-        "elapsed_time": elapsed,
-        "stdout": result.stdout,
-        "stderr": result.stderr
-    }
+    def find_paths(builder):
+        return PathFinder(builder.graph).find_all_paths("Supplier", builder.get_destinations())
+    
+    for label, dataset in (("complex", complex_data), (f"synthetic_x{max(scales)}", largest)):
+        suite.add(f"path_finder.find_all_paths[{label}]", find_paths, setup=network_setup(dataset), number=50)
+    
+    # Micro: evaluating every path of one chunk, cold and warm cache
+    def evaluation_setup():
+        builder = network_setup(complex_data)()
+        allocator = Allocator(builder, create_evaluator(config))
+        chunk = allocator._create_chunks(load_products(Path(complex_data["products"]))[:1])[0]
+        paths = allocator.path_finder.find_all_paths(chunk.origin, builder.get_destinations())
+        return allocator, chunk, paths
+    
+    def evaluate_cold(state):
+        allocator, chunk, paths = state
+        allocator.evaluator.evaluate.clear_cache()
+        for path in paths:
+            allocator.path_evaluator.evaluate_path(chunk, path)
+    
+    def evaluate_warm(state):
+        allocator, chunk, paths = state
+        for path in paths:
+            allocator.path_evaluator.evaluate_path(chunk, path)
+    
+    suite.add("path_evaluator.evaluate_path[cold]", evaluate_cold, setup=evaluation_setup, number=5)
+    suite.add("path_evaluator.evaluate_path[warm]", evaluate_warm, setup=evaluation_setup, number=5)
+    
+    # Micro: memoize overhead on hits and misses, 10,000 calls each
+    def memoize_setup():
+        contexts = [SimpleNamespace(cache_key=f"bench:{i}", method="bench") for i in range(10000)]
+        return memoize(lambda context: 1.0), contexts
+    
+    def memoize_misses(state):
+        cached, contexts = state
+        cached.clear_cache()
+        for context in contexts:
+            cached(context)
+    
+    def memoize_hits(state):
+        cached, contexts = state
+        for context in contexts:
+            cached(context)
+    
+    suite.add("memoize[miss x10000]", memoize_misses, setup=memoize_setup)
+    suite.add("memoize[hit x10000]", memoize_hits, setup=memoize_setup)
+    
+    # Micro: CSV loaders
+    suite.add(f"load_products[{n_products}]", lambda: load_products(Path(largest["products"])))
+    suite.add(f"load_nodes+edges[synthetic_x{max(scales)}]",
+              lambda: (load_nodes(Path(largest["nodes"])), load_edges(Path(largest["edges"]))))
+    
+    # Micro: serializing 10,000 results in each format
+    def serialization_setup():
+        results = run_end_to_end(complex_data, config)
+        return (results * (10000 // len(results) + 1))[:10000]
+    
+    formats = ["json", "jsonl", "csv"]
+    try:
+        import pyarrow  # noqa: F401
+        formats.append("parquet")
+    except ImportError:
+        pass
+    for fmt in formats:
+        suite.add(
+            f"write_results[{fmt} x10000]",
+            lambda results, fmt=fmt: write_results(results, Path(workdir) / f"serialized.{fmt}", fmt),
+            setup=serialization_setup
+        )
+    
+    # Macro: end-to-end runs over the dummy datasets and synthetic scales
+    for dataset in datasets:
+        suite.add(f"end_to_end[{dataset['name']}]", lambda dataset=dataset: run_end_to_end(dataset, config),
+                  group="macro")
+    for scale, dataset in synthetic.items():
+        suite.add(f"end_to_end[synthetic x{scale}, {n_products} SKUs]",
+                  lambda dataset=dataset: run_end_to_end(dataset, config), group="macro")
+    
+    return suite
 
 
 def main():
-    """Run batch tests."""
-    tests = [
-        {
-            "name": "Simple Network - Small Products",
-            "products": "data/dummy/products_small.csv",
-            "nodes": "data/dummy/nodes_simple.csv",
-            "edges": "data/dummy/node-node_simple.csv",
-            "output": "results/batch_simple_small.json"
-        },
-        {
-            "name": "Simple Network - Medium Products",
-            "products": "data/dummy/products_medium.csv",
-            "nodes": "data/dummy/nodes_simple.csv",
-            "edges": "data/dummy/node-node_simple.csv",
-            "output": "results/batch_simple_medium.json"
-        },
-        {
-            "name": "Complex Network - Small Products",
-            "products": "data/dummy/products_small.csv",
-            "nodes": "data/dummy/nodes_complex.csv",
-            "edges": "data/dummy/node-node_complex.csv",
-            "output": "results/batch_complex_small.json"
-        },
-        {
-            "name": "Complex Network - Medium Products",
-            "products": "data/dummy/products_medium.csv",
-            "nodes": "data/dummy/nodes_complex.csv",
-            "edges": "data/dummy/node-node_complex.csv",
-            "output": "results/batch_complex_medium.json"
-        },
-        {
-            "name": "Complex Network - Large Products",
-            "products": "data/dummy/products_large.csv",
-            "nodes": "data/dummy/nodes_complex.csv",
-            "edges": "data/dummy/node-node_complex.csv",
-            "output": "results/batch_complex_large.json"
-        }
-    ]
-    
-    print("Starting batch allocation tests...\n")
-    
-    results = []
-    for test in tests:
-        print(f"Running: {test['name']}...")
-        result = run_allocation(
-            test["products"],
-            test["nodes"],
-            test["edges"],
-            test["output"]
-        )
-        
-        if result["success"]:
-            print(f"  ✓ Completed in {result['elapsed_time']:.2f} seconds")
-        else:
-            print(f"  ✗ Failed: {result['stderr']}")
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--filter", default=None,
+                        help="Glob matched against benchmark names or groups (micro, macro)")
+    parser.add_argument("--repeat", type=int, default=5, help="Timed runs per benchmark")
+    parser.add_argument("--warmup", type=int, default=1, help="Untimed runs before timing")
+    parser.add_argument("--no-memory", action="store_true", help="Skip the tracemalloc peak-memory run")
+    parser.add_argument("--scales", default="1,2", help="Comma-separated synthetic network scales")
+    parser.add_argument("--products", type=int, default=100, help="SKUs in the synthetic catalogs")
+    parser.add_argument("--output", default="results/batch_test_results.json", help="Where to write the results")
+    parser.add_argument("--save-baseline", default=None, help="Also save the results as a baseline here")
+    parser.add_argument("--compare", default=None, help="Baseline to compare against")
+    parser.add_argument("--threshold", type=float, default=0.10,
+                        help="Relative slowdown of the best time flagged as a regression")
+    parser.add_argument("--memory-threshold", type=float, default=0.20,
+                        help="Relative growth of peak memory flagged as a regression")
+    args = parser.parse_args()
+    
+    scales = [int(scale) for scale in args.scales.split(",")]
+    Path(args.output).parent.mkdir(parents=True, exist_ok=True)
+    
+    with tempfile.TemporaryDirectory() as workdir:
+        suite = build_suite(workdir, scales, args.products)
+        selected = suite.select(args.filter)
+        print(f"Running {len(selected)} benchmarks ({args.warmup} warm-up, {args.repeat} timed runs each)...\n")
         
-        results.append({
-            "test": test["name"],
-            "success": result["success"],
-            "elapsed_time": result["elapsed_time"]
-        })
+        results = suite.run(
+            args.filter, repeat=args.repeat, warmup=args.warmup, memory=not args.no_memory,
+            progress=lambda result: print(f"  {result.name}: {result.best * 1000:.3f}ms best")
+        )
+    
+    print(f"\nBenchmark Results:\n{format_results(results)}")
     
-    # Save batch results
-    with open("results/batch_test_results.json", "w") as f:
-        json.dump(results, f, indent=2)
+    with open(args.output, "w") as f:
+        json.dump([result.to_dict() for result in results], f, indent=2)
+    print(f"\nResults saved to {args.output}")
     
-    print("\nBatch Test Summary:")
-    print("="*50)
-    for r in results:
-        status = "✓" if r["success"] else "✗"
-        print(f"{status} {r['test']}: {r['elapsed_time']:.2f}s")
+    if args.save_baseline:
+        save_baseline(results, Path(args.save_baseline))
+        print(f"Baseline saved to {args.save_baseline}")
     
-    total_time = sum(r["elapsed_time"] for r in results)
-    success_count = sum(1 for r in results if r["success"])
-    print(f"\nTotal: {success_count}/{len(results)} successful, {total_time:.2f}s total time")
+    if args.compare:
+        comparisons = compare_results(results, load_baseline(Path(args.compare)),
+                                      args.threshold, args.memory_threshold)
+        print(f"\nCompared to {args.compare}:\n{format_comparison(comparisons)}")
+        regressions = [comparison for comparison in comparisons if comparison.regressed]
+        if regressions:
+            print(f"\n{len(regressions)} regression(s) beyond {args.threshold:.0%} time "
+                  f"or {args.memory_threshold:.0%} memory")
+            sys.exit(1)
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
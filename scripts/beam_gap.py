@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""Report the optimality gap of beam search against exact allocation."""
+
+import argparse
+import time
+from pathlib import Path
+import sys
+
+sys.path.append(str(Path(__file__).parent.parent))
+sys.path.append(str(Path(__file__).parent))
+
+from src.utils import load_products, load_nodes, load_edges
+from src.graph import NetworkBuilder
+from src.evaluators import create_evaluator, load_evaluator_config
+from src.allocation import Allocator, BeamSearchAllocator
+from batch_test import BENCHMARK_DATASETS
+
+
+def run(allocator, products):
+    """Allocate products and return (results by razin, elapsed seconds)."""
+    start_time = time.perf_counter()
+    results = allocator.allocate_products(products)
+    elapsed = time.perf_counter() - start_time
+    return {r.razin: r for r in results}, elapsed
+
+
+def compare_dataset(dataset, beam_widths, config_path):
+    """Compare exact and beam allocation for one benchmark dataset."""
+    products = load_products(Path(dataset["products"]))
+    builder = NetworkBuilder()
+    builder.build(load_nodes(Path(dataset["nodes"])), load_edges(Path(dataset["edges"])))
+    evaluator = create_evaluator(load_evaluator_config(Path(config_path)))
+    
+    evaluator.evaluate.clear_cache()
+    exact, exact_time = run(Allocator(builder, evaluator), products)
+    exact_cost = sum(r.total_cost for r in exact.values())
+    
+    rows = []
+    for width in beam_widths:
+        evaluator.evaluate.clear_cache()
+        beam, beam_time = run(BeamSearchAllocator(builder, evaluator, beam_width=width), products)
+        beam_cost = sum(r.total_cost for r in beam.values())
+        
+        # Equal-cost ties may pick a different path, so only count costlier ones
+        worse = sum(
+            1 for razin, result in exact.items()
+            if razin in beam and beam[razin].total_cost > result.total_cost + 1e-9
+        )
+        
+        rows.append({
+            "beam_width": width,
+            "allocated": len(beam),
+            "missing": len(set(exact) - set(beam)),
+            "worse": worse,
+            "gap_pct": (beam_cost - exact_cost) / exact_cost * 100 if exact_cost else 0.0,
+            "speedup": exact_time / beam_time if beam_time > 0 else float('inf')
+        })
+    
+    return len(exact), exact_cost, exact_time, rows
+
+
+def main():
+    """Print the optimality gap table for every benchmark dataset."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--beam-widths", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--config", default="config/evaluators.json")
+    args = parser.parse_args()
+    
+    for dataset in BENCHMARK_DATASETS:
+        allocated, exact_cost, exact_time, rows = compare_dataset(dataset, args.beam_widths, args.config)
+        
+        print(f"\n{dataset['name']}")
+        print(f"  Exact: {allocated} SKUs, cost ${exact_cost:,.2f}, {exact_time:.3f}s")
+        print(f"  {'Width':>5} {'Gap':>8} {'Worse':>8} {'Missing':>8} {'Speedup':>8}")
+        for row in rows:
+            print(
+                f"  {row['beam_width']:>5} {row['gap_pct']:>7.2f}% {row['worse']:>8} "
+                f"{row['missing']:>8} {row['speedup']:>7.1f}x"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -1,52 +1,346 @@
 #!/usr/bin/env python3
-"""Generate test data for allocation engine."""
+"""Generate test data for allocation engine.
 
-import random
-import pandas as pd
+Products are generated with NumPy in fixed-size blocks and appended to the
+CSV block by block, so catalogs of tens of millions of rows never need to
+fit in memory. Networks are stage-layered (suppliers, source ports,
+destination ports, warehouses, FCs) with a configurable width per stage,
+fan-out between stages, clusters and evaluator method mix, and come with
+matching rate tables. Every output is determined by the seed alone; with
+pyarrow installed, CSVs are written faster but byte for byte the same.
+"""
+
+import argparse
 from pathlib import Path
 
+import numpy as np
+import pandas as pd
 
-def generate_products(n=100, output_file="products_generated.csv"):
-    """Generate random product data."""
-    categories = ["ELEC", "HOME", "TOYS", "SPRT", "BOOK", "FASH", "FOOD", "PETS", "AUTO", "GARD"]
-    
-    products = []
-    for i in range(n):
-        category = random.choice(categories)
-        sku = f"{category}{str(i+1).zfill(3)}"
-        
-        # Generate correlated attributes
-        is_oversize = 1 if random.random() < 0.2 else 0
-        
-        if is_oversize:
-            qty = random.randint(100, 800)
-            cm3 = round(random.uniform(2.5, 4.5), 2)
-            volume = round(random.uniform(0.2, 0.4), 2)
-            parcels = random.randint(20, 80)
-        else:
-            qty = random.randint(500, 4000)
-            cm3 = round(random.uniform(0.3, 3.0), 2)
-            volume = round(random.uniform(0.03, 0.2), 2)
-            parcels = random.randint(50, 400)
-        
-        products.append({
-            "Razin (SKU)": sku,
-            "Asin": f"B{random.randint(10000000, 99999999)}",
-            "Qty": qty,
-            "CM3": cm3,
-            "Master carton Volume": volume,
-            "Is Oversize": is_oversize,
-            "Parcels per MC": parcels,
-            "Currency": "USD"
-        })
+
+CATEGORIES = np.array(["ELEC", "HOME", "TOYS", "SPRT", "BOOK", "FASH", "FOOD", "PETS", "AUTO", "GARD"])
+
+# Rows per generated block; each block has its own seeded stream, so the
+# output does not depend on how many rows are generated
+PRODUCT_BLOCK = 1 << 20
+
+PRODUCT_COLUMNS = ["Razin (SKU)", "Asin", "Qty", "CM3", "Master carton Volume", "Is Oversize",
+                   "Parcels per MC", "Currency"]
+NODE_COLUMNS = ["Node", "Node group", "Stage", "Cluster", "Cost_Method", "Feasibility_Method", "LT_method"]
+EDGE_COLUMNS = ["Node 1", "Node 2", "Cost_Method", "Feasibility_Method", "LT_method"]
+
+# Stages after the supplier: (node group, name prefix, node cost method)
+STAGES = [
+    ("Source Port", "SRC", "0"),
+    ("Destination port", "PORT", "0"),
+    ("WH", "WH", "wh_cost"),
+    ("FC", "FC", "0"),
+]
+SOURCE_CLUSTER = "CN"
+DEFAULT_CLUSTERS = ["US_West", "US_East", "US_South", "US_Central"]
+CONTAINER_TYPES = [("20ft", 0, 0), ("40ft", 1000, 100)]
+
+# Ranges for "fixed" methods, drawn per edge: (low, high) inclusive
+FIXED_COST = (20, 500)
+FIXED_LT = {2: (15, 30), 3: (1, 5), 4: (1, 5)}
+
+# Preference for targets in the source node's own cluster when wiring stages
+SAME_CLUSTER_WEIGHT = 4.0
+
+
+def supplier_names(count=1):
+    """Supplier node names; a single supplier keeps the plain "Supplier" name."""
+    return ["Supplier"] if count == 1 else [f"SUP{i}" for i in range(count)]
+
+
+def generate_products(n=100, output_file="products_generated.csv", seed=0, origins=None):
+    """Generate ``n`` products, writing them block by block.
+    
+    With ``origins``, each product gets an ``Origin`` column drawn
+    uniformly from them.
+    """
+    output_file = Path(output_file)
+    width = max(len(str(n)), 3)
+    
+    for block, start in enumerate(range(0, n, PRODUCT_BLOCK)):
+        df = _product_block(start, min(PRODUCT_BLOCK, n - start), width, np.random.default_rng([seed, block]),
+                            origins)
+        _write_csv(df, output_file, append=block > 0)
+    
+    if n == 0:
+        pd.DataFrame(columns=PRODUCT_COLUMNS + (["Origin"] if origins else [])).to_csv(output_file, index=False)
     
-    df = pd.DataFrame(products)
-    df.to_csv(output_file, index=False)
     print(f"Generated {n} products to {output_file}")
 
 
+def _product_block(start, size, width, rng, origins=None):
+    """One block of products with correlated attributes, as a DataFrame."""
+    oversize = rng.random(size) < 0.2
+    
+    # Oversized items: fewer, larger units in smaller cartons
+    qty = np.where(oversize, rng.integers(100, 801, size), rng.integers(500, 4001, size))
+    cm3 = np.where(oversize, rng.uniform(2.5, 4.5, size), rng.uniform(0.3, 3.0, size)).round(2)
+    volume = np.where(oversize, rng.uniform(0.2, 0.4, size), rng.uniform(0.03, 0.2, size)).round(2)
+    parcels = np.where(oversize, rng.integers(20, 81, size), rng.integers(50, 401, size))
+    
+    # SKUs and ASINs are assembled as byte matrices: pandas string ops are
+    # an order of magnitude slower at this size
+    category_bytes = np.frombuffer("".join(CATEGORIES).encode(), dtype=np.uint8).reshape(len(CATEGORIES), -1)
+    razins = _strings(np.hstack([
+        category_bytes[rng.integers(0, len(CATEGORIES), size)],
+        _digits(np.arange(start + 1, start + size + 1), width)
+    ]))
+    asins = _strings(np.hstack([
+        np.full((size, 1), ord("B"), dtype=np.uint8),
+        _digits(rng.integers(10000000, 100000000, size), 8)
+    ]))
+    
+    df = pd.DataFrame({
+        "Razin (SKU)": razins,
+        "Asin": asins,
+        "Qty": qty,
+        "CM3": cm3,
+        "Master carton Volume": volume,
+        "Is Oversize": oversize.astype(np.int8),
+        "Parcels per MC": parcels,
+        "Currency": "USD"
+    }, columns=PRODUCT_COLUMNS)
+    if origins:
+        # Drawn last, so the other columns match a catalog without origins
+        df["Origin"] = np.asarray(origins)[rng.integers(0, len(origins), size)]
+    return df
+
+
+def _digits(values, width):
+    """Zero-padded decimal digits of integers as an ASCII byte matrix."""
+    powers = 10 ** np.arange(width - 1, -1, -1, dtype=np.int64)
+    return (values[:, None] // powers % 10 + ord("0")).astype(np.uint8)
+
+
+def _strings(matrix):
+    """Rows of an ASCII byte matrix as a string array."""
+    return matrix.view(f"S{matrix.shape[1]}").ravel().astype(str)
+
+
+def _write_csv(df, output_file, append=False):
+    """Write or append a block, with pyarrow's CSV writer when it is installed."""
+    try:
+        import pyarrow as pa
+        import pyarrow.csv as pa_csv
+    except ImportError:
+        df.to_csv(output_file, mode="a" if append else "w", header=not append, index=False)
+        return
+    
+    # Floats as pandas writes them (Arrow drops the ".0" of whole ones)
+    floats = df.select_dtypes("float").columns
+    df = df.assign(**{column: df[column].to_numpy().astype(str) for column in floats})
+    
+    # Arrow quotes header names, so the header is written as pandas would
+    with open(output_file, "ab" if append else "wb") as f:
+        if not append:
+            f.write((",".join(df.columns) + "\n").encode())
+        options = pa_csv.WriteOptions(include_header=False, quoting_style="none")
+        pa_csv.write_csv(pa.Table.from_pandas(df, preserve_index=False), f, options)
+
+
+def parse_mix(spec):
+    """Parse ``"name=weight,..."`` into (names, probabilities)."""
+    names, weights = [], []
+    for item in spec.split(","):
+        name, _, weight = item.partition("=")
+        names.append(name.strip())
+        weights.append(float(weight) if weight else 1.0)
+    weights = np.array(weights)
+    if (weights < 0).any() or weights.sum() <= 0:
+        raise ValueError(f"Invalid method mix: {spec}")
+    return names, weights / weights.sum()
+
+
+def _methods(rng, mix, count, fixed_range):
+    """Draw ``count`` method names from a mix; ``fixed`` becomes a random constant."""
+    names, probabilities = mix
+    chosen = np.array(names, dtype=object)[rng.choice(len(names), size=count, p=probabilities)]
+    fixed = chosen == "fixed"
+    chosen[fixed] = rng.integers(fixed_range[0], fixed_range[1] + 1, fixed.sum()).astype(str)
+    return chosen
+
+
+def generate_network(widths=(3, 5, 9, 4), fan_out=(0, 3, 2), clusters=None,
+                     cost_mix="cluster_costs=1", lt_mix="cluster_LTs=1", feas_mix="cluster_feas=1", seed=0,
+                     suppliers=1):
+    """Stage-layered network as (nodes, edges) DataFrames in the CSV layouts.
+    
+    ``widths`` are the node counts of stages 2-5 and ``fan_out`` the edges
+    from each node to the next stage for the three stage transitions after
+    the source ports (0 connects to every node). Each of the ``suppliers``
+    connects to every source port. Every node gets at least one incoming edge.
+    """
+    rng = np.random.default_rng(seed)
+    clusters = list(clusters or DEFAULT_CLUSTERS)
+    mixes = {"cost": parse_mix(cost_mix), "lt": parse_mix(lt_mix), "feas": parse_mix(feas_mix)}
+    
+    # Nodes by stage; downstream stages cycle through the clusters
+    layers = []
+    suppliers = supplier_names(suppliers)
+    nodes = [(name, "Supplier", 1, "Source", "0", "1", "0") for name in suppliers]
+    for stage, ((group, prefix, cost_method), width) in enumerate(zip(STAGES, widths), start=2):
+        names = [f"{prefix}{i}" for i in range(width)]
+        layer_clusters = [SOURCE_CLUSTER] * width if stage == 2 else [clusters[i % len(clusters)] for i in range(width)]
+        layers.append((names, np.array(layer_clusters)))
+        nodes.extend((name, group, stage, cluster, cost_method, "1", "0")
+                     for name, cluster in zip(names, layer_clusters))
+    
+    sources, _ = layers[0]
+    supplier_lts = rng.integers(5, 8, len(sources) * len(suppliers)).astype(str)
+    frames = [pd.DataFrame({"Node 1": np.repeat(suppliers, len(sources)), "Node 2": np.tile(sources, len(suppliers)),
+                            "Cost_Method": "0", "Feasibility_Method": "1", "LT_method": supplier_lts})]
+    
+    for transition, fan in enumerate(fan_out):
+        stage = transition + 2
+        (from_names, from_clusters), (to_names, to_clusters) = layers[transition], layers[transition + 1]
+        pairs = _wire(rng, from_clusters, to_clusters, fan)
+        count = len(pairs)
+        frames.append(pd.DataFrame({
+            "Node 1": np.array(from_names)[pairs[:, 0]],
+            "Node 2": np.array(to_names)[pairs[:, 1]],
+            "Cost_Method": _methods(rng, mixes["cost"], count, FIXED_COST),
+            # Feasibility rules only apply to the ocean leg and to FC moves
+            "Feasibility_Method": _methods(rng, mixes["feas"], count, (1, 1)) if stage != 3 else "1",
+            "LT_method": _methods(rng, mixes["lt"], count, FIXED_LT[stage]),
+        }))
+    
+    return pd.DataFrame(nodes, columns=NODE_COLUMNS), pd.concat(frames, ignore_index=True)[EDGE_COLUMNS]
+
+
+def _wire(rng, from_clusters, to_clusters, fan):
+    """(from, to) index pairs: ``fan`` targets per source, same cluster preferred."""
+    n_from, n_to = len(from_clusters), len(to_clusters)
+    if fan <= 0 or fan >= n_to:
+        return np.array([(i, j) for i in range(n_from) for j in range(n_to)])
+    
+    pairs = []
+    for i in range(n_from):
+        weights = np.where(to_clusters == from_clusters[i], SAME_CLUSTER_WEIGHT, 1.0)
+        targets = rng.choice(n_to, size=fan, replace=False, p=weights / weights.sum())
+        pairs.extend((i, j) for j in targets)
+    
+    # Give unreached targets an edge from a random source
+    reached = np.zeros(n_to, dtype=bool)
+    reached[[j for _, j in pairs]] = True
+    for j in np.flatnonzero(~reached):
+        pairs.append((int(rng.integers(n_from)), j))
+    
+    return np.array(sorted(pairs))
+
+
+def generate_rate_tables(nodes, edges, seed=0):
+    """Ocean rates, shipping times and warehouse rates matching a network."""
+    rng = np.random.default_rng([seed, 1])
+    cluster_of = dict(zip(nodes["Node"], nodes["Cluster"]))
+    group_of = dict(zip(nodes["Node"], nodes["Node group"]))
+    
+    # Ocean rates for every source port -> destination port lane
+    ocean = edges[edges["Node 1"].map(group_of).eq("Source Port")]
+    lanes = len(ocean)
+    base = rng.integers(2400, 3400, lanes) // 50 * 50
+    fuel = rng.integers(15, 19, lanes)
+    peak = rng.integers(8, 11, lanes) * 25
+    ocean_rates = pd.concat([
+        pd.DataFrame({
+            "origin_port": ocean["Node 1"].values,
+            "dest_port": ocean["Node 2"].values,
+            "container_type": container,
+            "base_rate": base + extra_rate,
+            "fuel_surcharge_pct": fuel,
+            "peak_season_surcharge": peak + extra_surcharge
+        })
+        for container, extra_rate, extra_surcharge in CONTAINER_TYPES
+    ]).sort_values(["origin_port", "dest_port", "container_type"], kind="stable")
+    
+    # Transit times for every cluster pair an edge crosses
+    pairs = pd.DataFrame({
+        "origin_cluster": edges["Node 1"].map(cluster_of),
+        "dest_cluster": edges["Node 2"].map(cluster_of)
+    })
+    pairs = pairs[pairs["origin_cluster"] != "Source"].drop_duplicates().sort_values(
+        ["origin_cluster", "dest_cluster"]).reset_index(drop=True)
+    ocean_leg = pairs["origin_cluster"].eq(SOURCE_CLUSTER).values
+    pairs["transit_days"] = np.where(ocean_leg, rng.integers(21, 29, len(pairs)), rng.integers(1, 6, len(pairs)))
+    pairs["reliability_score"] = np.where(
+        ocean_leg, rng.uniform(0.90, 0.96, len(pairs)), rng.uniform(0.96, 0.995, len(pairs))).round(2)
+    
+    warehouses = nodes.loc[nodes["Node group"].eq("WH"), "Node"].values
+    warehouse_rates = pd.DataFrame({
+        "warehouse": warehouses,
+        "storage_rate_per_unit_per_day": rng.uniform(0.08, 0.15, len(warehouses)).round(2),
+        "handling_fee_per_unit": rng.uniform(0.45, 0.60, len(warehouses)).round(2),
+        "min_storage_days": rng.choice([3, 5], len(warehouses))
+    })
+    
+    return {"ocean_rates": ocean_rates, "shipping_times": pairs, "warehouse_rates": warehouse_rates}
+
+
+def generate_dataset(output_dir, name, n_products=0, seed=0, **network_options):
+    """Write products, network and rate tables named ``<table>_<name>.csv``; returns their paths."""
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    paths = {}
+    
+    nodes, edges = generate_network(seed=seed, **network_options)
+    tables = {"nodes": nodes, "node-node": edges, **generate_rate_tables(nodes, edges, seed)}
+    for table, df in tables.items():
+        paths[table] = output_dir / f"{table}_{name}.csv"
+        df.to_csv(paths[table], index=False)
+    print(f"Generated network with {len(nodes)} nodes and {len(edges)} edges to {output_dir}")
+    
+    if n_products:
+        paths["products"] = output_dir / f"products_{name}.csv"
+        origins = nodes.loc[nodes["Node group"].eq("Supplier"), "Node"].tolist()
+        generate_products(n_products, paths["products"], seed, origins if len(origins) > 1 else None)
+    
+    return paths
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate synthetic networks, rate tables and product catalogs")
+    parser.add_argument("--output-dir", default="data/dummy", help="Directory for the generated CSVs")
+    parser.add_argument("--name", default="generated", help="Suffix of the generated file names")
+    parser.add_argument("--seed", type=int, default=0, help="Seed; the same seed reproduces the same files")
+    parser.add_argument("--products", type=int, default=1000, help="Products to generate (0 for none)")
+    parser.add_argument("--widths", default="3,5,9,4",
+                        help="Nodes in the source port, destination port, warehouse and FC stages")
+    parser.add_argument("--fan-out", default="0,3,2",
+                        help="Edges per node into the next stage for port->port, port->WH and WH->FC "
+                             "(0 connects to every node)")
+    parser.add_argument("--clusters", default=",".join(DEFAULT_CLUSTERS),
+                        help="Clusters assigned round-robin to the downstream stages")
+    parser.add_argument("--cost-mix", default="cluster_costs=1",
+                        help="Edge cost methods with weights, e.g. cluster_costs=0.7,fixed=0.3")
+    parser.add_argument("--lt-mix", default="cluster_LTs=1", help="Edge lead time methods with weights")
+    parser.add_argument("--feas-mix", default="cluster_feas=1", help="Edge feasibility methods with weights")
+    parser.add_argument("--suppliers", type=int, default=1,
+                        help="Supplier nodes; with more than one, products get an Origin column")
+    parser.add_argument("--products-only", action="store_true", help="Only generate the product catalog")
+    args = parser.parse_args()
+    if args.suppliers < 1:
+        parser.error("--suppliers must be at least 1")
+    
+    if args.products_only:
+        Path(args.output_dir).mkdir(parents=True, exist_ok=True)
+        origins = supplier_names(args.suppliers) if args.suppliers > 1 else None
+        generate_products(args.products, Path(args.output_dir) / f"products_{args.name}.csv", args.seed, origins)
+        return
+    
+    widths = [int(width) for width in args.widths.split(",")]
+    fan_out = [int(fan) for fan in args.fan_out.split(",")]
+    if len(widths) != len(STAGES) or len(fan_out) != len(STAGES) - 1:
+        parser.error(f"--widths needs {len(STAGES)} values and --fan-out {len(STAGES) - 1}")
+    
+    generate_dataset(
+        args.output_dir, args.name, args.products, args.seed,
+        widths=widths, fan_out=fan_out, clusters=args.clusters.split(","),
+        cost_mix=args.cost_mix, lt_mix=args.lt_mix, feas_mix=args.feas_mix, suppliers=args.suppliers
+    )
+
+
 if __name__ == "__main__":
-    # Generate different sized datasets
-    generate_products(10, "data/dummy/products_test_10.csv")
-    generate_products(100, "data/dummy/products_test_100.csv")
-    generate_products(1000, "data/dummy/products_test_1000.csv")
\ No newline at end of file
+    main()
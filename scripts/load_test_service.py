@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""Load-test a running allocation service with concurrent batch requests."""
+
+import argparse
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+import sys
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+from src.utils import load_products
+from src.service import AllocationClient
+
+
+def percentile(values, pct):
+    """Nearest-rank percentile of a sorted list."""
+    index = min(len(values) - 1, max(0, int(round(pct / 100 * len(values))) - 1))
+    return values[index]
+
+
+def main():
+    """Send batches concurrently and report latency and throughput."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--url", default="http://127.0.0.1:8765")
+    parser.add_argument("--products", default="data/dummy/products_large.csv")
+    parser.add_argument("--batch-size", type=int, default=10)
+    parser.add_argument("--requests", type=int, default=100)
+    parser.add_argument("--concurrency", type=int, default=8)
+    args = parser.parse_args()
+    
+    client = AllocationClient(args.url)
+    products = [p.model_dump() for p in load_products(Path(args.products))]
+    batches = [
+        [products[(i * args.batch_size + j) % len(products)] for j in range(args.batch_size)]
+        for i in range(args.requests)
+    ]
+    
+    def send(batch):
+        start_time = time.perf_counter()
+        response = client.allocate(batch)
+        return time.perf_counter() - start_time, response["allocated"]
+    
+    print(f"Sending {args.requests} requests of {args.batch_size} SKUs with concurrency {args.concurrency}...")
+    start_time = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+        outcomes = list(pool.map(send, batches))
+    elapsed = time.perf_counter() - start_time
+    
+    latencies = sorted(latency for latency, _ in outcomes)
+    allocated = sum(count for _, count in outcomes)
+    
+    print(f"\nLoad Test Summary:")
+    print(f"  Requests: {len(outcomes)} in {elapsed:.2f}s ({len(outcomes) / elapsed:.1f} req/s)")
+    print(f"  SKUs allocated: {allocated} ({allocated / elapsed:.1f} SKU/s)")
+    print(f"  Latency mean: {statistics.mean(latencies) * 1000:.1f} ms")
+    print(f"  Latency p50: {percentile(latencies, 50) * 1000:.1f} ms")
+    print(f"  Latency p95: {percentile(latencies, 95) * 1000:.1f} ms")
+    print(f"  Latency p99: {percentile(latencies, 99) * 1000:.1f} ms")
+    print(f"\nServer status: {client.status()}")
+
+
+if __name__ == "__main__":
+    main()
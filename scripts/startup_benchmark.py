@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""Benchmark cold-start time of the allocation CLI."""
+
+import argparse
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+
+SMALL_RUN = [
+    "--products", "data/dummy/products_small.csv",
+    "--nodes", "data/dummy/nodes_simple.csv",
+    "--edges", "data/dummy/node-node_simple.csv"
+]
+
+
+def time_command(args, repeat):
+    """Run a fresh interpreter repeatedly and return wall times in seconds."""
+    times = []
+    for _ in range(repeat):
+        start_time = time.perf_counter()
+        result = subprocess.run([sys.executable] + args, capture_output=True, text=True)
+        times.append(time.perf_counter() - start_time)
+        if result.returncode != 0:
+            raise RuntimeError(f"Command failed: {' '.join(args)}\n{result.stderr}")
+    return times
+
+
+def import_profile(args, top):
+    """Return the slowest top-level imports for a command via -X importtime."""
+    result = subprocess.run([sys.executable, "-X", "importtime"] + args, capture_output=True, text=True)
+    
+    rows = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative_us, raw_name = line[len("import time:"):].split("|")
+        # Nested imports are indented by two spaces per level
+        if len(raw_name) - len(raw_name.lstrip()) == 1:
+            rows.append((int(cumulative_us), raw_name.strip()))
+    
+    return sorted(rows, reverse=True)[:top]
+
+
+def main():
+    """Report cold-start times for --help and a 10-SKU allocation."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--top", type=int, default=8, help="Slowest imports to list")
+    args = parser.parse_args()
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        output = str(Path(tmp) / "results.json")
+        commands = {
+            "python -c pass": ["-c", "pass"],
+            "src.main --help": ["-m", "src.main", "--help"],
+            "src.main 10-SKU run": ["-m", "src.main"] + SMALL_RUN + ["--output", output]
+        }
+        
+        print(f"Cold-start times over {args.repeat} runs:")
+        print(f"  {'Command':<22} {'Min':>8} {'Median':>8}")
+        for label, command in commands.items():
+            times = time_command(command, args.repeat)
+            print(f"  {label:<22} {min(times) * 1000:>6.0f}ms {statistics.median(times) * 1000:>6.0f}ms")
+        
+        print(f"\nSlowest top-level imports for the 10-SKU run:")
+        for cumulative_us, name in import_profile(commands["src.main 10-SKU run"], args.top):
+            print(f"  {name:<30} {cumulative_us / 1000:>7.1f}ms")
+
+
+if __name__ == "__main__":
+    main()
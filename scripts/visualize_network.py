@@ -20,7 +20,8 @@ def visualize_network(nodes_file, edges_file, output_file="network_graph.png"):
     
     # Build network
     builder = NetworkBuilder()
-    graph = builder.build(nodes, edges)
+    builder.build(nodes, edges)
+    graph = builder.graph.to_networkx()
     
     # Create layout
     pos = nx.spring_layout(graph, k=2, iterations=50)
@@ -2,5 +2,36 @@
 
 from .allocator import Allocator
 from .path_evaluator import PathEvaluator
+from .feasibility import FeasibilityIndex
+from .stockout import StockoutSimulator
+from .schedule import DepartureSchedule, ScheduledRouter
+from .consolidation import ContainerConsolidator, pack_sorted
+from .beam_search import BeamSearchAllocator
+from .path_costs import PathCosts
+from .split import SplitAllocator, split_quantities
+from .incremental import IncrementalAllocator, ReuseAllocator, NetworkDiff, diff_networks
+from .scenarios import Scenario, ScenarioRunner, load_scenarios
+from .sensitivity import SensitivityAnalyzer
 
-__all__ = ["Allocator", "PathEvaluator"]
\ No newline at end of file
+__all__ = [
+    "Allocator",
+    "PathEvaluator",
+    "FeasibilityIndex",
+    "StockoutSimulator",
+    "DepartureSchedule",
+    "ScheduledRouter",
+    "ContainerConsolidator",
+    "pack_sorted",
+    "BeamSearchAllocator",
+    "PathCosts",
+    "SplitAllocator",
+    "split_quantities",
+    "IncrementalAllocator",
+    "ReuseAllocator",
+    "NetworkDiff",
+    "diff_networks",
+    "Scenario",
+    "ScenarioRunner",
+    "load_scenarios",
+    "SensitivityAnalyzer",
+]
\ No newline at end of file
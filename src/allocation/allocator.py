@@ -1,46 +1,156 @@
 """Main allocation algorithm."""
 
-from typing import List, Optional
-from datetime import datetime, timedelta
-import uuid
+from typing import Any, Callable, Dict, Iterable, List, Optional
+from datetime import date, datetime, time, timedelta
 
-from ..models import Chunk, Product, AllocationResult
+from ..models import Chunk, Product, Node, Edge, AllocationResult, PathEvaluation
+from ..models.product import DEFAULT_ORIGIN
+from ..utils import network_fingerprint, config_fingerprint, chunk_fingerprint
+from ..utils.metrics import Metrics
 from ..graph import NetworkBuilder, PathFinder
 from ..evaluators import BaseEvaluator
 from .path_evaluator import PathEvaluator
+from .feasibility import FeasibilityIndex
+from .stockout import StockoutSimulator
+from .schedule import ScheduledRouter
+from .consolidation import ContainerConsolidator
 
 
 class Allocator:
     """Allocates chunks to optimal paths."""
     
-    def __init__(self, network_builder: NetworkBuilder, evaluator: BaseEvaluator):
+    def __init__(self, network_builder: NetworkBuilder, evaluator: BaseEvaluator,
+                 metrics: Optional[Metrics] = None):
         self.network = network_builder
         self.evaluator = evaluator
+        self.metrics = metrics or Metrics()
         self.path_finder = PathFinder(network_builder.graph)
         self.path_evaluator = PathEvaluator(network_builder, evaluator)
+        self.feasibility = FeasibilityIndex(self.path_evaluator, getattr(evaluator, "config", {}).get("hazmat_rules"))
+        self.path_evaluator.feasibility = self.feasibility
+        self._class_path_finders: Dict[int, PathFinder] = {}
+        self.router = ScheduledRouter(self.path_evaluator)
+        # "earliest" or "cheapest" to route by label-setting instead of enumerating paths
+        self.route_objective: Optional[str] = None
+        self.stockout = StockoutSimulator.from_config(network_builder.graph, getattr(evaluator, "config", {}))
+        self.consolidator = ContainerConsolidator.from_config(self.path_evaluator, getattr(evaluator, "config", {}))
+        # Per-lane container report of the last run, when consolidating
+        self.consolidation_report = None
+        self._fingerprint: Optional[str] = None
+    
+    @property
+    def fingerprint(self) -> str:
+        """Fingerprint of the network, evaluator config and search mode."""
+        if self._fingerprint is None:
+            self._fingerprint = run_fingerprint(self.network.nodes_data.values(), self.network.edges_data,
+                                                getattr(self.evaluator, "config", {}), self.search_signature())
+        return self._fingerprint
+    
+    def search_signature(self) -> Dict[str, Any]:
+        """Search parameters that can change which path is selected."""
+        signature = {"mode": "exact", "max_hops": self.path_finder.max_hops}
+        if self.route_objective is not None:
+            signature["route"] = self.route_objective
+        return signature
     
     def allocate_products(self, products: List[Product]) -> List[AllocationResult]:
         """Allocate all products to optimal paths."""
-        results = []
-        
         # Convert products to chunks
-        chunks = self._create_chunks(products)
+        with self.metrics.phase("chunking"):
+            chunks = self._create_chunks(products)
         
         # Get destination nodes
         destinations = self.network.get_destinations()
         
         # Allocate each chunk
-        for chunk in chunks:
-            result = self.allocate_chunk(chunk, destinations)
+        with self.metrics.phase("allocate"):
+            results = self._allocate_chunks(chunks, destinations, self.allocate_chunk)
+        self._consolidate(results, chunks)
+        self._assess_stockout(results)
+        
+        self._record_run(chunks, results)
+        return results
+    
+    def _allocate_chunks(self, chunks: List[Chunk], destinations: set,
+                         allocate: Callable[[Chunk, set], Optional[AllocationResult]]) -> List[AllocationResult]:
+        """Allocate chunks in order, profiling every Nth when the profiler samples."""
+        results = []
+        profiler = self.metrics.profiler
+        sampling = profiler is not None and profiler.sampling
+        
+        for index, chunk in enumerate(chunks):
+            if sampling and profiler.samples(index):
+                with profiler.phase("allocate"):
+                    result = allocate(chunk, destinations)
+            else:
+                result = allocate(chunk, destinations)
             if result:
                 results.append(result)
         
         return results
     
+    def _consolidate(self, results: List[AllocationResult], chunks: List[Chunk]) -> None:
+        """Re-price ocean lanes with containers shared across chunks, if configured."""
+        if self.consolidator is not None:
+            with self.metrics.phase("consolidation"):
+                self.consolidation_report = self.consolidator.apply(results, chunks)
+            self.metrics.incr("containers", int(self.consolidation_report["containers"].sum()))
+    
+    def _assess_stockout(self, results: List[AllocationResult]) -> None:
+        """Estimate stockout risk for all results at once, if configured."""
+        if self.stockout is not None:
+            with self.metrics.phase("stockout"):
+                self.stockout.apply(results)
+    
+    def _record_run(self, chunks: List[Chunk], results: List[AllocationResult]) -> None:
+        """Add chunk, result and evaluator call counts and path-plan sizes to the metrics."""
+        self.metrics.incr("chunks", len(chunks))
+        self.metrics.incr("chunks_allocated", len(results))
+        for method, calls in self.path_evaluator.drain_calls().items():
+            self.metrics.incr("evaluator_calls", calls, method=method)
+        for name, value in self.path_plan_footprint().items():
+            self.metrics.set_gauge(f"path_plan_{name}", value)
+    
+    def path_plan_footprint(self) -> Dict[str, int]:
+        """Path-plan sizes summed over the feasibility classes' path finders."""
+        totals = {"trees": 0, "origins": 0, "paths": 0, "suffixes": 0, "bytes": 0}
+        for finder in self._class_path_finders.values():
+            for name, value in finder.footprint().items():
+                totals[name] += value
+        return totals
+    
+    def class_path_finder(self, chunk: Chunk) -> PathFinder:
+        """Path finder over the network pruned to the chunk's feasibility class."""
+        cls = self.feasibility.classify(chunk)
+        finder = self._class_path_finders.get(cls)
+        if finder is None:
+            graph = self.feasibility.graph_for(cls)
+            finder = self.path_finder.restricted(graph)
+            self._class_path_finders[cls] = finder
+            self.metrics.incr("edges_pruned", self.network.graph.number_of_edges() - graph.number_of_edges(),
+                              reason="infeasible")
+        return finder
+    
+    def share_path_plans(self, other: "Allocator") -> None:
+        """Use another allocator's feasibility classes and path plans.
+        
+        Only valid when both networks have the same nodes, edges and
+        feasibility; costs and lead times may differ.
+        """
+        self.feasibility = other.feasibility
+        self.path_evaluator.feasibility = other.feasibility
+        self.path_finder = other.path_finder
+        self._class_path_finders = other._class_path_finders
+    
     def allocate_chunk(self, chunk: Chunk, destinations: set) -> Optional[AllocationResult]:
         """Allocate a single chunk to optimal path."""
-        # Find all possible paths
-        paths = self.path_finder.find_all_paths(chunk.origin, destinations)
+        if self.route_objective is not None:
+            return self.route_chunk(chunk, destinations)
+        
+        # Find all paths its feasibility class may use
+        with self.metrics.phase("path_enumeration", allocations=False):
+            paths = self.class_path_finder(chunk).find_all_paths(chunk.origin, destinations)
+        self.metrics.incr("paths_enumerated", len(paths))
         
         if not paths:
             print(f"No paths found for chunk {chunk.chunk_id}")
@@ -50,50 +160,95 @@ class Allocator:
         best_path = None
         best_evaluation = None
         best_score = -float('inf')
+        infeasible = 0
         
-        for path in paths:
-            evaluation = self.path_evaluator.evaluate_path(chunk, path)
-            
-            # Skip infeasible paths
-            if not evaluation.feasible:
-                continue
-            
-            # Check if this is the best path so far
-            if evaluation.cm3_score > best_score:
-                best_score = evaluation.cm3_score
-                best_path = path
-                best_evaluation = evaluation
+        with self.metrics.phase("evaluation", allocations=False):
+            for path in paths:
+                evaluation = self.path_evaluator.evaluate_path(chunk, path)
+                
+                # Skip infeasible paths
+                if not evaluation.feasible:
+                    infeasible += 1
+                    continue
+                
+                # Check if this is the best path so far
+                if evaluation.cm3_score > best_score:
+                    best_score = evaluation.cm3_score
+                    best_path = path
+                    best_evaluation = evaluation
+        
+        self.metrics.incr("paths_pruned", infeasible, reason="infeasible")
         
         if not best_path:
             print(f"No feasible path found for chunk {chunk.chunk_id}")
             return None
         
-        # Create allocation result
-        eta = datetime.now() + timedelta(days=best_evaluation.total_lead_time)
-        
-        return AllocationResult(
-            chunk_id=chunk.chunk_id,
-            razin=chunk.razin,
-            selected_path=best_path,
-            total_cost=best_evaluation.total_cost,
-            total_lead_time=best_evaluation.total_lead_time,
-            cm3_score=best_evaluation.cm3_score,
-            eta=eta,
-            feasible=True,
-            stockout_risk=False  # TODO: Implement stockout check
-        )
+        return self._build_result(chunk, best_evaluation)
+    
+    def route_chunk(self, chunk: Chunk, destinations: set) -> Optional[AllocationResult]:
+        """Allocate a chunk to the path found by time-dependent routing from its ready date."""
+        graph = self.feasibility.graph_for(self.feasibility.classify(chunk))
+        with self.metrics.phase("routing", allocations=False):
+            found = self.router.solve(chunk, graph, destinations, ready_date(chunk).toordinal(),
+                                      self.route_objective, self.path_finder.max_hops)
+        
+        if found is None:
+            print(f"No paths found for chunk {chunk.chunk_id}")
+            return None
+        
+        with self.metrics.phase("evaluation", allocations=False):
+            evaluation = self.path_evaluator.evaluate_path(chunk, found[0])
+        return self._build_result(chunk, evaluation)
+    
+    def _build_result(self, chunk: Chunk, evaluation: PathEvaluation) -> AllocationResult:
+        """Create allocation result for the selected path evaluation."""
+        with self.metrics.phase("result_construction", allocations=False):
+            # Waits for scheduled departures count towards the lead time
+            lead_time = self.router.lead_time(evaluation, ready_date(chunk).toordinal())
+            
+            return AllocationResult(
+                chunk_id=chunk.chunk_id,
+                razin=chunk.razin,
+                selected_path=evaluation.path,
+                total_cost=evaluation.total_cost,
+                total_lead_time=lead_time,
+                cm3_score=evaluation.cm3_score,
+                eta=eta(chunk, lead_time),
+                feasible=True
+            )
     
     def _create_chunks(self, products: List[Product]) -> List[Chunk]:
         """Convert products to chunks for processing."""
         chunks = []
         
         for product in products:
+            # Same product row on the same network and config gets the same id
             chunk = Chunk(
-                chunk_id=str(uuid.uuid4())[:8],
+                chunk_id=chunk_fingerprint(product, self.fingerprint),
                 product=product,
-                origin="Supplier",
-                ready_date=datetime.now().date()
+                origin=product.origin or DEFAULT_ORIGIN,
+                ready_date=product.ready_date or date.today()
             )
             chunks.append(chunk)
         
-        return chunks
\ No newline at end of file
+        return chunks
+
+
+def run_fingerprint(nodes: Iterable[Node], edges: Iterable[Edge], config: Dict[str, Any],
+                    search: Dict[str, Any]) -> str:
+    """Fingerprint of a network, evaluator config and search mode; chunk ids hash products with it."""
+    return config_fingerprint({
+        "network": network_fingerprint(nodes, edges),
+        "config": config_fingerprint(config),
+        "search": search
+    })
+
+
+def ready_date(chunk: Chunk) -> date:
+    """Day the chunk can leave its origin."""
+    return chunk.ready_date or date.today()
+
+
+def eta(chunk: Chunk, lead_time: int) -> datetime:
+    """Arrival for a lead time counted from the start of the ready date."""
+    return datetime.combine(ready_date(chunk), time()) + timedelta(days=lead_time)
@@ -0,0 +1,111 @@
+"""Beam-search approximate allocation for large networks."""
+
+import heapq
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from ..models import Chunk, AllocationResult
+from ..graph import NetworkBuilder
+from ..evaluators import BaseEvaluator
+from ..utils.metrics import Metrics
+from .allocator import Allocator
+
+
+# (total_cost, total_lead_time, path) for a partial path in the beam
+BeamEntry = Tuple[float, int, List[str]]
+
+
+class BeamSearchAllocator(Allocator):
+    """Allocates chunks by expanding the network stage by stage.
+    
+    Instead of enumerating every simple path, only the ``beam_width``
+    cheapest feasible partial paths are kept after each expansion. Costs
+    come from the same evaluators via ``PathEvaluator``, so with a beam at
+    least as wide as the number of paths the result matches ``Allocator``.
+    """
+    
+    def __init__(self, network_builder: NetworkBuilder, evaluator: BaseEvaluator, beam_width: int = 10,
+                 metrics: Optional[Metrics] = None):
+        super().__init__(network_builder, evaluator, metrics)
+        if beam_width < 1:
+            raise ValueError(f"Beam width must be positive, got {beam_width}")
+        self.beam_width = beam_width
+        self.graph = network_builder.graph
+    
+    def search_signature(self) -> Dict[str, Any]:
+        """Search parameters that can change which path is selected."""
+        return {"mode": "beam", "beam_width": self.beam_width, "max_hops": self.path_finder.max_hops}
+    
+    def allocate_chunk(self, chunk: Chunk, destinations: set) -> Optional[AllocationResult]:
+        """Allocate a single chunk to the best path found by beam search."""
+        with self.metrics.phase("beam_search", allocations=False):
+            best_path = self.search(chunk, destinations)
+        
+        if not best_path:
+            print(f"No feasible path found for chunk {chunk.chunk_id}")
+            return None
+        
+        with self.metrics.phase("evaluation", allocations=False):
+            evaluation = self.path_evaluator.evaluate_path(chunk, best_path)
+        return self._build_result(chunk, evaluation)
+    
+    def search(self, chunk: Chunk, destinations: Set[str]) -> Optional[List[str]]:
+        """Return the cheapest feasible path kept by the beam, if any."""
+        # Infeasible nodes and lanes are already pruned from the class graph
+        graph = self.feasibility.graph_for(self.feasibility.classify(chunk))
+        if chunk.origin not in graph:
+            return None
+        
+        cost, lead_time, feasible, _ = self.path_evaluator.evaluate_node(chunk, chunk.origin)
+        if not feasible:
+            return None
+        
+        beam: List[BeamEntry] = [(cost, lead_time, [chunk.origin])]
+        best: Optional[BeamEntry] = None
+        pruned = {"infeasible": 0, "bound": 0, "beam": 0}
+        
+        for _ in range(self.path_finder.max_hops):
+            candidates = []
+            
+            for partial_cost, partial_lt, path in beam:
+                for next_node in graph.successors(path[-1]):
+                    if next_node in path:
+                        continue
+                    
+                    entry = self._extend(chunk, partial_cost, partial_lt, path, next_node)
+                    if entry is None:
+                        pruned["infeasible"] += 1
+                        continue
+                    
+                    # Costs are non-negative, so nothing dearer than the best
+                    # complete path can improve on it
+                    if best is not None and entry[:2] >= best[:2]:
+                        pruned["bound"] += 1
+                        continue
+                    
+                    if next_node in destinations:
+                        best = entry
+                    else:
+                        candidates.append(entry)
+            
+            if not candidates:
+                break
+            
+            beam = heapq.nsmallest(self.beam_width, candidates, key=lambda e: e[:2])
+            pruned["beam"] += len(candidates) - len(beam)
+        
+        for reason, count in pruned.items():
+            self.metrics.incr("paths_pruned", count, reason=reason)
+        
+        return best[2] if best else None
+    
+    def _extend(self, chunk: Chunk, cost: float, lead_time: int, path: List[str], next_node: str) -> Optional[BeamEntry]:
+        """Extend a partial path by one edge and node, or None if infeasible."""
+        edge_cost, edge_lt, edge_feas, _ = self.path_evaluator.evaluate_edge(chunk, path[-1], next_node)
+        if not edge_feas:
+            return None
+        
+        node_cost, node_lt, node_feas, _ = self.path_evaluator.evaluate_node(chunk, next_node)
+        if not node_feas:
+            return None
+        
+        return cost + edge_cost + node_cost, lead_time + edge_lt + node_lt, path + [next_node]
@@ -0,0 +1,293 @@
+"""Container consolidation of chunks that share an ocean lane."""
+
+from bisect import bisect_left, bisect_right
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from ..models import Chunk, AllocationResult
+from ..evaluators import LookupTable
+from ..evaluators.table import CONTAINER_CAPACITY_M3
+from ..evaluators.expression import CHUNK_FIELDS
+
+
+# Slack for rounding in cumulative volumes when filling a container
+VOLUME_EPSILON = 1e-9
+
+# Items above this share of a container are packed one by one
+LARGE_SHARE = 0.1
+
+REPORT_COLUMNS = ["origin_port", "dest_port", "chunks", "volume_m3", "containers", "fill_rate",
+                  "cost_before", "cost_after"]
+
+
+def pack_sorted(volumes: np.ndarray, capacity: float) -> Tuple[np.ndarray, np.ndarray]:
+    """Pack volumes sorted in decreasing order into containers of a capacity.
+    
+    Items over ``LARGE_SHARE`` of a container are packed first-fit
+    decreasing: each container takes the largest unpacked item, then
+    repeatedly the largest one that still fits, found by binary search over
+    the sorted volumes. The small items are left contiguous at the end of
+    the order, so they top up those containers and fill new ones in bulk:
+    the largest in order while they fit, then the smallest into the space
+    left, by binary search over their cumulative volumes. Either way a
+    container is closed only once no unpacked item fits, and the bulk loop
+    runs once per container, not per item. Returns the container of each
+    item and the load of each container.
+    """
+    containers = np.empty(len(volumes), dtype=np.int64)
+    loads: List[float] = []
+    # Scalar binary searches are faster on lists than on arrays
+    cumulative = np.concatenate(([0.0], np.cumsum(volumes))).tolist()
+    # Rounding in the running sums grows with their magnitude
+    tolerance = VOLUME_EPSILON + 4 * np.finfo(np.float64).eps * cumulative[-1]
+    
+    # Large items, one at a time; ``following`` skips packed items (union-find)
+    large = int(np.searchsorted(-volumes, -capacity * LARGE_SHARE))
+    sizes = volumes[:large].tolist()
+    negated = (-volumes[:large]).tolist()
+    following = list(range(large + 1))
+    assigned = [0] * large
+    
+    def next_unpacked(i: int) -> int:
+        root = i
+        while following[root] != root:
+            root = following[root]
+        while following[i] != root:
+            following[i], i = root, following[i]
+        return root
+    
+    i = next_unpacked(0)
+    while i < large:
+        container, load = len(loads), 0.0
+        while i < large:
+            assigned[i] = container
+            load += sizes[i]
+            following[i] = i + 1
+            i = next_unpacked(bisect_left(negated, load - capacity - tolerance))
+        loads.append(load)
+        i = next_unpacked(0)
+    containers[:large] = assigned
+    
+    # Small items in bulk, topping up the containers above first
+    head, tail = large, len(volumes)
+    container = 0
+    while head < tail:
+        if container == len(loads):
+            loads.append(0.0)
+        elif capacity - loads[container] + tolerance < volumes[tail - 1]:
+            container += 1
+            continue
+        end = bisect_right(cumulative, cumulative[head] + capacity - loads[container] + tolerance) - 1
+        end = min(max(end, head + (loads[container] == 0.0)), tail)
+        containers[head:end] = container
+        loads[container] += cumulative[end] - cumulative[head]
+        head = end
+        
+        if head < tail:
+            start = bisect_left(cumulative, cumulative[tail] - (capacity - loads[container]) - tolerance)
+            start = max(start, head)
+            containers[start:tail] = container
+            loads[container] += cumulative[tail] - cumulative[start]
+            tail = start
+        container += 1
+    
+    return containers, np.minimum(loads, capacity)
+
+
+class ContainerConsolidator:
+    """Shares ocean containers between the chunks allocated to the same lane.
+    
+    A chunk's lane is the first edge of its selected path with ocean rates.
+    Its volume is its whole master cartons (``ceil(qty / parcels_per_mc)``
+    times ``mc_volume``). Per lane, volume filling whole containers of the
+    largest configured type ships on its own and the remainders are packed
+    together with ``pack_sorted``. Each container is priced at the cheapest
+    configured type that holds its load, and its price is split over its
+    chunks by volume. That replaces what the evaluator charged each chunk
+    for the lane on its own, giving ``consolidated_cost``.
+    """
+    
+    def __init__(self, path_evaluator, ocean_rates: LookupTable, container_types: Sequence[str] = ("20ft", "40ft"),
+                 peak_season: bool = False):
+        unknown = [name for name in container_types if name not in CONTAINER_CAPACITY_M3]
+        if unknown or not container_types:
+            raise ValueError(f"Unknown container types: {unknown or container_types}")
+        self.path_evaluator = path_evaluator
+        self.ocean_rates = ocean_rates
+        # Smallest first, so the first type that holds a load is the smallest that does
+        self.container_types = sorted(container_types, key=CONTAINER_CAPACITY_M3.get)
+        self.capacities = np.array([CONTAINER_CAPACITY_M3[name] for name in self.container_types])
+        self.peak_season = peak_season
+    
+    @classmethod
+    def from_config(cls, path_evaluator, config: Dict[str, Any]) -> Optional["ContainerConsolidator"]:
+        """Consolidator for the ``consolidation`` section of an evaluator config, if any."""
+        settings = config.get("consolidation")
+        if settings is None:
+            return None
+        
+        settings = dict(settings)
+        table_path = settings.pop("ocean_rates", config.get("tables", {}).get("ocean_rates"))
+        if not table_path:
+            raise ValueError("Consolidation needs an ocean_rates table")
+        ocean_rates = LookupTable.from_csv(Path(table_path), ["origin_port", "dest_port", "container_type"],
+                                           ["base_rate", "fuel_surcharge_pct", "peak_season_surcharge"])
+        return cls(path_evaluator, ocean_rates, **settings)
+    
+    def lane_rates(self, edges: Sequence[Tuple[str, str]]) -> np.ndarray:
+        """Per-container rate of each edge (rows) and container type (columns), NaN where not listed."""
+        origins = [u for u, _ in edges]
+        destinations = [v for _, v in edges]
+        values = self.ocean_rates.values
+        rates = np.full((len(edges), len(self.container_types)), np.nan)
+        for t, name in enumerate(self.container_types):
+            rows = self.ocean_rates.rows(origins, destinations, [name] * len(edges))
+            listed = rows >= 0
+            rate = values["base_rate"][rows[listed]] * (1 + values["fuel_surcharge_pct"][rows[listed]] / 100)
+            if self.peak_season:
+                rate = rate + values["peak_season_surcharge"][rows[listed]]
+            rates[listed, t] = rate
+        return rates
+    
+    def apply(self, results: List[AllocationResult], chunks: Sequence[Chunk]) -> "pd.DataFrame":
+        """Set ``consolidated_cost`` on results in place and report each lane."""
+        import pandas as pd
+        
+        if not results:
+            return pd.DataFrame(columns=REPORT_COLUMNS)
+        # Position of each result's chunk; product columns are gathered through it. Rows listed twice
+        # share a content-hashed id, and the first of them stands in for both
+        first: Dict[str, int] = {}
+        for i, chunk in enumerate(chunks):
+            first.setdefault(chunk.chunk_id, i)
+        position = np.array([first[result.chunk_id] for result in results], dtype=np.int64)
+        products = _ProductColumns([chunk.product for chunk in chunks], position)
+        
+        # Lane of each distinct path: its first edge with ocean rates
+        path_ids: Dict[Tuple[str, ...], int] = {}
+        path_of = np.fromiter((path_ids.setdefault(tuple(result.selected_path), len(path_ids)) for result in results),
+                              dtype=np.int64, count=len(results))
+        edges = sorted({edge for path in path_ids for edge in zip(path, path[1:])})
+        rates = self.lane_rates(edges)
+        listed = ~np.isnan(rates).all(axis=1)
+        lanes = [edge for edge, is_lane in zip(edges, listed) if is_lane]
+        rates = rates[listed]
+        lane_ids = {edge: i for i, edge in enumerate(lanes)}
+        path_lane = np.array([next((lane_ids[edge] for edge in zip(path, path[1:]) if edge in lane_ids), -1)
+                              for path in path_ids], dtype=np.int64)
+        lane = path_lane[path_of]
+        
+        volume = np.ceil(products["qty"] / products["parcels_per_mc"]) * products["mc_volume"]
+        
+        standalone = self.standalone_costs(chunks, position, products, lanes, lane)
+        consolidated, containers, capacity = self.consolidated_costs(volume, lane, rates)
+        
+        total_cost = np.array([result.total_cost for result in results], dtype=np.float64)
+        on_lane = lane >= 0
+        new_cost = total_cost.copy()
+        new_cost[on_lane] += consolidated[on_lane] - standalone[on_lane]
+        for result, cost in zip(results, np.maximum(new_cost, 0).tolist()):
+            result.consolidated_cost = cost
+        
+        lane_volume = np.bincount(lane[on_lane], volume[on_lane], minlength=len(lanes))
+        return pd.DataFrame({
+            "origin_port": [u for u, _ in lanes],
+            "dest_port": [v for _, v in lanes],
+            "chunks": np.bincount(lane[on_lane], minlength=len(lanes)),
+            "volume_m3": lane_volume,
+            "containers": containers,
+            "fill_rate": np.divide(lane_volume, containers * capacity, out=np.zeros(len(lanes)),
+                                   where=containers > 0),
+            "cost_before": np.bincount(lane[on_lane], standalone[on_lane], minlength=len(lanes)),
+            "cost_after": np.bincount(lane[on_lane], consolidated[on_lane], minlength=len(lanes)),
+        }, columns=REPORT_COLUMNS)
+    
+    def standalone_costs(self, chunks: Sequence[Chunk], position: np.ndarray, products: "_ProductColumns",
+                         lanes: List[Tuple[str, str]], lane: np.ndarray) -> np.ndarray:
+        """What the evaluator charges each chunk for its lane on its own.
+        
+        Chunks on a lane that agree on the fields its cost method reads share
+        one evaluation.
+        """
+        import pandas as pd
+        
+        evaluator = self.path_evaluator
+        graph = evaluator.graph
+        costs = np.zeros(len(lane))
+        
+        for i, (u, v) in enumerate(lanes):
+            members = np.flatnonzero(lane == i)
+            fields = evaluator.evaluator.chunk_fields(graph[u][v]["cost_method"])
+            if fields is None:
+                fields = CHUNK_FIELDS
+            columns = [products[field][members] for field in sorted(fields)]
+            if columns:
+                codes, _ = pd.factorize(pd.MultiIndex.from_arrays(columns))
+            else:
+                codes = np.zeros(len(members), dtype=np.int64)
+            
+            # First member of each group stands in for the group
+            groups, first = np.unique(codes, return_index=True)
+            group_costs = np.array([evaluator.evaluate_edge(chunks[position[members[j]]], u, v)[0]
+                                    for j in first])
+            costs[members] = group_costs[np.searchsorted(groups, codes)]
+        
+        return costs
+    
+    def consolidated_costs(self, volume: np.ndarray, lane: np.ndarray,
+                           rates: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Each chunk's share of its lane's containers, and the containers and packing capacity per lane."""
+        costs = np.zeros(len(volume))
+        containers = np.zeros(len(rates), dtype=np.int64)
+        capacities = np.zeros(len(rates))
+        
+        order = np.argsort(lane, kind="stable")
+        bounds = np.searchsorted(lane[order], np.arange(len(rates) + 1))
+        
+        for i in range(len(rates)):
+            members = order[bounds[i]:bounds[i + 1]]
+            if not len(members):
+                continue
+            available = ~np.isnan(rates[i])
+            capacity = self.capacities[available][-1]
+            full_rate = rates[i][available][-1]
+            
+            full = np.floor(volume[members] / capacity)
+            remainder = volume[members] - full * capacity
+            costs[members] = full * full_rate
+            
+            # Remainders in decreasing order
+            packed = members[remainder > VOLUME_EPSILON]
+            remainder = remainder[remainder > VOLUME_EPSILON]
+            rank = np.argsort(-remainder, kind="stable")
+            packed, remainder = packed[rank], remainder[rank]
+            assigned, container_loads = pack_sorted(remainder, capacity)
+            
+            # Cheapest listed type that holds each load
+            fits = self.capacities[None, :] >= container_loads[:, None] - VOLUME_EPSILON
+            prices = np.where(fits & available[None, :], rates[i][None, :], np.inf).min(axis=1)
+            costs[packed] += remainder / container_loads[assigned] * prices[assigned]
+            
+            containers[i] = int(full.sum()) + len(container_loads)
+            capacities[i] = capacity
+        
+        return costs, containers, capacities
+
+
+class _ProductColumns:
+    """Product attributes as arrays aligned with the results, gathered on first use."""
+    
+    def __init__(self, products: Sequence[Any], position: np.ndarray):
+        self.products = products
+        self.position = position
+        self._columns: Dict[str, np.ndarray] = {}
+    
+    def __getitem__(self, field: str) -> np.ndarray:
+        if field not in self._columns:
+            # Chunk fields are all product attributes
+            values = [getattr(product, field) for product in self.products]
+            column = np.array(values, dtype=object if field == "hazmat_class" else np.float64)
+            self._columns[field] = column[self.position]
+        return self._columns[field]
@@ -0,0 +1,124 @@
+"""Per-class feasibility bitmasks for the network's nodes and edges."""
+
+from pathlib import Path
+from typing import Dict, List, Optional, Set, Tuple
+
+from ..models import Chunk
+from ..graph import DiGraph
+from ..utils import load_hazmat_rules, parse_carriers
+
+
+# Chunk fields that define a feasibility class
+CLASS_FIELDS = {"is_oversize", "hazmat_class"}
+
+ClassKey = Tuple[int, Optional[str]]
+
+
+class FeasibilityIndex:
+    """Feasibility of every node and edge for each product feasibility class.
+    
+    A class is a distinct (is_oversize, hazmat_class) pair, numbered in the
+    order chunks of it are first seen. Bit ``c`` of an element's mask is set
+    when the element is feasible for class ``c``: its feasibility method
+    passes for a chunk of that class and, for a hazmat class with a carrier
+    rule, the edge lists one of the allowed carriers. Edges without
+    carriers cannot carry restricted hazmat classes.
+    
+    Feasibility methods that read chunk fields beyond the class cannot be
+    precomputed; they are left out of ``methods`` and still evaluated per
+    path.
+    """
+    
+    def __init__(self, path_evaluator, hazmat_rules: Optional[Path] = None):
+        self.path_evaluator = path_evaluator
+        self.graph: DiGraph = path_evaluator.graph
+        self.hazmat_rules_path = hazmat_rules
+        self._hazmat_rules: Optional[Dict[str, Set[str]]] = None
+        
+        self.classes: Dict[ClassKey, int] = {}
+        self.node_masks: Dict[str, int] = {node: 0 for node in self.graph}
+        self.edge_masks: Dict[Tuple[str, str], int] = {edge: 0 for edge in self.graph.edges()}
+        self.edge_carriers = {
+            (u, v): parse_carriers(data.get("carriers")) for u, v, data in self.graph.edges(data=True)
+        }
+        self._graphs: Dict[int, DiGraph] = {}
+        
+        evaluator = path_evaluator.evaluator
+        used = {data.get("feasibility_method", "1") for _, data in self.graph.nodes(data=True)}
+        used |= {data.get("feasibility_method", "1") for _, _, data in self.graph.edges(data=True)}
+        self.methods: Set[str] = set()
+        for method in used - {"1"}:
+            fields = evaluator.chunk_fields(method)
+            if fields is not None and fields <= CLASS_FIELDS:
+                self.methods.add(method)
+    
+    def classify(self, chunk: Chunk) -> int:
+        """Class number of a chunk, computing the masks of a new class."""
+        key = (chunk.product.is_oversize, chunk.product.hazmat_class)
+        cls = self.classes.get(key)
+        if cls is None:
+            cls = self._add_class(key, chunk)
+        return cls
+    
+    def node_allows(self, node: str, chunk: Chunk) -> bool:
+        return bool(self.node_masks[node] >> self.classify(chunk) & 1)
+    
+    def edge_allows(self, from_node: str, to_node: str, chunk: Chunk) -> bool:
+        return bool(self.edge_masks[(from_node, to_node)] >> self.classify(chunk) & 1)
+    
+    def path_allows(self, path: List[str], chunk: Chunk) -> bool:
+        """Check a whole path by ANDing its node and edge masks."""
+        mask = -1
+        for node in path:
+            mask &= self.node_masks[node]
+        for i in range(len(path) - 1):
+            mask &= self.edge_masks[(path[i], path[i + 1])]
+        return bool(mask >> self.classify(chunk) & 1)
+    
+    def graph_for(self, cls: int) -> DiGraph:
+        """The network without the nodes and edges infeasible for a class."""
+        if cls not in self._graphs:
+            bit = 1 << cls
+            graph = DiGraph()
+            for node, data in self.graph.nodes(data=True):
+                if self.node_masks[node] & bit:
+                    graph.add_node(node, **data)
+            for u, v, data in self.graph.edges(data=True):
+                if self.edge_masks[(u, v)] & bit and u in graph and v in graph:
+                    graph.add_edge(u, v, **data)
+            self._graphs[cls] = graph
+        return self._graphs[cls]
+    
+    def carrier_rule(self, hazmat_class: Optional[str]) -> Optional[Set[str]]:
+        """Carriers allowed for a hazmat class, or None if unrestricted."""
+        if not hazmat_class or self.hazmat_rules_path is None:
+            return None
+        if self._hazmat_rules is None:
+            self._hazmat_rules = load_hazmat_rules(Path(self.hazmat_rules_path))
+        return self._hazmat_rules.get(hazmat_class)
+    
+    def _add_class(self, key: ClassKey, chunk: Chunk) -> int:
+        """Evaluate every element once for a representative chunk of the class."""
+        cls = len(self.classes)
+        self.classes[key] = cls
+        bit = 1 << cls
+        allowed_carriers = self.carrier_rule(key[1])
+        evaluator = self.path_evaluator
+        
+        for node, data in self.graph.nodes(data=True):
+            method = data.get("feasibility_method", "1")
+            if method not in self.methods or evaluator.evaluate_feasibility(
+                evaluator.node_context(chunk, node, method, "feasibility")
+            ):
+                self.node_masks[node] |= bit
+        
+        for u, v, data in self.graph.edges(data=True):
+            method = data.get("feasibility_method", "1")
+            if allowed_carriers is not None and not self.edge_carriers[(u, v)] & allowed_carriers:
+                continue
+            if method not in self.methods or evaluator.evaluate_feasibility(
+                evaluator.edge_context(chunk, u, v, method, "feasibility")
+            ):
+                self.edge_masks[(u, v)] |= bit
+        
+        return cls
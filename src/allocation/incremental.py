@@ -0,0 +1,217 @@
+"""Incremental reallocation against a previous results file."""
+
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+from ..models import Chunk, Product, Node, Edge, AllocationResult
+from ..graph import NetworkBuilder
+from ..evaluators import BaseEvaluator
+from ..utils import chunk_fingerprint
+from ..utils.metrics import Metrics
+from .allocator import Allocator, eta, run_fingerprint
+
+
+class NetworkDiff:
+    """Nodes and edges that differ between two versions of a network."""
+    
+    def __init__(self):
+        self.added_nodes: Set[str] = set()
+        self.removed_nodes: Set[str] = set()
+        self.changed_nodes: Set[str] = set()
+        self.added_edges: Set[Tuple[str, str]] = set()
+        self.removed_edges: Set[Tuple[str, str]] = set()
+        self.changed_edges: Set[Tuple[str, str]] = set()
+    
+    @property
+    def nodes(self) -> Set[str]:
+        """All added, removed, or re-rated nodes."""
+        return self.added_nodes | self.removed_nodes | self.changed_nodes
+    
+    @property
+    def edges(self) -> Set[Tuple[str, str]]:
+        """All added, removed, or re-rated edges."""
+        return self.added_edges | self.removed_edges | self.changed_edges
+    
+    @property
+    def is_empty(self) -> bool:
+        return not self.nodes and not self.edges
+    
+    def touches(self, path: List[str]) -> bool:
+        """Check if a path uses any changed node or edge."""
+        nodes = self.nodes
+        if any(node in nodes for node in path):
+            return True
+        
+        edges = self.edges
+        return any((path[i], path[i + 1]) in edges for i in range(len(path) - 1))
+    
+    def __str__(self) -> str:
+        return (
+            f"Nodes +{len(self.added_nodes)} -{len(self.removed_nodes)} ~{len(self.changed_nodes)}, "
+            f"Edges +{len(self.added_edges)} -{len(self.removed_edges)} ~{len(self.changed_edges)}"
+        )
+
+
+def diff_networks(old_nodes: List[Node], old_edges: List[Edge],
+                  new_nodes: List[Node], new_edges: List[Edge]) -> NetworkDiff:
+    """Diff two node/edge sets by name and by evaluator methods."""
+    diff = NetworkDiff()
+    
+    old_node_map = {node.name: node for node in old_nodes}
+    new_node_map = {node.name: node for node in new_nodes}
+    
+    diff.added_nodes = set(new_node_map) - set(old_node_map)
+    diff.removed_nodes = set(old_node_map) - set(new_node_map)
+    diff.changed_nodes = {
+        name for name in set(old_node_map) & set(new_node_map)
+        if old_node_map[name] != new_node_map[name]
+    }
+    
+    old_edge_map = {(edge.node1, edge.node2): edge for edge in old_edges}
+    new_edge_map = {(edge.node1, edge.node2): edge for edge in new_edges}
+    
+    diff.added_edges = set(new_edge_map) - set(old_edge_map)
+    diff.removed_edges = set(old_edge_map) - set(new_edge_map)
+    diff.changed_edges = {
+        key for key in set(old_edge_map) & set(new_edge_map)
+        if old_edge_map[key] != new_edge_map[key]
+    }
+    
+    return diff
+
+
+def evict_changed_entries(evaluator: BaseEvaluator, diff: NetworkDiff) -> int:
+    """Evict cached evaluator results for changed nodes and edges."""
+    if not hasattr(evaluator.evaluate, 'invalidate_cache'):
+        return 0
+    
+    evicted = 0
+    for node in diff.nodes:
+        evicted += evaluator.evaluate.invalidate_cache(node=node)
+    
+    for edge in diff.edges:
+        evicted += evaluator.evaluate.invalidate_cache(edge=edge)
+    
+    return evicted
+
+
+class IncrementalAllocator(Allocator):
+    """Re-solves only the chunks affected by a network change.
+    
+    A previous result is carried over unchanged unless its product row
+    changed or its selected path uses a changed node or edge (full
+    re-solve), or one of the candidate paths through a change now scores
+    better (switch to that path). Removing a lane can only make untouched
+    paths relatively better, so only added and re-rated elements need
+    candidate checks.
+    
+    A product row is unchanged if it hashes to the previous chunk id under
+    the previous network and evaluator config (this one's by default).
+    """
+    
+    def __init__(self, network_builder: NetworkBuilder, evaluator: BaseEvaluator,
+                 diff: NetworkDiff, previous_results: Iterable[AllocationResult],
+                 previous_nodes: Iterable[Node], previous_edges: Iterable[Edge],
+                 previous_config: Optional[Dict[str, Any]] = None, metrics: Optional[Metrics] = None):
+        super().__init__(network_builder, evaluator, metrics)
+        self.diff = diff
+        self.previous = {result.razin: result for result in previous_results}
+        if previous_config is None:
+            previous_config = getattr(evaluator, "config", {})
+        self.previous_fingerprint = run_fingerprint(previous_nodes, previous_edges, previous_config,
+                                                    self.search_signature())
+        self.stats = {"carried": 0, "switched": 0, "resolved": 0, "new": 0}
+        self._touched_paths: Dict[Tuple[str, int], List[List[str]]] = {}
+        
+        evict_changed_entries(evaluator, diff)
+    
+    def allocate_products(self, products: List[Product]) -> List[AllocationResult]:
+        """Allocate products, reusing previous results where possible."""
+        with self.metrics.phase("chunking"):
+            chunks = self._create_chunks(products)
+        destinations = self.network.get_destinations()
+        
+        with self.metrics.phase("allocate"):
+            results = self._allocate_chunks(chunks, destinations, self.reallocate_chunk)
+        self._consolidate(results, chunks)
+        self._assess_stockout(results)
+        
+        self._record_run(chunks, results)
+        return results
+    
+    def reallocate_chunk(self, chunk: Chunk, destinations: set) -> Optional[AllocationResult]:
+        """Carry over, switch, or fully re-solve one chunk."""
+        previous = self.previous.get(chunk.razin)
+        
+        if previous is None:
+            self.stats["new"] += 1
+            return self.allocate_chunk(chunk, destinations)
+        
+        # A changed product row changes the path scores; waits on a scheduled lane depend
+        # on the ready date, so those are re-solved too
+        if (previous.chunk_id != chunk_fingerprint(chunk.product, self.previous_fingerprint)
+                or self.diff.touches(previous.selected_path) or self.router.scheduled(previous.selected_path)):
+            self.stats["resolved"] += 1
+            return self.allocate_chunk(chunk, destinations)
+        
+        # Previous path is untouched, so its score still holds; only paths
+        # through a change can beat it
+        best_evaluation = None
+        best_score = previous.cm3_score
+        
+        with self.metrics.phase("evaluation", allocations=False):
+            for path in self._paths_through_changes(chunk, destinations):
+                evaluation = self.path_evaluator.evaluate_path(chunk, path)
+                if evaluation.feasible and evaluation.cm3_score > best_score:
+                    best_score = evaluation.cm3_score
+                    best_evaluation = evaluation
+        
+        if best_evaluation is None:
+            self.stats["carried"] += 1
+            return _refresh(previous, chunk)
+        
+        self.stats["switched"] += 1
+        return self._build_result(chunk, best_evaluation)
+    
+    def _paths_through_changes(self, chunk: Chunk, destinations: set) -> List[List[str]]:
+        """Candidate paths from the chunk's origin, feasible for its class, that use an added or re-rated element."""
+        key = (chunk.origin, self.feasibility.classify(chunk))
+        if key not in self._touched_paths:
+            with self.metrics.phase("path_enumeration", allocations=False):
+                paths = self.class_path_finder(chunk).find_all_paths(chunk.origin, destinations)
+                self._touched_paths[key] = [path for path in paths if self.diff.touches(path)]
+            self.metrics.incr("paths_enumerated", len(paths))
+        return self._touched_paths[key]
+
+
+class ReuseAllocator(Allocator):
+    """Reuses previous results for chunks whose content-addressed id is unchanged.
+    
+    Chunk ids hash the product row together with the network, evaluator
+    config and search mode, so a matching id means the previous result is
+    still valid. Only new or modified SKUs are allocated.
+    """
+    
+    def __init__(self, network_builder: NetworkBuilder, evaluator: BaseEvaluator,
+                 previous_results: Iterable[AllocationResult], metrics: Optional[Metrics] = None):
+        super().__init__(network_builder, evaluator, metrics)
+        self.previous = {result.chunk_id: result for result in previous_results}
+        self.stats = {"reused": 0, "allocated": 0}
+    
+    def allocate_chunk(self, chunk: Chunk, destinations: set) -> Optional[AllocationResult]:
+        """Return the previous result for an unchanged chunk, else allocate it."""
+        previous = self.previous.get(chunk.chunk_id)
+        
+        if previous is None or self.router.scheduled(previous.selected_path):
+            self.stats["allocated"] += 1
+            return super().allocate_chunk(chunk, destinations)
+        
+        self.stats["reused"] += 1
+        return _refresh(previous, chunk)
+
+
+def _refresh(result: AllocationResult, chunk: Chunk) -> AllocationResult:
+    """Carry a previous result over to this run's chunk id and ready date."""
+    return result.model_copy(update={
+        "chunk_id": chunk.chunk_id,
+        "eta": eta(chunk, result.total_lead_time)
+    })
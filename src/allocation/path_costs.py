@@ -0,0 +1,208 @@
+"""Node and edge costs of candidate paths for many chunks at once, as arrays."""
+
+from typing import Dict, Iterator, List, Sequence, Tuple
+
+import numpy as np
+
+from ..models import Chunk
+from ..evaluators.expression import CHUNK_FIELDS, VARIABLES
+from .path_evaluator import PathEvaluator
+
+
+# Upper bound on float64 cells (steps or paths x chunks) computed in one block
+BLOCK_CELLS = 1 << 22
+
+# Array types of the chunk fields other than hazmat_class, as the scalar formulas see them
+COLUMN_DTYPES = {"qty": np.int64, "cm3": np.float64, "mc_volume": np.float64, "parcels_per_mc": np.int64,
+                 "is_oversize": np.int64}
+
+# (kind, node) or (kind, from node, to node)
+Step = Tuple[str, ...]
+
+# Distinct steps of a path list, and each path's step indices (see ``step_plan``)
+StepPlan = Tuple[List[Step], np.ndarray]
+
+# (chunks, candidate paths) sharing one path list
+PathGroup = Tuple[Sequence[Chunk], List[List[str]]]
+
+
+class PathCosts:
+    """Step costs and feasibility of candidate paths for groups of chunks.
+    
+    A group is chunks sharing one candidate path list. Every distinct node
+    and edge of its paths is evaluated for every chunk: with the
+    evaluator's NumPy kernels where the method is a configured formula, and
+    once per distinct combination of the chunk fields it reads otherwise.
+    Groups are processed in batches of about ``BLOCK_CELLS`` values, each
+    method evaluated once per batch. Feasibility covered by the path
+    evaluator's feasibility index is taken as given: the paths come from
+    its pruned class graphs.
+    """
+    
+    def __init__(self, path_evaluator: PathEvaluator):
+        self.path_evaluator = path_evaluator
+        self.evaluator = path_evaluator.evaluator
+        self.network = path_evaluator.network
+    
+    def blocks(self, groups: Sequence[PathGroup],
+               plans: Sequence[StepPlan]) -> Iterator[Tuple[int, int, int, np.ndarray, np.ndarray]]:
+        """Step costs and feasibility for slices of each group's chunks.
+        
+        Yields ``(group, first, end, costs, feasible)`` for chunks
+        ``first:end`` of the group, in group order. ``costs`` and
+        ``feasible`` have one row per step of the group's plan plus a
+        padding row (zero cost, feasible), and one column per chunk.
+        """
+        chunks = [chunk for members, _ in groups for chunk in members]
+        columns = _chunk_columns(chunks)
+        offsets = np.cumsum([0] + [len(members) for members, _ in groups]).tolist()
+        
+        # (group, first chunk, end chunk) items, chunks numbered across groups
+        batch: List[Tuple[int, int, int]] = []
+        cells = 0
+        for g, (members, paths) in enumerate(groups):
+            offset = offsets[g]
+            per_chunk = max(len(plans[g][0]) + 1, len(paths))
+            size = max(1, BLOCK_CELLS // per_chunk)
+            for first in range(offset, offset + len(members), size):
+                end = min(first + size, offset + len(members))
+                if batch and cells + (end - first) * per_chunk > BLOCK_CELLS:
+                    yield from self._batch_blocks(batch, offsets, plans, chunks, columns)
+                    batch, cells = [], 0
+                batch.append((g, first, end))
+                cells += (end - first) * per_chunk
+        if batch:
+            yield from self._batch_blocks(batch, offsets, plans, chunks, columns)
+    
+    def _batch_blocks(self, batch: List[Tuple[int, int, int]], offsets: List[int], plans: Sequence[StepPlan],
+                      chunks: List[Chunk], columns: Dict[str, np.ndarray]):
+        """Evaluate a batch of group slices and yield their blocks."""
+        starts = np.cumsum([0] + [(len(plans[g][0]) + 1) * (end - first) for g, first, end in batch])
+        costs = np.zeros(starts[-1])
+        feasible = np.ones(starts[-1], dtype=bool)
+        indexed = self.path_evaluator.feasibility.methods if self.path_evaluator.feasibility is not None else set()
+        
+        # Step values to compute, by (method, kind): (block row start, step, first chunk, end chunk)
+        pending: Dict[Tuple[str, str], List[Tuple[int, Step, int, int]]] = {}
+        for (g, first, end), start in zip(batch, starts.tolist()):
+            for s, step in enumerate(plans[g][0]):
+                cost_method, feasibility_method = self._step_methods(step)
+                row = start + s * (end - first)
+                if cost_method != "0":
+                    pending.setdefault((cost_method, "cost"), []).append((row, step, first, end))
+                if feasibility_method != "1" and feasibility_method not in indexed:
+                    pending.setdefault((feasibility_method, "feasibility"), []).append((row, step, first, end))
+        
+        for (method, kind), entries in pending.items():
+            positions = np.concatenate([np.arange(row, row + end - first) for row, _, first, end in entries])
+            chunk_index = np.concatenate([np.arange(first, end) for _, _, first, end in entries])
+            step_index = np.repeat(np.arange(len(entries)), [end - first for _, _, first, end in entries])
+            values = self._method_values(method, kind, [step for _, step, _, _ in entries], step_index,
+                                         chunk_index, chunks, columns)
+            if kind == "cost":
+                costs[positions] = values
+            else:
+                feasible[positions] = values.astype(bool)
+        
+        for (g, first, end), start in zip(batch, starts.tolist()):
+            shape = (len(plans[g][0]) + 1, end - first)
+            block = slice(start, start + shape[0] * shape[1])
+            yield (g, first - offsets[g], end - offsets[g],
+                   costs[block].reshape(shape), feasible[block].reshape(shape))
+    
+    def _step_methods(self, step: Step) -> Tuple[str, str]:
+        """Cost and feasibility methods of a node or edge step."""
+        if step[0] == "node":
+            node = self.network.get_node(step[1])
+            return node.cost_method, node.feasibility_method
+        data = self.path_evaluator.graph[step[1]][step[2]]
+        return data["cost_method"], data["feasibility_method"]
+    
+    def _step_context(self, step: Step, chunk: Chunk, method: str, kind: str):
+        """Evaluation context of a step for one chunk."""
+        if step[0] == "node":
+            return self.path_evaluator.node_context(chunk, step[1], method, kind)
+        return self.path_evaluator.edge_context(chunk, step[1], step[2], method, kind)
+    
+    def _method_values(self, method: str, kind: str, steps: List[Step], step_index: np.ndarray,
+                       chunk_index: np.ndarray, chunks: List[Chunk], columns: Dict[str, np.ndarray]) -> np.ndarray:
+        """A method's value for (step, chunk) pairs.
+        
+        Formulas run once as a NumPy kernel over all pairs; other methods
+        are called once per distinct step and combination of the chunk
+        fields they read.
+        """
+        import pandas as pd
+        
+        evaluator = self.evaluator
+        formula = None if method.isdigit() else getattr(evaluator, "formulas", {}).get(method)
+        if formula is not None:
+            batch = {}
+            for name in formula.variables:
+                if name in columns:
+                    batch[name] = columns[name][chunk_index]
+                else:
+                    # Context fields are per step, read as the scalar formula reads them
+                    per_step = np.empty(len(steps), dtype=object)
+                    per_step[:] = [VARIABLES[name](self._step_context(step, chunks[0], method, kind))
+                                   for step in steps]
+                    batch[name] = per_step[step_index]
+            return np.asarray(evaluator.evaluate_batch(method, batch, len(step_index)))
+        
+        fields = evaluator.chunk_fields(method)
+        if fields is None:
+            fields = CHUNK_FIELDS
+        inputs = [step_index] + [columns[field][chunk_index] for field in sorted(fields)]
+        codes, _ = pd.factorize(pd.MultiIndex.from_arrays(inputs))
+        
+        # First pair of each group of equal inputs stands in for the group
+        groups, first = np.unique(codes, return_index=True)
+        values = np.array([
+            self.path_evaluator._evaluate(self._step_context(steps[step_index[i]], chunks[chunk_index[i]], method, kind))
+            for i in first.tolist()
+        ])
+        return values[np.searchsorted(groups, codes)]
+
+
+def step_plan(paths: List[List[str]]) -> StepPlan:
+    """Distinct steps of the paths, and each path's steps in ``evaluate_path`` order.
+    
+    Rows are padded with the index one past the last step.
+    """
+    ids: Dict[Step, int] = {}
+    sequences = []
+    for path in paths:
+        sequence = [ids.setdefault(("node", node), len(ids)) for node in path]
+        sequence += [ids.setdefault(("edge", u, v), len(ids)) for u, v in zip(path, path[1:])]
+        sequences.append(sequence)
+    
+    plan = np.full((len(paths), max(len(sequence) for sequence in sequences)), len(ids), dtype=np.int64)
+    for p, sequence in enumerate(sequences):
+        plan[p, :len(sequence)] = sequence
+    return list(ids), plan
+
+
+def path_totals(plan: np.ndarray, costs: np.ndarray, feasible: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Cost and feasibility of each path (rows) for each chunk (columns) of a block.
+    
+    Costs are summed step by step in ``evaluate_path`` order, so they match
+    it exactly.
+    """
+    total = np.zeros((len(plan), costs.shape[1]))
+    allowed = np.ones((len(plan), costs.shape[1]), dtype=bool)
+    for column in range(plan.shape[1]):
+        total += costs[plan[:, column]]
+        allowed &= feasible[plan[:, column]]
+    return total, allowed
+
+
+def _chunk_columns(chunks: Sequence[Chunk]) -> Dict[str, np.ndarray]:
+    """The chunk fields formulas read, as arrays aligned with the chunks."""
+    products = [chunk.product for chunk in chunks]
+    columns = {
+        field: np.array([getattr(product, field) for product in products], dtype=dtype)
+        for field, dtype in COLUMN_DTYPES.items()
+    }
+    # Formulas see a missing hazmat class as ""
+    columns["hazmat_class"] = np.array([product.hazmat_class or "" for product in products], dtype=object)
+    return columns
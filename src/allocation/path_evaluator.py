@@ -1,11 +1,26 @@
 """Evaluate paths for cost, lead time, and feasibility."""
 
-from typing import List, Dict, Any
+from collections import Counter
+from typing import List, Dict, Any, Optional, Tuple
 from datetime import datetime, timedelta
 
 from ..models import Chunk, EvaluationContext, PathEvaluation
 from ..evaluators import BaseEvaluator
 from ..graph import NetworkBuilder
+from .feasibility import FeasibilityIndex
+
+
+# (cost, lead_time, feasible, evaluations) for a single node or edge
+StepEvaluation = Tuple[float, int, bool, List[Dict[str, Any]]]
+
+
+def _retarget(context: EvaluationContext, method: str, kind: str) -> EvaluationContext:
+    """Copy of a context pointed at another method and kind.
+    
+    A shallow copy shares the chunk and supplemental data and skips
+    validation, which is cheaper than building a new context per method.
+    """
+    return context.model_copy(update={"method": method, "kind": kind})
 
 
 class PathEvaluator:
@@ -15,6 +30,62 @@ class PathEvaluator:
         self.network = network_builder
         self.evaluator = evaluator
         self.graph = network_builder.graph
+        # Evaluator calls per method since the last drain_calls()
+        self.method_calls: Counter = Counter()
+        # Precomputed per-class feasibility; methods it covers are not evaluated per path
+        self.feasibility: Optional[FeasibilityIndex] = None
+    
+    def drain_calls(self) -> Counter:
+        """Return and reset the per-method evaluator call counts."""
+        calls, self.method_calls = self.method_calls, Counter()
+        return calls
+    
+    def _evaluate(self, context: EvaluationContext) -> Any:
+        """Call the evaluator, counting the call against its method."""
+        self.method_calls[context.method] += 1
+        return self.evaluator.evaluate(context)
+    
+    def evaluate_feasibility(self, context: EvaluationContext) -> bool:
+        return bool(self._evaluate(context))
+    
+    def _feasible(self, context: EvaluationContext, method: str, indexed: bool) -> bool:
+        """Feasibility from the index bit, then from the method unless the index covers it."""
+        if self.feasibility is not None:
+            if not indexed:
+                return False
+            if method in self.feasibility.methods:
+                return True
+        if method == "1":
+            return True
+        return self.evaluate_feasibility(_retarget(context, method, "feasibility"))
+    
+    def node_context(self, chunk: Chunk, node_name: str, method: str, kind: str) -> EvaluationContext:
+        """Evaluation context for a node."""
+        node = self.network.get_node(node_name)
+        return EvaluationContext(
+            chunk=chunk,
+            current_node=node_name,
+            method=method,
+            kind=kind,
+            supplemental_data={
+                "node_group": node.node_group,
+                "cluster": node.cluster
+            }
+        )
+    
+    def edge_context(self, chunk: Chunk, from_node: str, to_node: str, method: str, kind: str) -> EvaluationContext:
+        """Evaluation context for an edge."""
+        return EvaluationContext(
+            chunk=chunk,
+            from_node=from_node,
+            to_node=to_node,
+            method=method,
+            kind=kind,
+            supplemental_data={
+                "from_cluster": self.graph.nodes[from_node].get("cluster", ""),
+                "to_cluster": self.graph.nodes[to_node].get("cluster", "")
+            }
+        )
     
     def evaluate_path(self, chunk: Chunk, path: List[str]) -> PathEvaluation:
         """Evaluate a complete path for a chunk."""
@@ -25,109 +96,19 @@ class PathEvaluator:
         
         # Evaluate each node in the path
         for node_name in path:
-            node = self.network.get_node(node_name)
-            
-            # Create context for node evaluation
-            context = EvaluationContext(
-                chunk=chunk,
-                current_node=node_name,
-                method=node.cost_method,
-                supplemental_data={
-                    "node_group": node.node_group,
-                    "cluster": node.cluster
-                }
-            )
-            
-            # Evaluate node cost
-            if node.cost_method != "0":
-                cost = self.evaluator.evaluate(context)
-                total_cost += cost
-                evaluations.append({
-                    "type": "node",
-                    "name": node_name,
-                    "cost": cost
-                })
-            
-            # Evaluate node feasibility
-            context.method = node.feasibility_method
-            if node.feasibility_method != "1":
-                feas = self.evaluator.evaluate(context)
-                feasible = feasible and feas
-                evaluations.append({
-                    "type": "node_feasibility",
-                    "name": node_name,
-                    "feasible": feas
-                })
-            
-            # Evaluate node lead time
-            context.method = node.lt_method
-            if node.lt_method != "0":
-                lt = self.evaluator.evaluate(context)
-                total_lead_time += int(lt)
-                evaluations.append({
-                    "type": "node_lt",
-                    "name": node_name,
-                    "lead_time": lt
-                })
+            cost, lt, feas, steps = self.evaluate_node(chunk, node_name)
+            total_cost += cost
+            total_lead_time += lt
+            feasible = feasible and feas
+            evaluations.extend(steps)
         
         # Evaluate edges between nodes
         for i in range(len(path) - 1):
-            from_node = path[i]
-            to_node = path[i + 1]
-            
-            # Get edge data
-            edge_data = self.graph[from_node][to_node]
-            
-            # Get cluster info for context
-            from_cluster = self.graph.nodes[from_node].get("cluster", "")
-            to_cluster = self.graph.nodes[to_node].get("cluster", "")
-            
-            # Create context for edge evaluation
-            context = EvaluationContext(
-                chunk=chunk,
-                from_node=from_node,
-                to_node=to_node,
-                method=edge_data["cost_method"],
-                supplemental_data={
-                    "from_cluster": from_cluster,
-                    "to_cluster": to_cluster
-                }
-            )
-            
-            # Evaluate edge cost
-            if edge_data["cost_method"] != "0":
-                cost = self.evaluator.evaluate(context)
-                total_cost += cost
-                evaluations.append({
-                    "type": "edge",
-                    "from": from_node,
-                    "to": to_node,
-                    "cost": cost
-                })
-            
-            # Evaluate edge feasibility
-            context.method = edge_data["feasibility_method"]
-            if edge_data["feasibility_method"] != "1":
-                feas = self.evaluator.evaluate(context)
-                feasible = feasible and feas
-                evaluations.append({
-                    "type": "edge_feasibility",
-                    "from": from_node,
-                    "to": to_node,
-                    "feasible": feas
-                })
-            
-            # Evaluate edge lead time
-            context.method = edge_data["lt_method"]
-            if edge_data["lt_method"] != "0":
-                lt = self.evaluator.evaluate(context)
-                total_lead_time += int(lt)
-                evaluations.append({
-                    "type": "edge_lt",
-                    "from": from_node,
-                    "to": to_node,
-                    "lead_time": lt
-                })
+            cost, lt, feas, steps = self.evaluate_edge(chunk, path[i], path[i + 1])
+            total_cost += cost
+            total_lead_time += lt
+            feasible = feasible and feas
+            evaluations.extend(steps)
         
         # Calculate CM3 score
         cm3_score = chunk.cm3 / total_cost if total_cost > 0 else float('inf')
@@ -139,4 +120,89 @@ class PathEvaluator:
             feasible=feasible,
             cm3_score=cm3_score,
             evaluations=evaluations
-        )
\ No newline at end of file
+        )
+    
+    def evaluate_node(self, chunk: Chunk, node_name: str) -> StepEvaluation:
+        """Evaluate cost, feasibility, and lead time of a single node."""
+        cost = 0.0
+        lead_time = 0
+        feasible = True
+        evaluations = []
+        
+        node = self.network.get_node(node_name)
+        context = self.node_context(chunk, node_name, node.cost_method, "cost")
+        
+        # Evaluate node cost
+        if node.cost_method != "0":
+            cost = self._evaluate(context)
+            evaluations.append({
+                "type": "node",
+                "name": node_name,
+                "cost": cost
+            })
+        
+        # Evaluate node feasibility
+        indexed = self.feasibility is None or self.feasibility.node_allows(node_name, chunk)
+        feasible = self._feasible(context, node.feasibility_method, indexed)
+        if node.feasibility_method != "1" or not feasible:
+            evaluations.append({
+                "type": "node_feasibility",
+                "name": node_name,
+                "feasible": feasible
+            })
+        
+        # Evaluate node lead time
+        if node.lt_method != "0":
+            lt = self._evaluate(_retarget(context, node.lt_method, "lt"))
+            lead_time = int(lt)
+            evaluations.append({
+                "type": "node_lt",
+                "name": node_name,
+                "lead_time": lt
+            })
+        
+        return cost, lead_time, feasible, evaluations
+    
+    def evaluate_edge(self, chunk: Chunk, from_node: str, to_node: str) -> StepEvaluation:
+        """Evaluate cost, feasibility, and lead time of a single edge."""
+        cost = 0.0
+        lead_time = 0
+        feasible = True
+        evaluations = []
+        
+        edge_data = self.graph[from_node][to_node]
+        context = self.edge_context(chunk, from_node, to_node, edge_data["cost_method"], "cost")
+        
+        # Evaluate edge cost
+        if edge_data["cost_method"] != "0":
+            cost = self._evaluate(context)
+            evaluations.append({
+                "type": "edge",
+                "from": from_node,
+                "to": to_node,
+                "cost": cost
+            })
+        
+        # Evaluate edge feasibility
+        indexed = self.feasibility is None or self.feasibility.edge_allows(from_node, to_node, chunk)
+        feasible = self._feasible(context, edge_data["feasibility_method"], indexed)
+        if edge_data["feasibility_method"] != "1" or not feasible:
+            evaluations.append({
+                "type": "edge_feasibility",
+                "from": from_node,
+                "to": to_node,
+                "feasible": feasible
+            })
+        
+        # Evaluate edge lead time
+        if edge_data["lt_method"] != "0":
+            lt = self._evaluate(_retarget(context, edge_data["lt_method"], "lt"))
+            lead_time = int(lt)
+            evaluations.append({
+                "type": "edge_lt",
+                "from": from_node,
+                "to": to_node,
+                "lead_time": lt
+            })
+        
+        return cost, lead_time, feasible, evaluations
@@ -0,0 +1,356 @@
+"""What-if scenario sweeps against one base allocation."""
+
+import copy
+import json
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from time import perf_counter
+from typing import Any, Dict, List, Optional, Sequence, Set, Tuple
+
+from ..models import Product, Node, Edge, AllocationResult
+from ..graph import NetworkBuilder
+from ..evaluators import create_evaluator
+from ..utils import validate_network_integrity
+from ..utils.results_io import PATH_SEPARATOR
+from .allocator import Allocator
+from .incremental import IncrementalAllocator, NetworkDiff, diff_networks, evict_changed_entries
+
+
+# Config sections a scenario can change on the shared evaluator: methods are
+# evicted by name, and the rest is read when an allocator is created
+INCREMENTAL_SECTIONS = {"evaluators", "stockout", "consolidation"}
+
+SUMMARY_COLUMNS = [
+    "scenario", "deltas", "allocated", "unallocated", "changed", "total_cost", "cost_change",
+    "avg_lead_time", "lead_time_change", "carried", "plans_reused", "seconds"
+]
+CHANGE_COLUMNS = ["scenario", "razin", "base_path", "path", "base_cost", "cost", "base_lead_time", "lead_time"]
+
+# Runner whose state forked workers inherit, set for the duration of a sweep
+_runner: Optional["ScenarioRunner"] = None
+
+
+class Scenario:
+    """A named list of deltas against the base network and evaluator config.
+    
+    Deltas are applied in order; each is a dict with one of these keys:
+    
+    - ``{"scale": "evaluators.cluster_costs.base_rates", "factor": 1.1}``
+      multiplies every number under a config path
+    - ``{"set": "stockout.buffer_days", "value": 5}`` sets a config value
+    - ``{"close_lane": ["Shanghai", "Los Angeles"]}`` removes an edge
+    - ``{"close_node": "Oakland"}`` removes a node and its edges
+    - ``{"node": {...}}`` / ``{"edge": {...}}`` adds a node or edge, or
+      updates the listed fields of an existing one
+    """
+    
+    def __init__(self, name: str, deltas: Sequence[Dict[str, Any]] = ()):
+        self.name = name
+        self.deltas = list(deltas)
+    
+    def apply(self, nodes: List[Node], edges: List[Edge],
+              config: Dict[str, Any]) -> Tuple[List[Node], List[Edge], Dict[str, Any]]:
+        """Scenario network and config; the base ones are left unchanged."""
+        node_map = {node.name: node for node in nodes}
+        edge_map = {(edge.node1, edge.node2): edge for edge in edges}
+        config = copy.deepcopy(config)
+        
+        for delta in self.deltas:
+            if "scale" in delta:
+                parent, key = _locate(config, delta["scale"])
+                if key not in parent:
+                    raise ValueError(f"Unknown config path: {delta['scale']}")
+                parent[key] = _scaled(parent[key], float(delta["factor"]))
+            elif "set" in delta:
+                parent, key = _locate(config, delta["set"])
+                parent[key] = delta["value"]
+            elif "close_lane" in delta:
+                lane = tuple(delta["close_lane"])
+                if lane not in edge_map:
+                    raise ValueError(f"Unknown lane: {' -> '.join(lane)}")
+                del edge_map[lane]
+            elif "close_node" in delta:
+                name = delta["close_node"]
+                if name not in node_map:
+                    raise ValueError(f"Unknown node: {name}")
+                del node_map[name]
+                edge_map = {lane: edge for lane, edge in edge_map.items() if name not in lane}
+            elif "node" in delta:
+                fields = delta["node"]
+                current = node_map.get(fields.get("name"))
+                node = Node(**{**current.model_dump(), **fields}) if current else Node(**fields)
+                node_map[node.name] = node
+            elif "edge" in delta:
+                fields = delta["edge"]
+                current = edge_map.get((fields.get("node1"), fields.get("node2")))
+                edge = Edge(**{**current.model_dump(), **fields}) if current else Edge(**fields)
+                edge_map[(edge.node1, edge.node2)] = edge
+            else:
+                raise ValueError(f"Unknown scenario delta: {delta}")
+        
+        return list(node_map.values()), list(edge_map.values()), config
+
+
+def load_scenarios(filepath: Path) -> List[Scenario]:
+    """Load scenarios from JSON: a list, or an object with a ``scenarios`` list."""
+    with open(filepath, "r") as f:
+        data = json.load(f)
+    if isinstance(data, dict):
+        data = data.get("scenarios", [])
+    
+    scenarios = [Scenario(item["name"], item.get("deltas", [])) for item in data]
+    names = [scenario.name for scenario in scenarios]
+    if len(set(names)) != len(names) or "base" in names:
+        raise ValueError("Scenario names must be unique and not 'base'")
+    return scenarios
+
+
+class ScenarioRunner:
+    """Runs what-if scenarios against one base allocation.
+    
+    Products, the base network and the evaluator are loaded once and
+    allocated once. Each scenario then re-solves incrementally against the
+    base results: only chunks whose path uses a changed node, edge or
+    evaluator method are re-solved, evaluator cache entries of unchanged
+    elements stay warm, the graph is reused when the network is unchanged,
+    and path plans are reused when the nodes, edges and feasibility are.
+    Config changes outside ``INCREMENTAL_SECTIONS`` (e.g. tables) take a full
+    allocation with a fresh evaluator and an empty cache.
+    
+    Scenarios run in forked worker processes, which inherit the base state
+    without copying it; each worker undoes a scenario's config and cache
+    changes before its next one. Without fork, or with one worker, they run
+    in this process the same way.
+    """
+    
+    def __init__(self, products: List[Product], nodes: List[Node], edges: List[Edge],
+                 config: Dict[str, Any], workers: Optional[int] = None):
+        self.products = products
+        self.nodes = nodes
+        self.edges = edges
+        self.config = config
+        self.workers = workers
+        self.builder = NetworkBuilder()
+        self.builder.build(nodes, edges)
+        self.evaluator = create_evaluator(config)
+        self.base: Optional[Allocator] = None
+        self.base_results: List[AllocationResult] = []
+        self.base_seconds = 0.0
+        self._node_map = {node.name: node for node in nodes}
+        self._edge_map = {(edge.node1, edge.node2): edge for edge in edges}
+    
+    def allocate_base(self) -> List[AllocationResult]:
+        """Allocate the base scenario, warming the evaluator cache and path plans."""
+        start = perf_counter()
+        self.base = Allocator(self.builder, self.evaluator)
+        self.base_results = self.base.allocate_products(self.products)
+        self.base_seconds = perf_counter() - start
+        return self.base_results
+    
+    def run(self, scenarios: Sequence[Scenario]) -> Tuple["pd.DataFrame", "pd.DataFrame"]:
+        """Comparative table (base row first) and per-SKU allocation changes."""
+        import pandas as pd
+        
+        global _runner
+        if self.base is None:
+            self.allocate_base()
+        
+        parallel = (self.workers != 1 and len(scenarios) > 1
+                    and "fork" in multiprocessing.get_all_start_methods())
+        _runner = self
+        try:
+            if parallel:
+                context = multiprocessing.get_context("fork")
+                with ProcessPoolExecutor(max_workers=self.workers, mp_context=context) as pool:
+                    outcomes = list(pool.map(_run_scenario, scenarios))
+            else:
+                outcomes = [self.run_scenario(scenario) for scenario in scenarios]
+        finally:
+            _runner = None
+        
+        base_row, _ = self._compare("base", self.base_results, 0, {}, False, self.base_seconds)
+        summary = pd.DataFrame([base_row] + [row for row, _ in outcomes], columns=SUMMARY_COLUMNS)
+        changes = pd.DataFrame([change for _, rows in outcomes for change in rows], columns=CHANGE_COLUMNS)
+        return summary, changes
+    
+    def run_scenario(self, scenario: Scenario) -> Tuple[Dict[str, Any], List[Dict[str, Any]]]:
+        """Summary row and allocation changes of one scenario against the base."""
+        start = perf_counter()
+        nodes, edges, config = scenario.apply(self.nodes, self.edges, self.config)
+        validate_network_integrity(nodes, edges)
+        diff = diff_networks(self.nodes, self.edges, nodes, edges)
+        
+        if diff.is_empty:
+            builder = self.builder
+        else:
+            builder = NetworkBuilder()
+            builder.build(nodes, edges)
+        
+        sections = {key for key in set(config) | set(self.config) if config.get(key) != self.config.get(key)}
+        if not sections <= INCREMENTAL_SECTIONS:
+            return self._run_fresh(scenario, builder, config, start)
+        
+        methods = _changed_methods(self.config, config)
+        diff.changed_nodes |= {node.name for node in nodes if _uses(node, methods)} - diff.added_nodes
+        diff.changed_edges |= {
+            (edge.node1, edge.node2) for edge in edges if _uses(edge, methods)
+        } - diff.added_edges
+        
+        evaluator = self.evaluator
+        evaluator.config = config
+        try:
+            _evict(evaluator, methods, diff)
+            allocator = IncrementalAllocator(builder, evaluator, diff, self.base_results, self.nodes, self.edges,
+                                             self.config)
+            plans_reused = self._same_feasibility(nodes, edges, diff, methods)
+            if plans_reused:
+                allocator.share_path_plans(self.base)
+            results = allocator.allocate_products(self.products)
+        finally:
+            # Entries computed under the scenario are tagged with the same methods and elements
+            evaluator.config = self.config
+            _evict(evaluator, methods, diff)
+        
+        return self._compare(scenario.name, results, len(scenario.deltas), allocator.stats,
+                             plans_reused, perf_counter() - start)
+    
+    def _run_fresh(self, scenario: Scenario, builder: NetworkBuilder, config: Dict[str, Any],
+                   start: float) -> Tuple[Dict[str, Any], List[Dict[str, Any]]]:
+        """Full allocation with a new evaluator and an empty cache."""
+        cache = self.evaluator.evaluate
+        evaluator = create_evaluator(config)
+        if hasattr(cache, "clear_cache"):
+            cache.clear_cache()
+        try:
+            results = Allocator(builder, evaluator).allocate_products(self.products)
+        finally:
+            # The cache is keyed by method name, not config: drop the scenario's entries
+            if hasattr(cache, "clear_cache"):
+                cache.clear_cache()
+        return self._compare(scenario.name, results, len(scenario.deltas), {}, False, perf_counter() - start)
+    
+    def _same_feasibility(self, nodes: List[Node], edges: List[Edge], diff: NetworkDiff,
+                          methods: Set[str]) -> bool:
+        """Whether a scenario network keeps the base nodes, edges and feasibility."""
+        if diff.added_nodes or diff.removed_nodes or diff.added_edges or diff.removed_edges:
+            return False
+        
+        used = {node.feasibility_method for node in self.nodes} | {edge.feasibility_method for edge in self.edges}
+        if used & methods:
+            return False
+        
+        for node in nodes:
+            if node.name in diff.changed_nodes:
+                if node.feasibility_method != self._node_map[node.name].feasibility_method:
+                    return False
+        for edge in edges:
+            if (edge.node1, edge.node2) in diff.changed_edges:
+                base = self._edge_map[(edge.node1, edge.node2)]
+                if (edge.feasibility_method, edge.carriers) != (base.feasibility_method, base.carriers):
+                    return False
+        return True
+    
+    def _compare(self, name: str, results: List[AllocationResult], deltas: int, stats: Dict[str, int],
+                 plans_reused: bool, seconds: float) -> Tuple[Dict[str, Any], List[Dict[str, Any]]]:
+        """Summary row and changed allocations of results against the base results."""
+        base = {result.razin: result for result in self.base_results}
+        current = {result.razin: result for result in results}
+        
+        changes = []
+        for razin, before in base.items():
+            after = current.get(razin)
+            if after is not None and after.selected_path == before.selected_path:
+                continue
+            changes.append({
+                "scenario": name,
+                "razin": razin,
+                "base_path": PATH_SEPARATOR.join(before.selected_path),
+                "path": PATH_SEPARATOR.join(after.selected_path) if after else None,
+                "base_cost": before.total_cost,
+                "cost": after.total_cost if after else None,
+                "base_lead_time": before.total_lead_time,
+                "lead_time": after.total_lead_time if after else None
+            })
+        for razin in current.keys() - base.keys():
+            after = current[razin]
+            changes.append({
+                "scenario": name,
+                "razin": razin,
+                "base_path": None,
+                "path": PATH_SEPARATOR.join(after.selected_path),
+                "base_cost": None,
+                "cost": after.total_cost,
+                "base_lead_time": None,
+                "lead_time": after.total_lead_time
+            })
+        
+        total_cost = sum(result.total_cost for result in results)
+        avg_lead_time = sum(result.total_lead_time for result in results) / len(results) if results else 0.0
+        base_cost = sum(result.total_cost for result in self.base_results)
+        base_lead_time = (sum(result.total_lead_time for result in self.base_results) / len(self.base_results)
+                          if self.base_results else 0.0)
+        row = {
+            "scenario": name,
+            "deltas": deltas,
+            "allocated": len(results),
+            "unallocated": len(base.keys() - current.keys()),
+            "changed": len(changes),
+            "total_cost": total_cost,
+            "cost_change": total_cost - base_cost,
+            "avg_lead_time": avg_lead_time,
+            "lead_time_change": avg_lead_time - base_lead_time,
+            "carried": stats.get("carried", 0),
+            "plans_reused": plans_reused,
+            "seconds": seconds
+        }
+        return row, changes
+
+
+def _run_scenario(scenario: Scenario) -> Tuple[Dict[str, Any], List[Dict[str, Any]]]:
+    """Worker entry point: run a scenario on the runner inherited from the parent."""
+    return _runner.run_scenario(scenario)
+
+
+def _changed_methods(old: Dict[str, Any], new: Dict[str, Any]) -> Set[str]:
+    """Evaluator methods whose definition differs between two configs."""
+    old_methods = old.get("evaluators", {})
+    new_methods = new.get("evaluators", {})
+    return {name for name in set(old_methods) | set(new_methods) if old_methods.get(name) != new_methods.get(name)}
+
+
+def _uses(element, methods: Set[str]) -> bool:
+    """Whether a node or edge evaluates any of the methods."""
+    return bool(methods) and bool({element.cost_method, element.feasibility_method, element.lt_method} & methods)
+
+
+def _evict(evaluator, methods: Set[str], diff: NetworkDiff) -> None:
+    """Evict cache entries of changed methods, nodes and edges."""
+    if hasattr(evaluator.evaluate, "invalidate_cache"):
+        for method in methods:
+            evaluator.evaluate.invalidate_cache(method=method)
+    evict_changed_entries(evaluator, diff)
+
+
+def _locate(config: Dict[str, Any], path: str) -> Tuple[Dict[str, Any], str]:
+    """Parent dict and key of a dotted config path; the parents must exist."""
+    *parents, key = path.split(".")
+    parent = config
+    for name in parents:
+        parent = parent.get(name) if isinstance(parent, dict) else None
+        if not isinstance(parent, dict):
+            raise ValueError(f"Unknown config path: {path}")
+    return parent, key
+
+
+def _scaled(value: Any, factor: float) -> Any:
+    """A config value with every number in it multiplied by factor."""
+    if isinstance(value, bool):
+        return value
+    if isinstance(value, (int, float)):
+        return value * factor
+    if isinstance(value, dict):
+        return {key: _scaled(item, factor) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_scaled(item, factor) for item in value]
+    return value
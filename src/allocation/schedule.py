@@ -0,0 +1,162 @@
+"""Departure schedules and time-dependent routing over the network."""
+
+import heapq
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from ..models import Chunk, PathEvaluation
+from ..graph import DiGraph
+from ..utils import parse_departures
+
+
+# Label orderings: which of (cost, arrival day) is minimized first
+OBJECTIVES = ("earliest", "cheapest")
+
+
+class DepartureSchedule:
+    """Weekly departure days of a lane."""
+    
+    def __init__(self, weekdays: Iterable[int]):
+        days = set(weekdays)
+        if not days:
+            raise ValueError("A schedule needs at least one departure day")
+        self.weekdays = days
+        # Days to wait for the next departure, by weekday of arrival (Monday = 0)
+        self.waits = tuple(min((day - weekday) % 7 for day in days) for weekday in range(7))
+    
+    def departure(self, day: int) -> int:
+        """First departure on or after an ordinal day."""
+        # Ordinal day 1 (0001-01-01) is a Monday
+        return day + self.waits[(day - 1) % 7]
+
+
+class ScheduledRouter:
+    """Earliest-arrival and cheapest paths through lanes with fixed departures.
+    
+    Times are ordinal days. A chunk spends each node's lead time at the node,
+    waits there for the next departure of a scheduled lane, then spends the
+    lane's lead time in transit; unscheduled lanes depart at once. Waiting
+    never lets a later arrival leave earlier (FIFO), so a label-setting
+    search over the network itself finds the best path without expanding
+    it over time: memory grows with nodes and edges, not with the horizon.
+    With a hop limit the labels are per node and hop count, so the search
+    sees the same paths as a ``PathFinder`` with that ``max_hops``.
+    """
+    
+    def __init__(self, path_evaluator):
+        self.path_evaluator = path_evaluator
+        self.schedules: Dict[Tuple[str, str], DepartureSchedule] = {}
+        for u, v, data in path_evaluator.graph.edges(data=True):
+            weekdays = parse_departures(data.get("departures"))
+            if weekdays is not None:
+                self.schedules[(u, v)] = DepartureSchedule(weekdays)
+    
+    def scheduled(self, path: List[str]) -> bool:
+        """Whether a path uses any scheduled lane."""
+        return bool(self.schedules) and any(edge in self.schedules for edge in zip(path, path[1:]))
+    
+    def lead_time(self, evaluation: PathEvaluation, start: int) -> int:
+        """Lead time of an evaluated path departing the origin on day ``start``, waits included."""
+        path = evaluation.path
+        if not self.scheduled(path):
+            return evaluation.total_lead_time
+        
+        node_lts: Dict[str, int] = {}
+        edge_lts: Dict[Tuple[str, str], int] = {}
+        for step in evaluation.evaluations:
+            if step["type"] == "node_lt":
+                node_lts[step["name"]] = int(step["lead_time"])
+            elif step["type"] == "edge_lt":
+                edge_lts[(step["from"], step["to"])] = int(step["lead_time"])
+        
+        day = start
+        for i, node in enumerate(path):
+            day += node_lts.get(node, 0)
+            if i + 1 < len(path):
+                edge = (node, path[i + 1])
+                schedule = self.schedules.get(edge)
+                if schedule is not None:
+                    day = schedule.departure(day)
+                day += edge_lts.get(edge, 0)
+        return day - start
+    
+    def solve(self, chunk: Chunk, graph: DiGraph, destinations: Set[str], start: int,
+              objective: str = "earliest", max_hops: Optional[int] = None) -> Optional[Tuple[List[str], int]]:
+        """Best path from the chunk's origin to any destination, and its arrival day.
+        
+        ``earliest`` minimizes the arrival day, then cost; ``cheapest``
+        minimizes cost, then the arrival day. Paths have at most
+        ``max_hops`` edges when it is given. Node and edge steps are
+        evaluated once each, as they are reached.
+        """
+        if objective not in OBJECTIVES:
+            raise ValueError(f"Unknown objective {objective!r}, expected one of {OBJECTIVES}")
+        cheapest = objective == "cheapest"
+        evaluator = self.path_evaluator
+        origin = chunk.origin
+        if origin not in graph:
+            return None
+        
+        node_steps: Dict[str, Tuple[float, int, bool]] = {}
+        
+        def node_step(node: str) -> Tuple[float, int, bool]:
+            if node not in node_steps:
+                node_steps[node] = evaluator.evaluate_node(chunk, node)[:3]
+            return node_steps[node]
+        
+        cost, lead_time, feasible = node_step(origin)
+        if not feasible:
+            return None
+        
+        # Label per (node, hops): (cost, ready day) ordered by the objective.
+        # Without a hop limit every state has hops 0, one label per node.
+        root = (origin, 0)
+        labels: Dict[Tuple[str, int], Tuple[float, int]] = {root: (cost, start + lead_time)}
+        parents: Dict[Tuple[str, int], Optional[Tuple[str, int]]] = {root: None}
+        heap = [(_key(labels[root], cheapest), root)]
+        # Hop counts settled per node; a later label with as many hops is no better
+        settled: Dict[str, List[int]] = {}
+        
+        while heap:
+            _, state = heapq.heappop(heap)
+            node, hops = state
+            if any(done <= hops for done in settled.get(node, ())):
+                continue
+            settled.setdefault(node, []).append(hops)
+            cost, day = labels[state]
+            
+            if node in destinations:
+                path = [node]
+                while parents[state] is not None:
+                    state = parents[state]
+                    path.append(state[0])
+                return path[::-1], day
+            
+            if max_hops is not None and hops >= max_hops:
+                continue
+            next_hops = hops + 1 if max_hops is not None else 0
+            
+            for succ in graph.successors(node):
+                if any(done <= next_hops for done in settled.get(succ, ())):
+                    continue
+                edge_cost, edge_lt, edge_feasible, _ = evaluator.evaluate_edge(chunk, node, succ)
+                if not edge_feasible:
+                    continue
+                node_cost, node_lt, node_feasible = node_step(succ)
+                if not node_feasible:
+                    continue
+                
+                schedule = self.schedules.get((node, succ))
+                departure = schedule.departure(day) if schedule is not None else day
+                label = (cost + edge_cost + node_cost, departure + edge_lt + node_lt)
+                target = (succ, next_hops)
+                if target not in labels or _key(label, cheapest) < _key(labels[target], cheapest):
+                    labels[target] = label
+                    parents[target] = state
+                    heapq.heappush(heap, (_key(label, cheapest), target))
+        
+        return None
+
+
+def _key(label: Tuple[float, int], cheapest: bool) -> Tuple:
+    """Heap key of a (cost, day) label for the objective."""
+    return label if cheapest else (label[1], label[0])
@@ -0,0 +1,157 @@
+"""Runner-up paths and break-even lane rate changes of an allocation."""
+
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+from ..models import Chunk, Product, AllocationResult
+from ..utils.results_io import PATH_SEPARATOR
+from .allocator import Allocator
+from .path_costs import PathCosts, StepPlan, path_totals, step_plan
+
+
+SKU_COLUMNS = ["razin", "chunk_id", "path", "cost", "runner_up", "runner_up_cost", "cost_gap",
+               "critical_lane", "critical_change"]
+LANE_COLUMNS = ["razin", "from_node", "to_node", "on_path", "lane_cost", "break_even"]
+
+
+class SensitivityAnalyzer:
+    """How far each lane's rate can move before a chunk switches paths.
+    
+    Scaling a lane's rate by ``1 + x`` changes its cost ``c`` for a chunk by
+    ``x * c`` on every path through it. For a chunk on path ``b`` (the
+    cheapest feasible path, as CM3 is the same on every path), a lane on
+    ``b`` breaks even at ``x = (C_p - C_b) / c``, ``p`` being the cheapest path
+    avoiding it; a lane off ``b`` at ``x = -(C_p - C_b) / c``, ``p`` being the
+    cheapest path through it, if that cut is at most 100%. The runner-up is
+    the next best feasible path.
+    
+    Step costs of every candidate path come from ``PathCosts`` for all
+    chunks of a feasibility class and origin at once, so path totals and
+    break-evens are array operations over chunks. Costs are before
+    container consolidation.
+    """
+    
+    def __init__(self, allocator: Allocator):
+        self.allocator = allocator
+        self.path_costs = PathCosts(allocator.path_evaluator)
+    
+    def analyze(self, products: List[Product],
+                results: List[AllocationResult]) -> Tuple["pd.DataFrame", "pd.DataFrame"]:
+        """Per-SKU runner-up and most sensitive lane, and per-SKU, per-lane break-evens.
+        
+        Rows are in product order; chunks without a result, or whose
+        selected path is not among the candidates, are left out.
+        """
+        allocator = self.allocator
+        selected = {result.chunk_id: tuple(result.selected_path) for result in results}
+        chunks = [chunk for chunk in allocator._create_chunks(products) if chunk.chunk_id in selected]
+        position = {chunk.chunk_id: i for i, chunk in enumerate(chunks)}
+        
+        by_key: Dict[Tuple[int, str], List[Chunk]] = {}
+        for chunk in chunks:
+            by_key.setdefault((allocator.feasibility.classify(chunk), chunk.origin), []).append(chunk)
+        destinations = allocator.network.get_destinations()
+        groups = [
+            (members, allocator.class_path_finder(members[0]).find_all_paths(origin, destinations))
+            for (_, origin), members in by_key.items()
+        ]
+        plans = [step_plan(paths) for _, paths in groups]
+        
+        skus: List[Dict[str, np.ndarray]] = []
+        lanes: List[Dict[str, np.ndarray]] = []
+        path_ids = [{tuple(path): p for p, path in enumerate(paths)} for _, paths in groups]
+        names = [np.array([PATH_SEPARATOR.join(path) for path in paths] + [None], dtype=object)
+                 for _, paths in groups]
+        for g, first, end, costs, feasible in self.path_costs.blocks(groups, plans):
+            members = groups[g][0][first:end]
+            chosen = np.array([path_ids[g].get(selected[chunk.chunk_id], -1) for chunk in members])
+            sku, lane = self._block(plans[g], names[g], members, chosen, costs, feasible)
+            positions = np.array([position[chunk.chunk_id] for chunk in members])
+            sku["order"] = positions[sku["order"]]
+            lane["order"] = positions[lane["order"]]
+            skus.append(sku)
+            lanes.append(lane)
+        
+        return _frame(skus, SKU_COLUMNS), _frame(lanes, LANE_COLUMNS)
+    
+    def _block(self, plan: StepPlan, names: np.ndarray, members: List[Chunk], chosen: np.ndarray,
+               costs: np.ndarray, feasible: np.ndarray) -> Tuple[Dict[str, np.ndarray], Dict[str, np.ndarray]]:
+        """SKU and lane columns for one block of chunks; ``order`` holds block column indices."""
+        steps, rows = plan
+        total, allowed = path_totals(rows, costs, feasible)
+        total[~allowed | np.isnan(total)] = np.inf
+        
+        # Chunks whose selected path is a candidate
+        kept = np.flatnonzero(chosen >= 0)
+        chosen = chosen[kept]
+        total = total[:, kept]
+        columns = np.arange(len(kept))
+        cost = total[chosen, columns]
+        
+        others = total.copy()
+        others[chosen, columns] = np.inf
+        runner_up = others.argmin(axis=0)
+        runner_up_cost = others[runner_up, columns]
+        has_runner_up = np.isfinite(runner_up_cost)
+        
+        # Lanes of the candidate paths, and which paths use them
+        edge_rows = [s for s, step in enumerate(steps) if step[0] == "edge"]
+        uses = np.zeros((len(rows), len(steps) + 1), dtype=bool)
+        uses[np.arange(len(rows))[:, None], rows] = True
+        uses = uses[:, edge_rows]
+        lane_cost = costs[edge_rows][:, kept]
+        on_path = uses[chosen].T
+        
+        # Cheapest competing path per lane: avoiding lanes on the chosen path, through lanes off it
+        competing = np.empty(lane_cost.shape)
+        for e in range(len(edge_rows)):
+            through = np.where(uses[:, e, None], total, np.inf).min(axis=0)
+            avoiding = np.where(uses[:, e, None], np.inf, total).min(axis=0)
+            competing[e] = np.where(on_path[e], avoiding, through)
+        
+        with np.errstate(divide="ignore", invalid="ignore"):
+            gap = (competing - cost) / lane_cost
+            break_even = np.where(on_path, gap, -gap)
+        valid = np.isfinite(break_even) & (lane_cost > 0) & (break_even >= -1)
+        
+        closest = np.where(valid, np.abs(break_even), np.inf).argmin(axis=0)
+        has_critical = valid[closest, columns]
+        lane_names = np.array([PATH_SEPARATOR.join(steps[s][1:]) for s in edge_rows] + [None], dtype=object)
+        critical = np.where(has_critical, closest, len(edge_rows))
+        
+        sku = {
+            "order": kept,
+            "razin": np.array([members[i].razin for i in kept.tolist()], dtype=object),
+            "chunk_id": np.array([members[i].chunk_id for i in kept.tolist()], dtype=object),
+            "path": names[chosen],
+            "cost": cost,
+            "runner_up": names[np.where(has_runner_up, runner_up, len(names) - 1)],
+            "runner_up_cost": np.where(has_runner_up, runner_up_cost, np.nan),
+            "cost_gap": np.where(has_runner_up, runner_up_cost - cost, np.nan),
+            "critical_lane": lane_names[critical],
+            "critical_change": np.where(has_critical, break_even[closest, columns], np.nan)
+        }
+        
+        e, i = np.nonzero(valid)
+        lane = {
+            "order": kept[i],
+            "razin": sku["razin"][i],
+            "from_node": np.array([steps[s][1] for s in edge_rows], dtype=object)[e],
+            "to_node": np.array([steps[s][2] for s in edge_rows], dtype=object)[e],
+            "on_path": on_path[e, i],
+            "lane_cost": lane_cost[e, i],
+            "break_even": break_even[e, i]
+        }
+        return sku, lane
+
+
+def _frame(parts: List[Dict[str, np.ndarray]], columns: List[str]) -> "pd.DataFrame":
+    """Concatenate column blocks into a frame in product order."""
+    import pandas as pd
+    
+    if not parts:
+        return pd.DataFrame(columns=columns)
+    data = {name: np.concatenate([part[name] for part in parts]) for name in ["order"] + columns}
+    order = np.argsort(data.pop("order"), kind="stable")
+    return pd.DataFrame({name: data[name][order] for name in columns})
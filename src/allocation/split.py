@@ -0,0 +1,210 @@
+"""Split allocation of products across destinations by demand share."""
+
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from ..models import Chunk, Product, AllocationResult
+from ..graph import NetworkBuilder
+from ..evaluators import BaseEvaluator
+from ..utils import chunk_fingerprint
+from ..utils.metrics import Metrics
+from .allocator import Allocator
+from .path_costs import PathCosts, PathGroup, path_totals, step_plan
+
+
+REPORT_COLUMNS = ["razin", "chunk_id", "destination", "demand", "share", "qty", "total_cost", "total_lead_time"]
+
+
+def split_quantities(qty: np.ndarray, demand: np.ndarray) -> np.ndarray:
+    """Whole units of each product per destination, in proportion to demand.
+    
+    Units are rounded down, then the units left over go one each to the
+    destinations with the largest remainders (earlier columns first on
+    ties), so every row with demand sums to its quantity. Rows without
+    demand get no units.
+    """
+    qty = np.asarray(qty, dtype=np.int64)
+    demand = np.asarray(demand, dtype=np.float64)
+    totals = demand.sum(axis=1)
+    has_demand = totals > 0
+    exact = np.divide(demand * qty[:, None], totals[:, None], out=np.zeros(demand.shape),
+                      where=has_demand[:, None])
+    units = np.floor(exact).astype(np.int64)
+    left_over = np.where(has_demand, qty - units.sum(axis=1), 0)
+    
+    # Rank of each remainder within its row, largest first
+    rank = np.argsort(np.argsort(units - exact, axis=1, kind="stable"), axis=1, kind="stable")
+    return units + (rank < left_over[:, None])
+
+
+class SplitAllocator(Allocator):
+    """Splits each product's units across FCs by demand and allocates each split.
+    
+    A product with demand is split into one chunk per FC with units
+    (``split_quantities``); each split is allocated to the best path to its
+    own FC only. Products without demand are allocated whole, as by
+    ``Allocator``. Splits of the same feasibility class, origin and FC share
+    one path list from the per-destination path trees, and their path
+    costs are computed together as arrays (``PathCosts``). Only the
+    selected path is then evaluated per split, for the result.
+    """
+    
+    def __init__(self, network_builder: NetworkBuilder, evaluator: BaseEvaluator, demand: "pd.DataFrame",
+                 metrics: Optional[Metrics] = None):
+        super().__init__(network_builder, evaluator, metrics=metrics)
+        unknown = sorted(set(demand.columns) - set(network_builder.get_destinations()))
+        if unknown:
+            raise ValueError(f"Demand for unknown destinations: {', '.join(unknown)}")
+        self.demand = demand
+        self.path_costs = PathCosts(self.path_evaluator)
+        # Split rows of the last run, one per allocated split or unsplit product
+        self.split_report: Optional["pd.DataFrame"] = None
+    
+    def search_signature(self) -> Dict[str, Any]:
+        signature = super().search_signature()
+        signature["split"] = True
+        return signature
+    
+    def allocate_products(self, products: List[Product]) -> List[AllocationResult]:
+        """Allocate each product's units across FCs in proportion to their demand."""
+        with self.metrics.phase("chunking"):
+            chunks = self._create_chunks(products)
+            splits, rows = self._split_chunks(chunks)
+        self.metrics.incr("split_chunks", len(splits))
+        
+        destinations = self.network.get_destinations()
+        with self.metrics.phase("allocate"):
+            allocated = self._allocate_splits(splits)
+            whole = [chunk for chunk, row in zip(chunks, rows) if row is None]
+            for result in self._allocate_chunks(whole, destinations, self.allocate_chunk):
+                allocated[result.chunk_id] = result
+        
+        # Results in product order, splits in demand column order
+        allocated_chunks = [split for split, _ in splits] + whole
+        results = [allocated[chunk.chunk_id] for chunk in self._in_product_order(chunks, splits, rows)
+                   if chunk.chunk_id in allocated]
+        self._consolidate(results, allocated_chunks)
+        self._assess_stockout(results)
+        self.split_report = self._report(chunks, splits, rows, allocated)
+        
+        self._record_run(allocated_chunks, results)
+        return results
+    
+    def _split_chunks(self, chunks: List[Chunk]) -> Tuple[List[Tuple[Chunk, str]], List[Optional[np.ndarray]]]:
+        """Split chunks with demand into per-FC chunks; returns (split, FC) pairs and each chunk's units row."""
+        fcs = list(self.demand.columns)
+        demand = self.demand.reindex([chunk.razin for chunk in chunks], fill_value=0.0).to_numpy()
+        units = split_quantities(np.array([chunk.qty for chunk in chunks], dtype=np.int64), demand)
+        
+        splits = []
+        rows: List[Optional[np.ndarray]] = []
+        for chunk, chunk_units in zip(chunks, units):
+            if not chunk_units.any():
+                rows.append(None)
+                continue
+            rows.append(chunk_units)
+            for fc, qty in zip(fcs, chunk_units.tolist()):
+                if qty > 0:
+                    # Copied without validation: only the quantity changes
+                    product = chunk.product.model_copy(update={"qty": qty})
+                    split = chunk.model_copy(update={
+                        # Splits of a product with equal quantities differ by destination
+                        "chunk_id": chunk_fingerprint(product, f"{self.fingerprint}:{fc}"),
+                        "product": product
+                    })
+                    splits.append((split, fc))
+        return splits, rows
+    
+    def _in_product_order(self, chunks: List[Chunk], splits: List[Tuple[Chunk, str]],
+                          rows: List[Optional[np.ndarray]]) -> List[Chunk]:
+        """Whole chunks and splits in product order."""
+        ordered = []
+        next_split = iter(split for split, _ in splits)
+        for chunk, row in zip(chunks, rows):
+            if row is None:
+                ordered.append(chunk)
+            else:
+                ordered.extend(next(next_split) for _ in range(int(np.count_nonzero(row))))
+        return ordered
+    
+    def _allocate_splits(self, splits: List[Tuple[Chunk, str]]) -> Dict[str, AllocationResult]:
+        """Allocate splits, scoring the paths of all splits together."""
+        by_key: Dict[Tuple[int, str, str], List[Chunk]] = {}
+        for split, fc in splits:
+            by_key.setdefault((self.feasibility.classify(split), split.origin, fc), []).append(split)
+        
+        groups = []
+        with self.metrics.phase("path_enumeration", allocations=False):
+            for (_, origin, fc), members in by_key.items():
+                paths = self.class_path_finder(members[0]).find_all_paths(origin, {fc})
+                self.metrics.incr("paths_enumerated", len(paths) * len(members))
+                if not paths:
+                    for split in members:
+                        print(f"No paths found for chunk {split.chunk_id}")
+                    continue
+                groups.append((members, paths))
+        
+        with self.metrics.phase("split_costs"):
+            choices = self.select_paths(groups)
+        
+        results = {}
+        for (members, paths), best in zip(groups, choices):
+            for split, index in zip(members, best.tolist()):
+                if index < 0:
+                    print(f"No feasible path found for chunk {split.chunk_id}")
+                    continue
+                with self.metrics.phase("evaluation", allocations=False):
+                    evaluation = self.path_evaluator.evaluate_path(split, paths[index])
+                results[split.chunk_id] = self._build_result(split, evaluation)
+        return results
+    
+    def select_paths(self, groups: Sequence[PathGroup]) -> List[np.ndarray]:
+        """Index of the best feasible path for each chunk of each (chunks, paths) group, or -1.
+        
+        Picks the path ``allocate_chunk`` would: the highest CM3 score among
+        feasible paths, the first one on ties.
+        """
+        plans = [step_plan(paths) for _, paths in groups]
+        best = [np.empty(len(members), dtype=np.int64) for members, _ in groups]
+        for g, first, end, costs, feasible in self.path_costs.blocks(groups, plans):
+            total, allowed = path_totals(plans[g][1], costs, feasible)
+            cm3 = np.array([chunk.cm3 for chunk in groups[g][0][first:end]], dtype=np.float64)
+            with np.errstate(divide="ignore", invalid="ignore"):
+                scores = np.where(total > 0, cm3 / total, np.inf)
+            scores[np.isnan(total) | ~allowed] = -np.inf
+            choice = scores.argmax(axis=0)
+            best[g][first:end] = np.where(np.isneginf(scores[choice, np.arange(end - first)]), -1, choice)
+        return best
+    
+    def _report(self, chunks: List[Chunk], splits: List[Tuple[Chunk, str]], rows: List[Optional[np.ndarray]],
+                allocated: Dict[str, AllocationResult]) -> "pd.DataFrame":
+        """One row per split, or per product allocated whole."""
+        import pandas as pd
+        
+        fcs = list(self.demand.columns)
+        records = []
+        next_split = iter(splits)
+        for chunk, row in zip(chunks, rows):
+            if row is None:
+                parts = [(chunk, None, 0.0, 1.0)]
+            else:
+                demand = self.demand.loc[chunk.razin].to_numpy()
+                total = demand.sum()
+                parts = []
+                for column in np.flatnonzero(row).tolist():
+                    split, fc = next(next_split)
+                    parts.append((split, fc, float(demand[column]), float(demand[column] / total)))
+            for part, fc, demand, share in parts:
+                result = allocated.get(part.chunk_id)
+                records.append((
+                    part.razin, part.chunk_id,
+                    fc if result is None else result.selected_path[-1],
+                    demand, share, part.qty,
+                    np.nan if result is None else result.total_cost,
+                    np.nan if result is None else result.total_lead_time
+                ))
+        report = pd.DataFrame.from_records(records, columns=REPORT_COLUMNS)
+        report["total_lead_time"] = report["total_lead_time"].astype("Int64")
+        return report
+
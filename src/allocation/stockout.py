@@ -0,0 +1,124 @@
+"""Monte Carlo stockout risk from lane lead-time variability."""
+
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from ..models import AllocationResult
+from ..graph import DiGraph
+from ..evaluators import LookupTable
+
+
+# Upper bound on float64 cells (paths x samples) summed in one block
+BLOCK_CELLS = 1 << 22
+
+
+class StockoutSimulator:
+    """Estimates how likely each allocation arrives later than planned.
+    
+    A lane whose cluster pair is listed in the shipping times runs late
+    with probability ``1 - reliability_score``; a late lane adds an
+    exponentially distributed delay with mean ``delay_factor`` times its
+    transit days. Unlisted lanes are taken as reliable. An allocation stocks
+    out in a sample when the total delay along its path exceeds
+    ``buffer_days``, and is flagged at risk when that happens in more than
+    ``threshold`` of the samples.
+    
+    Delays are drawn once per distinct lane and summed per distinct path,
+    so the cost grows with the number of distinct paths, not of results.
+    """
+    
+    def __init__(self, graph: DiGraph, shipping_times: Optional[LookupTable] = None, samples: int = 1000,
+                 seed: Optional[int] = 0, buffer_days: float = 2.0, delay_factor: float = 0.5,
+                 threshold: float = 0.1):
+        if samples < 1:
+            raise ValueError(f"Sample count must be positive, got {samples}")
+        self.graph = graph
+        self.shipping_times = shipping_times
+        self.samples = samples
+        self.seed = seed
+        self.buffer_days = buffer_days
+        self.delay_factor = delay_factor
+        self.threshold = threshold
+    
+    @classmethod
+    def from_config(cls, graph: DiGraph, config: Dict[str, Any]) -> Optional["StockoutSimulator"]:
+        """Simulator for the ``stockout`` section of an evaluator config, if any."""
+        settings = config.get("stockout")
+        if settings is None:
+            return None
+        
+        settings = dict(settings)
+        table_path = settings.pop("shipping_times", config.get("tables", {}).get("shipping_times"))
+        shipping_times = None
+        if table_path:
+            shipping_times = LookupTable.from_csv(Path(table_path), ["origin_cluster", "dest_cluster"],
+                                                  ["transit_days", "reliability_score"])
+        return cls(graph, shipping_times, **settings)
+    
+    def lanes(self, edges: Sequence[Tuple[str, str]]) -> Tuple[np.ndarray, np.ndarray]:
+        """Reliability and mean delay when late, per edge."""
+        reliability = np.ones(len(edges))
+        mean_delay = np.zeros(len(edges))
+        if self.shipping_times is None or not edges:
+            return reliability, mean_delay
+        
+        nodes = self.graph.nodes
+        rows = self.shipping_times.rows(
+            [nodes[u].get("cluster", "") for u, _ in edges],
+            [nodes[v].get("cluster", "") for _, v in edges]
+        )
+        listed = rows >= 0
+        values = self.shipping_times.values
+        reliability[listed] = values["reliability_score"][rows[listed]]
+        mean_delay[listed] = self.delay_factor * values["transit_days"][rows[listed]]
+        return reliability, mean_delay
+    
+    def probabilities(self, paths: Sequence[Sequence[str]]) -> np.ndarray:
+        """Stockout probability of each path."""
+        # Distinct paths, and the unreliable lanes they use
+        path_ids: Dict[Tuple[str, ...], int] = {}
+        inverse = np.fromiter((path_ids.setdefault(tuple(path), len(path_ids)) for path in paths),
+                              dtype=np.int64, count=len(paths))
+        distinct = list(path_ids)
+        
+        edges = sorted({(path[i], path[i + 1]) for path in distinct for i in range(len(path) - 1)})
+        reliability, mean_delay = self.lanes(edges)
+        risky = reliability < 1
+        lane_ids = {edge: i for i, edge in enumerate(e for e, r in zip(edges, risky) if r)}
+        reliability, mean_delay = reliability[risky], mean_delay[risky]
+        
+        if not lane_ids:
+            return np.zeros(len(paths))
+        
+        # Padded (paths x lanes) matrix; the padding index is an always-zero row
+        width = max(sum((path[i], path[i + 1]) in lane_ids for i in range(len(path) - 1)) for path in distinct)
+        plan = np.full((len(distinct), max(width, 1)), len(lane_ids), dtype=np.int64)
+        for p, path in enumerate(distinct):
+            used = [lane_ids[edge] for edge in zip(path, path[1:]) if edge in lane_ids]
+            plan[p, :len(used)] = used
+        
+        # Delays per lane and sample, drawn once for all paths
+        rng = np.random.default_rng(self.seed)
+        late = rng.random((len(lane_ids), self.samples)) >= reliability[:, None]
+        delays = np.zeros((len(lane_ids) + 1, self.samples))
+        delays[:-1] = rng.exponential(1.0, late.shape) * mean_delay[:, None] * late
+        
+        probability = np.empty(len(distinct))
+        block = max(1, BLOCK_CELLS // self.samples)
+        for start in range(0, len(distinct), block):
+            rows = plan[start:start + block]
+            total = delays[rows[:, 0]].copy()
+            for column in range(1, rows.shape[1]):
+                total += delays[rows[:, column]]
+            probability[start:start + block] = (total > self.buffer_days).mean(axis=1)
+        
+        return probability[inverse]
+    
+    def apply(self, results: List[AllocationResult]) -> None:
+        """Set ``stockout_probability`` and ``stockout_risk`` on results in place."""
+        probabilities = self.probabilities([result.selected_path for result in results])
+        for result, probability in zip(results, probabilities.tolist()):
+            result.stockout_probability = probability
+            result.stockout_risk = probability > self.threshold
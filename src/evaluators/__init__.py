@@ -2,11 +2,17 @@
 
 from .base import BaseEvaluator, EvaluatorRegistry
 from .simple import SimpleEvaluator
-from .config_loader import load_evaluator_config
+from .table import TableEvaluator, LookupTable
+from .config_loader import load_evaluator_config, create_evaluator, reload_evaluator_config, apply_evaluator_config
 
 __all__ = [
     "BaseEvaluator",
     "EvaluatorRegistry",
     "SimpleEvaluator",
-    "load_evaluator_config"
+    "TableEvaluator",
+    "LookupTable",
+    "load_evaluator_config",
+    "create_evaluator",
+    "reload_evaluator_config",
+    "apply_evaluator_config"
 ]
\ No newline at end of file
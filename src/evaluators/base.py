@@ -1,19 +1,45 @@
 """Base evaluator interface and registry."""
 
 from abc import ABC, abstractmethod
-from typing import Any, Dict, Type
+from typing import Any, Dict, Optional, Set, Tuple, Type
 
 from ..models import EvaluationContext
+from ..models.evaluation import ALL_KEY_FIELDS
 from ..utils import memoize
+from ..utils.memoization import MethodStatsTable, instrument, _method_stats
 
 
 class BaseEvaluator(ABC):
     """Base class for all evaluators."""
     
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        # Evaluators that do not memoize still get per-method call accounting
+        evaluate = cls.__dict__.get("evaluate")
+        if evaluate is not None and not hasattr(evaluate, "method_stats"):
+            cls.evaluate = instrument(evaluate)
+    
     @abstractmethod
     def evaluate(self, context: EvaluationContext) -> Any:
         """Evaluate based on context."""
         pass
+    
+    def chunk_fields(self, method: str) -> Optional[Set[str]]:
+        """Chunk fields a method's result depends on, or None if unknown."""
+        return None
+    
+    def key_fields(self, method: str) -> Tuple[str, ...]:
+        """Product fields in a method's memo key: those it reads, else all of them and the SKU."""
+        cache = self.__dict__.setdefault("_key_fields", {})
+        fields = cache.get(method)
+        if fields is None:
+            read = self.chunk_fields(method)
+            fields = cache[method] = ALL_KEY_FIELDS if read is None else tuple(sorted(read))
+        return fields
+    
+    def method_stats(self) -> MethodStatsTable:
+        """Calls, hits, misses and latency per method and kind."""
+        return _method_stats
 
 
 class EvaluatorRegistry:
@@ -2,14 +2,16 @@
 
 import json
 from pathlib import Path
-from typing import Dict, Any
+from typing import Dict, Any, Set
 
-from .base import EvaluatorRegistry
+from .base import BaseEvaluator, EvaluatorRegistry
 from .simple import SimpleEvaluator
+from .table import TableEvaluator
 
 
 # Register default evaluators
 EvaluatorRegistry.register("simple", SimpleEvaluator)
+EvaluatorRegistry.register("table", TableEvaluator)
 
 
 def load_evaluator_config(config_path: Path) -> Dict[str, Any]:
@@ -51,4 +53,35 @@ def create_evaluator(config: Dict[str, Any]) -> BaseEvaluator:
     """Create evaluator instance from config."""
     evaluator_type = config.get("evaluator_type", "simple")
     evaluator_class = EvaluatorRegistry.get(evaluator_type)
-    return evaluator_class(config)
\ No newline at end of file
+    return evaluator_class(config)
+
+
+def reload_evaluator_config(evaluator: BaseEvaluator, config_path: Path) -> Set[str]:
+    """Reload an evaluator's config file in place; see ``apply_evaluator_config``."""
+    return apply_evaluator_config(evaluator, load_evaluator_config(config_path))
+
+
+def apply_evaluator_config(evaluator: BaseEvaluator, new_config: Dict[str, Any]) -> Set[str]:
+    """Swap in an evaluator's config and evict stale cache entries.
+    
+    Only cached results of methods whose definition changed are invalidated.
+    Returns the names of the changed methods.
+    """
+    if new_config.get("evaluator_type", "simple") != evaluator.config.get("evaluator_type", "simple"):
+        raise ValueError("Changing evaluator_type requires creating a new evaluator")
+    
+    old_methods = evaluator.config.get("evaluators", {})
+    new_methods = new_config.get("evaluators", {})
+    
+    changed = {
+        name for name in set(old_methods) | set(new_methods)
+        if old_methods.get(name) != new_methods.get(name)
+    }
+    
+    evaluator.config = new_config
+    
+    if hasattr(evaluator.evaluate, 'invalidate_cache'):
+        for name in changed:
+            evaluator.evaluate.invalidate_cache(method=name)
+    
+    return changed
\ No newline at end of file
@@ -0,0 +1,287 @@
+"""Safe formulas over evaluation context fields.
+
+A method in ``config["evaluators"]`` with a ``"formula"`` is evaluated from
+that formula instead of a built-in method. Formulas use a subset of Python
+expression syntax:
+
+- numbers, strings, ``True``/``False``
+- ``+ - * / // % **``, comparisons (chained too), ``in``/``not in`` against
+  a literal tuple or list, ``and``/``or``/``not`` and ``a if cond else b``
+- ``min``, ``max``, ``abs``, ``ceil`` and ``floor``
+- the context fields in ``VARIABLES``
+- the method's numeric settings by name, e.g. ``average_storage_days``
+- the method's rate tables as functions, e.g.
+  ``base_rates(from_cluster, to_cluster, default=100)``; table entries named
+  like ``"CN_to_US_West"`` are keyed by a pair, others by a single key, and
+  missing keys return ``default`` (0 if not given)
+
+Each formula is parsed and checked once, then compiled twice: to a Python
+function over one context's fields and to a NumPy kernel over columns of
+fields. Anything outside the subset is rejected with a ``ValueError``.
+"""
+
+import ast
+import math
+from functools import reduce
+from typing import Any, Callable, Dict, List, Mapping, Optional, Sequence, Tuple
+
+import numpy as np
+
+from ..models import EvaluationContext
+from ..models.evaluation import CHUNK_FIELDS
+
+
+# Context fields a formula can reference
+VARIABLES: Dict[str, Callable[[EvaluationContext], Any]] = {
+    "qty": lambda context: context.chunk.qty,
+    "cm3": lambda context: context.chunk.cm3,
+    "mc_volume": lambda context: context.chunk.product.mc_volume,
+    "parcels_per_mc": lambda context: context.chunk.product.parcels_per_mc,
+    "is_oversize": lambda context: context.chunk.product.is_oversize,
+    "hazmat_class": lambda context: context.chunk.product.hazmat_class or "",
+    "from_node": lambda context: context.from_node,
+    "to_node": lambda context: context.to_node,
+    "node": lambda context: context.current_node,
+    "from_cluster": lambda context: context.supplemental_data.get("from_cluster", ""),
+    "to_cluster": lambda context: context.supplemental_data.get("to_cluster", ""),
+    "cluster": lambda context: context.supplemental_data.get("cluster", ""),
+    "node_group": lambda context: context.supplemental_data.get("node_group", "")
+}
+
+# Scalar and NumPy implementations of the formula functions
+FUNCTIONS: Dict[str, Tuple[Callable, Callable]] = {
+    "min": (min, lambda *args: reduce(np.minimum, args)),
+    "max": (max, lambda *args: reduce(np.maximum, args)),
+    "abs": (abs, np.abs),
+    "ceil": (math.ceil, np.ceil),
+    "floor": (math.floor, np.floor)
+}
+
+_BINARY_OPS = (ast.Add, ast.Sub, ast.Mult, ast.Div, ast.FloorDiv, ast.Mod, ast.Pow)
+_UNARY_OPS = (ast.UAdd, ast.USub, ast.Not)
+_COMPARE_OPS = (ast.Eq, ast.NotEq, ast.Lt, ast.LtE, ast.Gt, ast.GtE, ast.In, ast.NotIn)
+
+# Helpers only the NumPy kernels see; formula names cannot start with "_"
+_KERNEL_HELPERS = {
+    "_and": np.logical_and,
+    "_or": np.logical_or,
+    "_not": np.logical_not,
+    "_where": np.where,
+    "_isin": lambda values, choices: np.isin(values, list(choices))
+}
+
+
+class _Table:
+    """A rate table from a method's config, callable with scalar or array keys."""
+    
+    def __init__(self, name: str, entries: Dict[str, Any]):
+        # Deferred: the table module imports SimpleEvaluator, which compiles formulas
+        from .table import LookupTable
+        
+        keys = [tuple(key.split("_to_", 1)) if "_to_" in key else (key,) for key in entries]
+        self.arity = len(keys[0])
+        if any(len(key) != self.arity for key in keys):
+            raise ValueError(f"Table {name} mixes pair keys (\"A_to_B\") and single keys")
+        self.entries = {key: float(value) for key, value in zip(keys, entries.values())}
+        self.table = LookupTable.from_columns(list(zip(*keys)), {"value": list(self.entries.values())})
+    
+    def get(self, *key: Any, default: float = 0.0) -> float:
+        return self.entries.get(key, default)
+    
+    def get_many(self, *keys: Any, default: float = 0.0) -> np.ndarray:
+        keys = np.broadcast_arrays(*[np.atleast_1d(np.asarray(key, dtype=object)) for key in keys])
+        return self.table.get_many("value", *keys, default=default)
+
+
+class _Resolver(ast.NodeTransformer):
+    """Rejects anything outside the formula language and inlines settings."""
+    
+    def __init__(self, constants: Dict[str, Any], tables: Dict[str, _Table]):
+        self.constants = constants
+        self.tables = tables
+        self.variables = set()
+    
+    def generic_visit(self, node):
+        raise ValueError(f"Unsupported syntax: {type(node).__name__}")
+    
+    def visit_Constant(self, node):
+        if not isinstance(node.value, (int, float, str)):
+            raise ValueError(f"Unsupported constant: {node.value!r}")
+        return node
+    
+    def visit_Name(self, node):
+        if node.id in VARIABLES:
+            self.variables.add(node.id)
+            return node
+        if node.id in self.constants:
+            return ast.copy_location(ast.Constant(self.constants[node.id]), node)
+        raise ValueError(f"Unknown name: {node.id}")
+    
+    def visit_BinOp(self, node):
+        if not isinstance(node.op, _BINARY_OPS):
+            raise ValueError(f"Unsupported operator: {type(node.op).__name__}")
+        node.left, node.right = self.visit(node.left), self.visit(node.right)
+        return node
+    
+    def visit_UnaryOp(self, node):
+        if not isinstance(node.op, _UNARY_OPS):
+            raise ValueError(f"Unsupported operator: {type(node.op).__name__}")
+        node.operand = self.visit(node.operand)
+        return node
+    
+    def visit_BoolOp(self, node):
+        node.values = [self.visit(value) for value in node.values]
+        return node
+    
+    def visit_IfExp(self, node):
+        node.test, node.body, node.orelse = self.visit(node.test), self.visit(node.body), self.visit(node.orelse)
+        return node
+    
+    def visit_Compare(self, node):
+        for op, comparator in zip(node.ops, node.comparators):
+            if not isinstance(op, _COMPARE_OPS):
+                raise ValueError(f"Unsupported comparison: {type(op).__name__}")
+            if isinstance(op, (ast.In, ast.NotIn)) and not (
+                isinstance(comparator, (ast.Tuple, ast.List))
+                and all(isinstance(item, ast.Constant) for item in comparator.elts)
+            ):
+                raise ValueError("'in' needs a literal tuple or list of constants")
+        node.left = self.visit(node.left)
+        node.comparators = [
+            ast.Tuple([self.visit(item) for item in comparator.elts], ast.Load())
+            if isinstance(op, (ast.In, ast.NotIn)) else self.visit(comparator)
+            for op, comparator in zip(node.ops, node.comparators)
+        ]
+        return node
+    
+    def visit_Call(self, node):
+        name = node.func.id if isinstance(node.func, ast.Name) else None
+        if name in self.tables:
+            table = self.tables[name]
+            if len(node.args) != table.arity:
+                raise ValueError(f"Table {name} takes {table.arity} key(s), got {len(node.args)}")
+            if any(keyword.arg != "default" for keyword in node.keywords):
+                raise ValueError(f"Table {name} only takes a 'default' keyword")
+        elif name in FUNCTIONS:
+            if node.keywords or not node.args:
+                raise ValueError(f"{name}() takes positional arguments only")
+        else:
+            raise ValueError(f"Unknown function: {ast.unparse(node.func)}")
+        node.args = [self.visit(arg) for arg in node.args]
+        for keyword in node.keywords:
+            keyword.value = self.visit(keyword.value)
+        return node
+
+
+class _Vectorizer(ast.NodeTransformer):
+    """Rewrites a checked formula into elementwise NumPy operations."""
+    
+    def visit_BoolOp(self, node):
+        self.generic_visit(node)
+        combine = "_and" if isinstance(node.op, ast.And) else "_or"
+        return reduce(lambda left, right: _call(combine, left, right), node.values)
+    
+    def visit_UnaryOp(self, node):
+        self.generic_visit(node)
+        return _call("_not", node.operand) if isinstance(node.op, ast.Not) else node
+    
+    def visit_IfExp(self, node):
+        self.generic_visit(node)
+        return _call("_where", node.test, node.body, node.orelse)
+    
+    def visit_Compare(self, node):
+        self.generic_visit(node)
+        parts = []
+        left = node.left
+        for op, right in zip(node.ops, node.comparators):
+            if isinstance(op, ast.In):
+                parts.append(_call("_isin", left, right))
+            elif isinstance(op, ast.NotIn):
+                parts.append(_call("_not", _call("_isin", left, right)))
+            else:
+                parts.append(ast.Compare(left, [op], [right]))
+            left = right
+        return reduce(lambda first, second: _call("_and", first, second), parts)
+
+
+def _call(name: str, *args: ast.expr) -> ast.Call:
+    return ast.Call(ast.Name(name, ast.Load()), list(args), [])
+
+
+def _compile(body: ast.expr, variables: List[str], namespace: Dict[str, Any], source: str) -> Callable:
+    """Compile an expression into a function of ``variables``."""
+    arguments = ast.arguments(posonlyargs=[], args=[ast.arg(name) for name in variables],
+                              kwonlyargs=[], kw_defaults=[], defaults=[])
+    tree = ast.fix_missing_locations(ast.Expression(ast.Lambda(arguments, body)))
+    return eval(compile(tree, f"<formula {source!r}>", "eval"), {"__builtins__": {}, **namespace})
+
+
+class Formula:
+    """A compiled formula: call with a context, or ``batch`` over columns of fields."""
+    
+    def __init__(self, source: str, settings: Optional[Dict[str, Any]] = None):
+        self.source = source
+        settings = settings or {}
+        constants = {
+            name: value for name, value in settings.items()
+            if isinstance(value, (int, float)) and name not in VARIABLES
+        }
+        tables = {
+            name: _Table(name, value) for name, value in settings.items()
+            if isinstance(value, dict) and value and all(isinstance(rate, (int, float)) for rate in value.values())
+        }
+        
+        try:
+            tree = ast.parse(source.strip(), mode="eval")
+        except SyntaxError as e:
+            raise ValueError(f"Invalid formula {source!r}: {e.msg}") from None
+        
+        resolver = _Resolver(constants, tables)
+        try:
+            body = resolver.visit(tree.body)
+        except ValueError as e:
+            raise ValueError(f"Invalid formula {source!r}: {e}") from None
+        
+        self.variables = sorted(resolver.variables)
+        self._getters = [VARIABLES[name] for name in self.variables]
+        
+        scalar_namespace = {name: functions[0] for name, functions in FUNCTIONS.items()}
+        scalar_namespace.update({name: table.get for name, table in tables.items()})
+        self._scalar = _compile(body, self.variables, scalar_namespace, source)
+        
+        kernel_namespace = {name: functions[1] for name, functions in FUNCTIONS.items()}
+        kernel_namespace.update({name: table.get_many for name, table in tables.items()})
+        kernel_namespace.update(_KERNEL_HELPERS)
+        self._kernel = _compile(_Vectorizer().visit(body), self.variables, kernel_namespace, source)
+    
+    def __call__(self, context: EvaluationContext) -> Any:
+        return self._scalar(*[get(context) for get in self._getters])
+    
+    def batch(self, columns: Mapping[str, Sequence[Any]], size: Optional[int] = None) -> np.ndarray:
+        """Evaluate over equal-length columns keyed by field name.
+        
+        ``size`` is only needed when the formula uses no fields.
+        """
+        missing = [name for name in self.variables if name not in columns]
+        if missing:
+            raise ValueError(f"Formula {self.source!r} needs columns: {', '.join(missing)}")
+        arrays = [np.asarray(columns[name]) for name in self.variables]
+        if size is None:
+            if not arrays:
+                raise ValueError(f"Formula {self.source!r} uses no fields; pass size")
+            size = len(arrays[0])
+        
+        result = np.asarray(self._kernel(*arrays))
+        return result if result.shape == (size,) else np.broadcast_to(result, (size,)).copy()
+
+
+def compile_formulas(config: Dict[str, Any]) -> Dict[str, Formula]:
+    """Compile the ``formula`` of every configured method, keyed by method name."""
+    formulas = {}
+    for name, settings in config.get("evaluators", {}).items():
+        if isinstance(settings, dict) and "formula" in settings:
+            try:
+                formulas[name] = Formula(settings["formula"], settings)
+            except ValueError as e:
+                raise ValueError(f"Method {name}: {e}") from None
+    return formulas
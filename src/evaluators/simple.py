@@ -1,18 +1,41 @@
 """Simple evaluator implementations."""
 
-from typing import Any, Union
+from typing import Any, Dict, Mapping, Optional, Sequence, Set, Tuple, Union
+
+import numpy as np
 
 from .base import BaseEvaluator
+from .expression import CHUNK_FIELDS, Formula, compile_formulas
 from ..models import EvaluationContext
 from ..utils import memoize
 
 
 class SimpleEvaluator(BaseEvaluator):
-    """Simple evaluator for fixed values or basic lookups."""
+    """Simple evaluator for fixed values, configured formulas or basic lookups."""
+    
+    # Chunk fields read by each built-in method
+    BUILTIN_FIELDS: Dict[str, Set[str]] = {
+        "cluster_costs": {"qty"},
+        "cluster_LTs": set(),
+        "cluster_feas": {"is_oversize"},
+        "wh_cost": {"qty"}
+    }
     
     def __init__(self, config: dict):
         self.config = config
     
+    @property
+    def config(self) -> dict:
+        return self._config
+    
+    @config.setter
+    def config(self, config: dict) -> None:
+        # Formulas compile once per config; a bad formula leaves the old config in place
+        self.formulas: Dict[str, Formula] = compile_formulas(config)
+        self._config = config
+        # Formulas decide which fields their memo keys need
+        self._key_fields: Dict[str, Tuple[str, ...]] = {}
+    
     @memoize
     def evaluate(self, context: EvaluationContext) -> Union[float, int, bool]:
         """Evaluate based on method type."""
@@ -22,6 +45,11 @@ class SimpleEvaluator(BaseEvaluator):
         if method.isdigit():
             return float(method)
         
+        # Handle configured formulas
+        formula = self.formulas.get(method)
+        if formula is not None:
+            return formula(context)
+        
         # Handle always feasible
         if method == "1" and "feasibility" in context.method:
             return True
@@ -43,6 +71,21 @@ class SimpleEvaluator(BaseEvaluator):
         # Default fallback
         return self._default_value()
     
+    def chunk_fields(self, method: str) -> Optional[Set[str]]:
+        """Chunk fields a method's result depends on, or None if unknown."""
+        if method.isdigit():
+            return set()
+        if method in self.formulas:
+            return set(self.formulas[method].variables) & CHUNK_FIELDS
+        return self.BUILTIN_FIELDS.get(method)
+    
+    def evaluate_batch(self, method: str, columns: Mapping[str, Sequence[Any]],
+                       size: Optional[int] = None) -> np.ndarray:
+        """Evaluate a configured formula over columns of context fields."""
+        if method not in self.formulas:
+            raise ValueError(f"No formula configured for method: {method}")
+        return self.formulas[method].batch(columns, size)
+    
     def _evaluate_cluster_cost(self, context: EvaluationContext) -> float:
         """Simple cluster-based cost calculation."""
         # Base rate by cluster pair
@@ -0,0 +1,295 @@
+"""Table-driven rate evaluator.
+
+Rate files are loaded once into integer-coded NumPy arrays: every key
+column (port, cluster, warehouse, container type) is factorized to integer
+codes, and a row is found by its flat code index. Lookups work on single
+keys or on whole arrays of keys at once.
+"""
+
+import math
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .simple import SimpleEvaluator
+from ..models import EvaluationContext
+
+
+# Key spaces up to this many cells use a dense code -> row index; larger
+# ones fall back to sorted flat keys and binary search
+DENSE_LIMIT = 1 << 24
+
+# Usable volume per container, in cubic metres
+CONTAINER_CAPACITY_M3 = {"20ft": 33.2, "40ft": 67.7, "40ft_hc": 76.4}
+
+DEFAULT_RATE = 100.0
+DEFAULT_TRANSIT_DAYS = 7
+DEFAULT_STORAGE_DAYS = 7
+
+
+class LookupTable:
+    """Value columns keyed by one or more categorical key columns.
+    
+    ``codes`` holds one integer code array per key column, indexing into
+    the matching ``levels`` (the distinct key values); rows with a negative
+    code are ignored.
+    """
+    
+    def __init__(self, codes: Sequence[np.ndarray], levels: Sequence[Sequence[Any]],
+                 values: Dict[str, Sequence[float]]):
+        import pandas as pd
+        
+        self.levels = [pd.Index(level) for level in levels]
+        self._codes: List[Dict[Any, int]] = [{key: code for code, key in enumerate(level)} for level in self.levels]
+        self.shape = tuple(len(level) for level in self.levels)
+        self.values = {name: np.asarray(column, dtype=np.float64) for name, column in values.items()}
+        
+        codes = [np.asarray(column, dtype=np.int64) for column in codes]
+        valid = np.logical_and.reduce([column >= 0 for column in codes]) if codes else np.empty(0, dtype=bool)
+        rows = np.flatnonzero(valid)
+        flat = np.ravel_multi_index([column[valid] for column in codes], self.shape) if len(rows) else rows
+        cells = math.prod(self.shape)
+        
+        # Later rows win on duplicate keys in both layouts
+        if cells <= DENSE_LIMIT:
+            self._index = np.full(cells, -1, dtype=np.int32 if len(valid) < 2 ** 31 else np.int64)
+            self._index[flat] = rows
+            self._keys = None
+        else:
+            order = np.argsort(flat, kind="stable")
+            keys_sorted = flat[order]
+            last = np.append(keys_sorted[1:] != keys_sorted[:-1], True)
+            self._keys = keys_sorted[last]
+            self._index = rows[order[last]]
+    
+    @classmethod
+    def from_columns(cls, keys: Sequence[Sequence[Any]], values: Dict[str, Sequence[float]]) -> "LookupTable":
+        """Build from raw key columns, integer-coding each one."""
+        import pandas as pd
+        
+        factorized = [pd.factorize(pd.Series(column, dtype=object)) for column in keys]
+        return cls([codes for codes, _ in factorized], [levels for _, levels in factorized], values)
+    
+    @classmethod
+    def from_csv(cls, filepath: Path, key_columns: List[str], value_columns: List[str]) -> "LookupTable":
+        """Load a rate file, keyed by ``key_columns``.
+        
+        Key columns are parsed straight into categoricals, so their integer
+        codes come from the parser; pyarrow's parser is used when installed.
+        """
+        import pandas as pd
+        
+        try:
+            import pyarrow  # noqa: F401
+            engine = "pyarrow"
+        except ImportError:
+            engine = "c"
+        
+        df = pd.read_csv(filepath, usecols=key_columns + value_columns, engine=engine,
+                         dtype={column: "category" for column in key_columns})
+        return cls(
+            [df[column].cat.codes.to_numpy() for column in key_columns],
+            [df[column].cat.categories for column in key_columns],
+            {column: df[column].to_numpy(dtype=np.float64) for column in value_columns}
+        )
+    
+    def __len__(self) -> int:
+        return len(self._index) if self._keys is not None else int((self._index >= 0).sum())
+    
+    def row(self, *key: Any) -> int:
+        """Row index of a key, or -1 when absent."""
+        flat = 0
+        for codes, size, part in zip(self._codes, self.shape, key):
+            code = codes.get(part)
+            if code is None:
+                return -1
+            flat = flat * size + code
+        if self._keys is None:
+            return int(self._index[flat])
+        position = int(np.searchsorted(self._keys, flat))
+        if position < len(self._keys) and self._keys[position] == flat:
+            return int(self._index[position])
+        return -1
+    
+    def get(self, column: str, *key: Any, default: Optional[float] = None) -> Optional[float]:
+        """Value of ``column`` for one key."""
+        row = self.row(*key)
+        return default if row < 0 else float(self.values[column][row])
+    
+    def rows(self, *keys: Sequence[Any]) -> np.ndarray:
+        """Row indices for arrays of keys (-1 where absent)."""
+        if not len(self._index):
+            return np.full(len(keys[0]), -1, dtype=np.int64)
+        
+        flat = np.zeros(len(keys[0]), dtype=np.int64)
+        missing = np.zeros(len(keys[0]), dtype=bool)
+        for level, size, column in zip(self.levels, self.shape, keys):
+            codes = level.get_indexer(np.asarray(column, dtype=object))
+            missing |= codes < 0
+            flat = flat * size + codes
+        
+        if self._keys is None:
+            rows = self._index[np.where(missing, 0, flat)]
+        else:
+            positions = np.searchsorted(self._keys, flat).clip(max=len(self._keys) - 1)
+            rows = np.where(self._keys[positions] == flat, self._index[positions], -1)
+        return np.where(missing, -1, rows)
+    
+    def get_many(self, column: str, *keys: Sequence[Any], default: float = np.nan) -> np.ndarray:
+        """Values of ``column`` for arrays of keys."""
+        rows = self.rows(*keys)
+        found = rows >= 0
+        values = np.full(len(rows), default, dtype=np.float64)
+        values[found] = self.values[column][rows[found]]
+        return values
+
+
+def _pair_table(pairs: Dict[str, float], column: str) -> LookupTable:
+    """Table keyed by cluster pair from config entries like ``"CN_to_US_West"``."""
+    keys = [name.split("_to_", 1) for name in pairs if "_to_" in name]
+    values = [value for name, value in pairs.items() if "_to_" in name]
+    return LookupTable.from_columns([[key[0] for key in keys], [key[1] for key in keys]], {column: values})
+
+
+class TableEvaluator(SimpleEvaluator):
+    """Evaluates cluster costs, lead times and warehouse costs from rate tables.
+    
+    ``config["tables"]`` names the rate files (``ocean_rates``,
+    ``shipping_times``, ``warehouse_rates``); each is optional. Port-to-port
+    edges are priced per container from the ocean rates, other edges per
+    thousand units from the ``base_rates`` of ``cluster_costs``. Lead times
+    come from the shipping times, then the ``transit_times`` of
+    ``cluster_LTs``.
+    """
+    
+    BUILTIN_FIELDS = {**SimpleEvaluator.BUILTIN_FIELDS, "cluster_costs": {"qty", "mc_volume", "parcels_per_mc"}}
+    
+    def __init__(self, config: dict):
+        super().__init__(config)
+        tables = config.get("tables", {})
+        
+        self.ocean_rates = self._load(tables, "ocean_rates", ["origin_port", "dest_port", "container_type"],
+                                      ["base_rate", "fuel_surcharge_pct", "peak_season_surcharge"])
+        self.shipping_times = self._load(tables, "shipping_times", ["origin_cluster", "dest_cluster"],
+                                         ["transit_days", "reliability_score"])
+        self.warehouse_rates = self._load(tables, "warehouse_rates", ["warehouse"],
+                                          ["storage_rate_per_unit_per_day", "handling_fee_per_unit", "min_storage_days"])
+    
+    @SimpleEvaluator.config.setter
+    def config(self, config: dict) -> None:
+        # Settings are re-read on every config change, rate files only when constructed
+        methods = config.get("evaluators", {})
+        container_type = config.get("container_type", "40ft")
+        if container_type not in CONTAINER_CAPACITY_M3:
+            raise ValueError(f"Unknown container type: {container_type}")
+        default_rate = float(methods.get("cluster_costs", {}).get("default_rate", DEFAULT_RATE))
+        storage_days = float(methods.get("wh_cost", {}).get("average_storage_days", DEFAULT_STORAGE_DAYS))
+        storage_rate = float(methods.get("wh_cost", {}).get("storage_rate_per_unit_per_day", 0.10))
+        cluster_rates = _pair_table(methods.get("cluster_costs", {}).get("base_rates", {}), "rate")
+        transit_times = _pair_table(methods.get("cluster_LTs", {}).get("transit_times", {}), "days")
+        SimpleEvaluator.config.fset(self, config)
+        
+        self.container_type = container_type
+        self.peak_season = bool(config.get("peak_season", False))
+        self.default_rate = default_rate
+        self.storage_days = storage_days
+        self.storage_rate = storage_rate
+        self.cluster_rates = cluster_rates
+        self.transit_times = transit_times
+    
+    @staticmethod
+    def _load(tables: Dict[str, str], name: str, keys: List[str], values: List[str]) -> Optional[LookupTable]:
+        if name not in tables:
+            return None
+        return LookupTable.from_csv(Path(tables[name]), keys, values)
+    
+    def _edge(self, context: EvaluationContext) -> Tuple[str, str, str, str]:
+        data = context.supplemental_data
+        return context.from_node, context.to_node, data.get("from_cluster", ""), data.get("to_cluster", "")
+    
+    def _container_rate(self, rows: np.ndarray) -> np.ndarray:
+        """Per-container rate of ocean rate rows, with surcharges."""
+        values = self.ocean_rates.values
+        rate = values["base_rate"][rows] * (1 + values["fuel_surcharge_pct"][rows] / 100)
+        if self.peak_season:
+            rate = rate + values["peak_season_surcharge"][rows]
+        return rate
+    
+    def _containers(self, qty, mc_volume, parcels_per_mc):
+        """Containers needed for whole master cartons (at least one)."""
+        volume = np.ceil(qty / parcels_per_mc) * mc_volume
+        return np.maximum(np.ceil(volume / CONTAINER_CAPACITY_M3[self.container_type]), 1)
+    
+    def _evaluate_cluster_cost(self, context: EvaluationContext) -> float:
+        """Ocean lane rate per container, else the cluster-pair rate per thousand units."""
+        from_node, to_node, from_cluster, to_cluster = self._edge(context)
+        product = context.chunk.product
+        
+        if self.ocean_rates is not None:
+            row = self.ocean_rates.row(from_node, to_node, self.container_type)
+            if row >= 0:
+                rate = self._container_rate(np.array([row]))[0]
+                return float(rate * self._containers(product.qty, product.mc_volume, product.parcels_per_mc))
+        
+        rate = self.cluster_rates.get("rate", from_cluster, to_cluster, default=self.default_rate)
+        return rate * (product.qty / 1000)
+    
+    def cluster_costs(self, from_nodes: Sequence[str], to_nodes: Sequence[str],
+                      from_clusters: Sequence[str], to_clusters: Sequence[str],
+                      qty: np.ndarray, mc_volume: np.ndarray, parcels_per_mc: np.ndarray) -> np.ndarray:
+        """Batched ``cluster_costs`` for arrays of edges and chunk attributes."""
+        qty = np.asarray(qty, dtype=np.float64)
+        costs = self.cluster_rates.get_many("rate", from_clusters, to_clusters, default=self.default_rate) * qty / 1000
+        
+        if self.ocean_rates is not None:
+            containers = np.full(len(qty), self.container_type, dtype=object)
+            rows = self.ocean_rates.rows(from_nodes, to_nodes, containers)
+            lane = rows >= 0
+            costs[lane] = self._container_rate(rows[lane]) * self._containers(
+                qty[lane], np.asarray(mc_volume, dtype=np.float64)[lane], np.asarray(parcels_per_mc)[lane])
+        
+        return costs
+    
+    def _evaluate_cluster_lt(self, context: EvaluationContext) -> int:
+        """Transit days from the shipping times, then the configured transit times."""
+        _, _, from_cluster, to_cluster = self._edge(context)
+        days = None
+        if self.shipping_times is not None:
+            days = self.shipping_times.get("transit_days", from_cluster, to_cluster)
+        if days is None:
+            days = self.transit_times.get("days", from_cluster, to_cluster, default=DEFAULT_TRANSIT_DAYS)
+        return int(days)
+    
+    def transit_days(self, from_clusters: Sequence[str], to_clusters: Sequence[str]) -> np.ndarray:
+        """Batched ``cluster_LTs`` for arrays of cluster pairs."""
+        days = self.transit_times.get_many("days", from_clusters, to_clusters, default=DEFAULT_TRANSIT_DAYS)
+        if self.shipping_times is not None:
+            listed = self.shipping_times.get_many("transit_days", from_clusters, to_clusters)
+            days = np.where(np.isnan(listed), days, listed)
+        return days.astype(np.int64)
+    
+    def _evaluate_warehouse_cost(self, context: EvaluationContext) -> float:
+        """Storage for at least the warehouse's minimum days, plus handling."""
+        qty = context.chunk.qty
+        row = self.warehouse_rates.row(context.current_node) if self.warehouse_rates is not None else -1
+        if row < 0:
+            return qty * self.storage_rate * self.storage_days
+        
+        values = self.warehouse_rates.values
+        days = max(self.storage_days, values["min_storage_days"][row])
+        return float(qty * (values["storage_rate_per_unit_per_day"][row] * days + values["handling_fee_per_unit"][row]))
+    
+    def warehouse_costs(self, warehouses: Sequence[str], qty: np.ndarray) -> np.ndarray:
+        """Batched ``wh_cost`` for arrays of warehouses and quantities."""
+        qty = np.asarray(qty, dtype=np.float64)
+        rows = self.warehouse_rates.rows(warehouses) if self.warehouse_rates is not None else None
+        if rows is None or not (rows >= 0).any():
+            return qty * self.storage_rate * self.storage_days
+        
+        known = rows >= 0
+        values = self.warehouse_rates.values
+        storage = np.where(known, values["storage_rate_per_unit_per_day"][rows], self.storage_rate)
+        handling = np.where(known, values["handling_fee_per_unit"][rows], 0.0)
+        days = np.maximum(self.storage_days, np.where(known, values["min_storage_days"][rows], 0.0))
+        return qty * (storage * days + handling)
@@ -1,6 +1,16 @@
 """Graph module for network building and path finding."""
 
+from .digraph import DiGraph
 from .network_builder import NetworkBuilder
-from .path_finder import PathFinder
+from .path_finder import PathFinder, PathTree
+from .snapshot import NetworkSnapshot, SnapshotPathFinder, compile_snapshot
 
-__all__ = ["NetworkBuilder", "PathFinder"]
+__all__ = [
+    "DiGraph",
+    "NetworkBuilder",
+    "PathFinder",
+    "PathTree",
+    "NetworkSnapshot",
+    "SnapshotPathFinder",
+    "compile_snapshot",
+]
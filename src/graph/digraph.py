@@ -0,0 +1,180 @@
+"""Lightweight directed graph used on the allocation hot path.
+
+Implements the subset of the ``networkx.DiGraph`` interface the allocator
+needs (node/edge attribute access, successors, reachability and simple
+path enumeration) so that a run does not pay the NetworkX import cost.
+NetworkX is still used for analysis, via ``to_networkx()``.
+"""
+
+from collections import deque
+from typing import Any, Dict, Iterator, List, Set
+
+
+class NodeView:
+    """Read access to node attributes, like ``networkx`` ``G.nodes``."""
+    
+    def __init__(self, nodes: Dict[str, Dict[str, Any]]):
+        self._nodes = nodes
+    
+    def __call__(self, data: bool = False):
+        if data:
+            return iter(self._nodes.items())
+        return iter(self._nodes)
+    
+    def __getitem__(self, node: str) -> Dict[str, Any]:
+        return self._nodes[node]
+    
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._nodes)
+    
+    def __len__(self) -> int:
+        return len(self._nodes)
+    
+    def __contains__(self, node: str) -> bool:
+        return node in self._nodes
+
+
+class DiGraph:
+    """Directed graph with node and edge attribute dicts."""
+    
+    def __init__(self):
+        self._nodes: Dict[str, Dict[str, Any]] = {}
+        self._succ: Dict[str, Dict[str, Dict[str, Any]]] = {}
+        self._pred: Dict[str, Dict[str, Dict[str, Any]]] = {}
+    
+    @property
+    def nodes(self) -> NodeView:
+        return NodeView(self._nodes)
+    
+    def add_node(self, node: str, **attrs) -> None:
+        """Add a node, updating attributes if it already exists."""
+        if node not in self._nodes:
+            self._nodes[node] = {}
+            self._succ[node] = {}
+            self._pred[node] = {}
+        self._nodes[node].update(attrs)
+    
+    def add_edge(self, u: str, v: str, **attrs) -> None:
+        """Add an edge, creating missing endpoint nodes."""
+        for node in (u, v):
+            if node not in self._nodes:
+                self.add_node(node)
+        data = self._succ[u].get(v, {})
+        data.update(attrs)
+        self._succ[u][v] = data
+        self._pred[v][u] = data
+    
+    def has_edge(self, u: str, v: str) -> bool:
+        return u in self._succ and v in self._succ[u]
+    
+    def successors(self, node: str) -> Iterator[str]:
+        return iter(self._succ[node])
+    
+    def predecessors(self, node: str) -> Iterator[str]:
+        return iter(self._pred[node])
+    
+    def edges(self, data: bool = False):
+        """Iterate over (u, v) or (u, v, attrs) tuples."""
+        for u, targets in self._succ.items():
+            for v, attrs in targets.items():
+                yield (u, v, attrs) if data else (u, v)
+    
+    def number_of_nodes(self) -> int:
+        return len(self._nodes)
+    
+    def number_of_edges(self) -> int:
+        return sum(len(targets) for targets in self._succ.values())
+    
+    def __getitem__(self, node: str) -> Dict[str, Dict[str, Any]]:
+        return self._succ[node]
+    
+    def __contains__(self, node: str) -> bool:
+        return node in self._nodes
+    
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._nodes)
+    
+    def __len__(self) -> int:
+        return len(self._nodes)
+    
+    def is_weakly_connected(self) -> bool:
+        """Check if the graph is connected when edge direction is ignored."""
+        if not self._nodes:
+            return False
+        
+        start = next(iter(self._nodes))
+        seen = {start}
+        queue = deque([start])
+        while queue:
+            node = queue.popleft()
+            for neighbor in list(self._succ[node]) + list(self._pred[node]):
+                if neighbor not in seen:
+                    seen.add(neighbor)
+                    queue.append(neighbor)
+        
+        return len(seen) == len(self._nodes)
+    
+    def to_networkx(self):
+        """Copy into a ``networkx.DiGraph`` for analysis and drawing."""
+        import networkx as nx
+        
+        G = nx.DiGraph()
+        for node, attrs in self._nodes.items():
+            G.add_node(node, **attrs)
+        for u, v, attrs in self.edges(data=True):
+            G.add_edge(u, v, **attrs)
+        return G
+
+
+def descendants(graph: DiGraph, source: str) -> Set[str]:
+    """All nodes reachable from source (excluding source)."""
+    seen: Set[str] = set()
+    stack = [source]
+    while stack:
+        node = stack.pop()
+        for neighbor in graph.successors(node):
+            if neighbor not in seen:
+                seen.add(neighbor)
+                stack.append(neighbor)
+    seen.discard(source)
+    return seen
+
+
+def has_path(graph: DiGraph, source: str, target: str) -> bool:
+    """Check if target is reachable from source."""
+    if source not in graph or target not in graph:
+        return False
+    return source == target or target in descendants(graph, source)
+
+
+def all_simple_paths(graph: DiGraph, source: str, target: str, cutoff: int = None) -> Iterator[List[str]]:
+    """Yield simple paths from source to target with at most ``cutoff`` edges.
+    
+    Same order and semantics as ``networkx.all_simple_paths`` for DiGraphs.
+    """
+    if source not in graph or target not in graph or source == target:
+        return
+    
+    if cutoff is None:
+        cutoff = len(graph) - 1
+    if cutoff < 1:
+        return
+    
+    path = [source]
+    on_path = {source}
+    stack = [iter(graph.successors(source))]
+    
+    while stack:
+        child = next(stack[-1], None)
+        
+        if child is None:
+            stack.pop()
+            on_path.discard(path.pop())
+        elif child in on_path:
+            continue
+        elif child == target:
+            yield path + [child]
+        elif len(path) < cutoff:
+            path.append(child)
+            on_path.add(child)
+            stack.append(iter(graph.successors(child)))
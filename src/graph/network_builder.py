@@ -1,19 +1,19 @@
 """Network builder for constructing supply chain graph."""
 
 from typing import List, Dict, Any, Set, Tuple
-import networkx as nx
 
 from ..models import Node, Edge, NetworkGraph
+from .digraph import DiGraph, has_path, all_simple_paths
 
 
 class NetworkBuilder:
     """Builds and manages the supply chain network graph."""
     
     def __init__(self):
-        self.graph = nx.DiGraph()
+        self.graph = DiGraph()
         self.nodes_data: Dict[str, Node] = {}
         self.edges_data: List[Edge] = []
-        
+    
     def build(self, nodes: List[Node], edges: List[Edge]) -> NetworkGraph:
         """Build network graph from nodes and edges."""
         # Store data
@@ -39,14 +39,12 @@ class NetworkBuilder:
                 edge.node2,
                 cost_method=edge.cost_method,
                 feasibility_method=edge.feasibility_method,
-                lt_method=edge.lt_method
+                lt_method=edge.lt_method,
+                carriers=edge.carriers,
+                departures=edge.departures
             )
         
-        return NetworkGraph(
-            nodes=self.nodes_data,
-            edges={f"{e.node1}->{e.node2}": e for e in edges},
-            graph=self.graph
-        )
+        return NetworkGraph(nodes=list(nodes), edges=list(edges))
     
     def validate_connectivity(self) -> None:
         """Validate that the graph is properly connected."""
@@ -62,16 +60,16 @@ class NetworkBuilder:
             raise ValueError(f"No FC nodes found (stage {max_stage})")
         
         # Check if at least one path exists from any supplier to any FC
-        has_path = False
+        connected = False
         for supplier in suppliers:
             for fc in fcs:
-                if nx.has_path(self.graph, supplier, fc):
-                    has_path = True
+                if has_path(self.graph, supplier, fc):
+                    connected = True
                     break
-            if has_path:
+            if connected:
                 break
         
-        if not has_path:
+        if not connected:
             raise ValueError("No path exists from suppliers to FCs")
     
     def get_stats(self) -> Dict[str, Any]:
@@ -87,7 +85,7 @@ class NetworkBuilder:
             'total_nodes': self.graph.number_of_nodes(),
             'total_edges': self.graph.number_of_edges(),
             'stages': stages,
-            'is_connected': nx.is_weakly_connected(self.graph)
+            'is_connected': self.graph.is_weakly_connected()
         }
     
     def find_all_paths(self, source: str, max_length: int = 5) -> List[List[str]]:
@@ -98,20 +96,16 @@ class NetworkBuilder:
         
         all_paths = []
         for fc in fc_nodes:
-            try:
-                # Use cutoff to limit path length
-                paths = list(nx.all_simple_paths(
-                    self.graph, 
-                    source, 
-                    fc, 
-                    cutoff=max_length
-                ))
-                all_paths.extend(paths)
-            except nx.NetworkXNoPath:
-                continue
+            # Use cutoff to limit path length
+            all_paths.extend(all_simple_paths(self.graph, source, fc, cutoff=max_length))
         
         return all_paths
     
+    def get_destinations(self) -> Set[str]:
+        """Get destination FC nodes (highest stage)."""
+        max_stage = max(d['stage'] for n, d in self.graph.nodes(data=True))
+        return {n for n, d in self.graph.nodes(data=True) if d['stage'] == max_stage}
+    
     def get_node(self, node_name: str) -> Node:
         """Get node data by name."""
         return self.nodes_data.get(node_name)
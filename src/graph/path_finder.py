@@ -1,44 +1,144 @@
 """Find paths through supply chain network."""
 
-import networkx as nx
-from typing import List, Set, Optional
+import sys
+from collections import deque
+from typing import Dict, FrozenSet, Iterable, List, Set, Tuple
 from itertools import islice
 
+from .digraph import DiGraph
+
+
+Suffix = Tuple[str, ...]
+
+
+class PathTree:
+    """All simple paths into a destination set, shared by every origin.
+    
+    A reverse breadth-first search from each destination labels nodes with
+    their hop distance to it. Path suffixes (node -> destination, within a
+    hop budget) are then memoized per (destination, node, budget), so the
+    paths of a new origin reuse every suffix another origin already built,
+    and branches that cannot reach the destination within the budget are
+    never entered. Paths come out in the order ``all_simple_paths`` yields
+    them, destination by destination.
+    """
+    
+    def __init__(self, graph: DiGraph, destinations: Iterable[str], max_hops: int = 5):
+        self.graph = graph
+        self.destinations = tuple(dest for dest in destinations if dest in graph)
+        self.max_hops = max_hops
+        self.distances: Dict[str, Dict[str, int]] = {dest: self._distances(dest) for dest in self.destinations}
+        self._suffixes: Dict[Tuple[str, str, int], List[Suffix]] = {}
+        self._paths: Dict[str, List[List[str]]] = {}
+    
+    def _distances(self, target: str) -> Dict[str, int]:
+        """Hops from each node that can reach ``target``, within ``max_hops``."""
+        distances = {target: 0}
+        queue = deque([target])
+        while queue:
+            node = queue.popleft()
+            hops = distances[node] + 1
+            if hops > self.max_hops:
+                continue
+            for pred in self.graph.predecessors(node):
+                if pred not in distances:
+                    distances[pred] = hops
+                    queue.append(pred)
+        return distances
+    
+    def suffixes(self, target: str, node: str, budget: int) -> List[Suffix]:
+        """Simple paths from ``node`` to ``target`` with at most ``budget`` edges."""
+        key = (target, node, budget)
+        suffixes = self._suffixes.get(key)
+        if suffixes is None:
+            distances = self.distances[target]
+            suffixes = []
+            for child in self.graph.successors(node):
+                if child == target:
+                    suffixes.append((node, target))
+                elif budget > 1 and distances.get(child, budget) < budget:
+                    # A suffix through this node again would not be simple
+                    suffixes.extend((node,) + suffix for suffix in self.suffixes(target, child, budget - 1)
+                                    if node not in suffix)
+            self._suffixes[key] = suffixes
+        return suffixes
+    
+    def paths(self, origin: str) -> List[List[str]]:
+        """All simple paths from ``origin`` to the destinations, within ``max_hops`` edges."""
+        paths = self._paths.get(origin)
+        if paths is None:
+            paths = []
+            if origin in self.graph:
+                for dest in self.destinations:
+                    if dest != origin and self.distances[dest].get(origin, self.max_hops + 1) <= self.max_hops:
+                        paths.extend(list(suffix) for suffix in self.suffixes(dest, origin, self.max_hops))
+            self._paths[origin] = paths
+        return paths
+    
+    def footprint(self) -> Dict[str, int]:
+        """Sizes of the memoized suffixes and per-origin path lists."""
+        suffix_bytes = sum(
+            sys.getsizeof(suffixes) + sum(sys.getsizeof(suffix) for suffix in suffixes)
+            for suffixes in self._suffixes.values()
+        )
+        path_bytes = sum(
+            sys.getsizeof(paths) + sum(sys.getsizeof(path) for path in paths) for paths in self._paths.values()
+        )
+        return {
+            "origins": len(self._paths),
+            "paths": sum(len(paths) for paths in self._paths.values()),
+            "suffixes": sum(len(suffixes) for suffixes in self._suffixes.values()),
+            "bytes": suffix_bytes + path_bytes + sys.getsizeof(self._suffixes) + sys.getsizeof(self._paths)
+        }
+
 
 class PathFinder:
     """Finds paths through the network."""
     
-    def __init__(self, graph: nx.DiGraph, max_hops: int = 5):
+    def __init__(self, graph: DiGraph, max_hops: int = 5):
         self.graph = graph
         self.max_hops = max_hops
+        self._trees: Dict[FrozenSet[str], PathTree] = {}
+    
+    def restricted(self, graph: DiGraph) -> "PathFinder":
+        """The same search over a subgraph, e.g. one pruned of infeasible lanes."""
+        return PathFinder(graph, self.max_hops)
+    
+    def tree(self, destinations: Set[str]) -> PathTree:
+        """The shared path tree into a destination set, built on first use."""
+        key = frozenset(destinations)
+        tree = self._trees.get(key)
+        if tree is None:
+            tree = self._trees[key] = PathTree(self.graph, destinations, self.max_hops)
+        return tree
     
     def find_all_paths(self, origin: str, destinations: Set[str]) -> List[List[str]]:
         """Find all paths from origin to any destination."""
-        all_paths = []
-        
-        for dest in destinations:
-            if nx.has_path(self.graph, origin, dest):
-                # Get all simple paths up to max_hops length
-                paths = nx.all_simple_paths(
-                    self.graph, 
-                    origin, 
-                    dest, 
-                    cutoff=self.max_hops
-                )
-                all_paths.extend(paths)
-        
-        return all_paths
+        # A copy, so callers cannot change the tree's cached list
+        return list(self.tree(destinations).paths(origin))
+    
+    def footprint(self) -> Dict[str, int]:
+        """Path-plan sizes summed over the trees built so far."""
+        totals = {"trees": len(self._trees), "origins": 0, "paths": 0, "suffixes": 0, "bytes": 0}
+        for tree in self._trees.values():
+            for name, value in tree.footprint().items():
+                totals[name] += value
+        return totals
     
     def find_shortest_paths(self, origin: str, destinations: Set[str], k: int = 3) -> List[List[str]]:
         """Find k-shortest paths to each destination."""
+        # Analysis only: NetworkX is imported on demand
+        import networkx as nx
+        
+        graph = self.graph.to_networkx() if isinstance(self.graph, DiGraph) else self.graph
         shortest_paths = []
         
         for dest in destinations:
-            if nx.has_path(self.graph, origin, dest):
+            if nx.has_path(graph, origin, dest):
                 try:
                     # Get k shortest paths
                     paths = list(islice(
-                        nx.shortest_simple_paths(self.graph, origin, dest),
+                        nx.shortest_simple_paths(graph, origin, dest),
                         k
                     ))
                     shortest_paths.extend(paths)
@@ -0,0 +1,307 @@
+"""Compiled network snapshots loaded via mmap.
+
+A snapshot stores everything a run derives from the network CSVs so that
+loading skips CSV parsing, row validation, graph construction from
+scratch and path enumeration. Layout::
+
+    b"SCASNAP1" | uint64 header length | JSON header | padded array blocks
+
+The JSON header holds the interned string tables (node names, clusters,
+node groups, evaluator methods, carrier lists and departure days), the evaluator config and, for every
+array, its offset, typecode and length. Arrays are 8-byte aligned so the
+loader can expose them as zero-copy ``memoryview`` casts of one read-only
+mmap, which lets worker processes share the same physical pages.
+
+Arrays:
+
+- ``node_stage``, ``node_cluster``, ``node_group``, ``node_{cost,feas,lt}``:
+  interned node table (ids into the header string tables)
+- ``edge_indptr``, ``edge_dst``, ``edge_{cost,feas,lt}``: CSR edge arrays
+- ``edge_carriers``: interned carrier list per edge (-1 when unset)
+- ``edge_departures``: interned departure weekdays per edge (-1 when unset)
+- ``path_indptr``, ``path_nodes``: candidate path plans per origin
+"""
+
+import json
+import mmap
+import struct
+import sys
+from array import array
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Set
+
+from ..models import Node, Edge
+from .network_builder import NetworkBuilder
+from .path_finder import PathFinder, PathTree
+
+
+MAGIC = b"SCASNAP1"
+VERSION = 1
+ALIGNMENT = 8
+
+KINDS = ("cost", "feas", "lt")
+METHOD_FIELDS = {"cost": "cost_method", "feas": "feasibility_method", "lt": "lt_method"}
+
+
+class _Interner:
+    """Assigns consecutive ids to strings."""
+    
+    def __init__(self):
+        self.ids: Dict[str, int] = {}
+    
+    def __call__(self, value: str) -> int:
+        if value not in self.ids:
+            self.ids[value] = len(self.ids)
+        return self.ids[value]
+    
+    @property
+    def table(self) -> List[str]:
+        return list(self.ids)
+
+
+def compile_snapshot(builder: NetworkBuilder, config: Dict[str, Any], output: Path,
+                     max_hops: int = 5) -> Dict[str, Any]:
+    """Write a compiled snapshot of a built network and return its summary."""
+    graph = builder.graph
+    names = list(builder.nodes_data)
+    index = {name: i for i, name in enumerate(names)}
+    n = len(names)
+    
+    clusters, groups, methods = _Interner(), _Interner(), _Interner()
+    arrays: Dict[str, array] = {}
+    
+    # Interned node table
+    nodes = [builder.nodes_data[name] for name in names]
+    arrays["node_stage"] = array("i", (node.stage for node in nodes))
+    arrays["node_cluster"] = array("i", (clusters(node.cluster) for node in nodes))
+    arrays["node_group"] = array("i", (groups(node.node_group) for node in nodes))
+    for kind, field in METHOD_FIELDS.items():
+        arrays[f"node_{kind}"] = array("i", (methods(getattr(node, field)) for node in nodes))
+    
+    # CSR edge arrays, in graph insertion order per source node
+    indptr, dst = array("i", [0]), array("i")
+    edge_methods = {kind: array("i") for kind in KINDS}
+    edge_carriers = array("i")
+    edge_departures = array("i")
+    for name in names:
+        for target, data in graph[name].items():
+            dst.append(index[target])
+            edge_carriers.append(methods(data["carriers"]) if data.get("carriers") else -1)
+            edge_departures.append(methods(data["departures"]) if data.get("departures") else -1)
+            for kind, field in METHOD_FIELDS.items():
+                edge_methods[kind].append(methods(data[field]))
+        indptr.append(len(dst))
+    
+    arrays["edge_indptr"] = indptr
+    arrays["edge_dst"] = dst
+    for kind in KINDS:
+        arrays[f"edge_{kind}"] = edge_methods[kind]
+    arrays["edge_carriers"] = edge_carriers
+    arrays["edge_departures"] = edge_departures
+    
+    # Candidate path plans from every stage-1 origin to the destinations,
+    # built from one path tree the origins share
+    destinations = sorted(builder.get_destinations(), key=index.get) if n else []
+    origins = [name for name in names if builder.nodes_data[name].stage == 1]
+    tree = PathTree(graph, destinations, max_hops)
+    path_indptr, path_nodes = array("i", [0]), array("i")
+    plans = {}
+    for origin in origins:
+        first = len(path_indptr) - 1
+        for path in tree.paths(origin):
+            path_nodes.extend(index[node] for node in path)
+            path_indptr.append(len(path_nodes))
+        plans[origin] = [first, len(path_indptr) - 1]
+    arrays["path_indptr"] = path_indptr
+    arrays["path_nodes"] = path_nodes
+    
+    # Lay out array blocks
+    layout = {}
+    offset = 0
+    for name, values in arrays.items():
+        layout[name] = {"offset": offset, "typecode": values.typecode, "length": len(values)}
+        offset += _padded(len(values) * values.itemsize)
+    
+    header = {
+        "version": VERSION,
+        "names": names,
+        "clusters": clusters.table,
+        "groups": groups.table,
+        "methods": methods.table,
+        "destinations": destinations,
+        "max_hops": max_hops,
+        "plans": plans,
+        "config": config,
+        "arrays": layout
+    }
+    header_bytes = json.dumps(header).encode()
+    header_bytes += b" " * (_padded(len(header_bytes) + len(MAGIC) + 8) - len(header_bytes) - len(MAGIC) - 8)
+    
+    with open(output, "wb") as f:
+        f.write(MAGIC)
+        f.write(struct.pack("<Q", len(header_bytes)))
+        f.write(header_bytes)
+        for name, values in arrays.items():
+            raw = values.tobytes()
+            f.write(raw)
+            f.write(b"\0" * (_padded(len(raw)) - len(raw)))
+    
+    return {
+        "nodes": n,
+        "edges": len(dst),
+        "origins": len(origins),
+        "paths": len(path_indptr) - 1,
+        "bytes": Path(output).stat().st_size
+    }
+
+
+def _padded(size: int) -> int:
+    return (size + ALIGNMENT - 1) // ALIGNMENT * ALIGNMENT
+
+
+class NetworkSnapshot:
+    """Read-only, memory-mapped view of a compiled network snapshot."""
+    
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self._file = open(self.path, "rb")
+        self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        
+        if self._mmap[:len(MAGIC)] != MAGIC:
+            self.close()
+            raise ValueError(f"Not a network snapshot: {self.path}")
+        
+        (header_length,) = struct.unpack_from("<Q", self._mmap, len(MAGIC))
+        header_start = len(MAGIC) + 8
+        self.header = json.loads(self._mmap[header_start:header_start + header_length])
+        
+        if self.header.get("version") != VERSION:
+            self.close()
+            raise ValueError(f"Unsupported snapshot version: {self.header.get('version')}")
+        
+        self._data_start = header_start + header_length
+        self._view = memoryview(self._mmap)
+        self.names: List[str] = self.header["names"]
+        self.index = {name: i for i, name in enumerate(self.names)}
+    
+    def array(self, name: str) -> memoryview:
+        """Zero-copy typed view of one array block."""
+        spec = self.header["arrays"][name]
+        start = self._data_start + spec["offset"]
+        size = spec["length"] * struct.calcsize(spec["typecode"])
+        return self._view[start:start + size].cast(spec["typecode"])
+    
+    @property
+    def config(self) -> Dict[str, Any]:
+        """Evaluator config the snapshot was compiled with."""
+        return self.header["config"]
+    
+    def to_builder(self) -> NetworkBuilder:
+        """Rebuild a NetworkBuilder from the arrays without row validation."""
+        clusters, groups, methods = self.header["clusters"], self.header["groups"], self.header["methods"]
+        stage, cluster, group = self.array("node_stage"), self.array("node_cluster"), self.array("node_group")
+        node_methods = {kind: self.array(f"node_{kind}") for kind in KINDS}
+        
+        nodes = [
+            Node.model_construct(
+                name=name,
+                node_group=groups[group[i]],
+                stage=stage[i],
+                cluster=clusters[cluster[i]],
+                cost_method=methods[node_methods["cost"][i]],
+                feasibility_method=methods[node_methods["feas"][i]],
+                lt_method=methods[node_methods["lt"][i]]
+            )
+            for i, name in enumerate(self.names)
+        ]
+        
+        indptr, dst = self.array("edge_indptr"), self.array("edge_dst")
+        edge_methods = {kind: self.array(f"edge_{kind}") for kind in KINDS}
+        carriers = self.array("edge_carriers") if "edge_carriers" in self.header["arrays"] else None
+        departures = self.array("edge_departures") if "edge_departures" in self.header["arrays"] else None
+        edges = [
+            Edge.model_construct(
+                node1=self.names[i],
+                node2=self.names[dst[e]],
+                cost_method=methods[edge_methods["cost"][e]],
+                feasibility_method=methods[edge_methods["feas"][e]],
+                lt_method=methods[edge_methods["lt"][e]],
+                carriers=methods[carriers[e]] if carriers is not None and carriers[e] >= 0 else None,
+                departures=methods[departures[e]] if departures is not None and departures[e] >= 0 else None
+            )
+            for i in range(len(self.names))
+            for e in range(indptr[i], indptr[i + 1])
+        ]
+        
+        builder = NetworkBuilder()
+        builder.build(nodes, edges)
+        return builder
+    
+    def path_finder(self, builder: NetworkBuilder) -> "SnapshotPathFinder":
+        """PathFinder serving the precompiled path plans."""
+        return SnapshotPathFinder(builder.graph, self)
+    
+    def plan(self, origin: str) -> Optional[List[List[str]]]:
+        """Decode the candidate paths for an origin, or None if not compiled."""
+        if origin not in self.header["plans"]:
+            return None
+        first, last = self.header["plans"][origin]
+        indptr, nodes = self.array("path_indptr"), self.array("path_nodes")
+        return [
+            [self.names[i] for i in nodes[indptr[p]:indptr[p + 1]]]
+            for p in range(first, last)
+        ]
+    
+    def close(self) -> None:
+        """Close the mapping; views handed out earlier keep it alive until released."""
+        try:
+            if getattr(self, "_view", None) is not None:
+                self._view.release()
+                self._view = None
+            self._mmap.close()
+        except BufferError:
+            pass
+        self._file.close()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exc):
+        self.close()
+
+
+class SnapshotPathFinder(PathFinder):
+    """PathFinder that answers from compiled path plans."""
+    
+    def __init__(self, graph, snapshot: NetworkSnapshot, subgraph: bool = False):
+        super().__init__(graph, max_hops=snapshot.header["max_hops"])
+        self.snapshot = snapshot
+        self.subgraph = subgraph
+        self._plans: Dict[str, List[List[str]]] = {}
+    
+    def restricted(self, graph) -> "SnapshotPathFinder":
+        """Serve the compiled plans that survive in a subgraph."""
+        return SnapshotPathFinder(graph, self.snapshot, subgraph=True)
+    
+    def find_all_paths(self, origin: str, destinations: Set[str]) -> List[List[str]]:
+        """Find all paths from origin to any destination."""
+        if origin not in self._plans:
+            plan = self.snapshot.plan(origin)
+            if plan is None:
+                # Origin was not a stage-1 node at compile time
+                return super().find_all_paths(origin, destinations)
+            if self.subgraph:
+                plan = [path for path in plan if self.validate_path(path)]
+            self._plans[origin] = plan
+        
+        return [path for path in self._plans[origin] if path[-1] in destinations]
+    
+    def footprint(self) -> Dict[str, int]:
+        """Path-plan sizes, decoded plans included."""
+        totals = super().footprint()
+        totals["origins"] += len(self._plans)
+        totals["paths"] += sum(len(plan) for plan in self._plans.values())
+        totals["bytes"] += sum(
+            sys.getsizeof(plan) + sum(sys.getsizeof(path) for path in plan) for plan in self._plans.values()
+        )
+        return totals
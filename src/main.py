@@ -2,62 +2,213 @@
 
 import click
 from pathlib import Path
-import json
 
-from .models import NetworkGraph
-from .utils import load_products, load_nodes, load_edges, validate_network_integrity
-from .graph import NetworkBuilder
-from .evaluators import create_evaluator, load_evaluator_config
-from .allocation import Allocator
+# Heavy dependencies (pydantic models, pandas loaders) are imported inside
+# the commands so that --help and argument errors return without loading them.
 
 
-@click.command()
+class DefaultCommandGroup(click.Group):
+    """Group that runs ``allocate`` when no subcommand name is given.
+    
+    Keeps ``python -m src.main --products ...`` working alongside
+    subcommands such as ``compile``.
+    """
+    
+    default_command = "allocate"
+    
+    def parse_args(self, ctx, args):
+        if args and args[0] in ("--help", "-h"):
+            return super().parse_args(ctx, args)
+        if not args or args[0] not in self.commands:
+            args = [self.default_command] + list(args)
+        return super().parse_args(ctx, args)
+
+
+@click.group(cls=DefaultCommandGroup)
+def main():
+    """Supply chain allocation (runs `allocate` by default)."""
+
+
+@main.command()
 @click.option('--products', type=click.Path(exists=True), required=True, help='Products CSV file')
-@click.option('--nodes', type=click.Path(exists=True), required=True, help='Nodes CSV file')
-@click.option('--edges', type=click.Path(exists=True), required=True, help='Node-Node CSV file')
+@click.option('--nodes', type=click.Path(exists=True), default=None, help='Nodes CSV file')
+@click.option('--edges', type=click.Path(exists=True), default=None, help='Node-Node CSV file')
+@click.option('--snapshot', type=click.Path(exists=True), default=None,
+              help='Compiled network snapshot (from `compile`) to use instead of --nodes/--edges/--config')
 @click.option('--config', type=click.Path(), default='config/evaluators.json', help='Evaluator config')
 @click.option('--output', type=click.Path(), default='allocation_results.json', help='Output file')
-def main(products, nodes, edges, config, output):
+@click.option('--output-format', type=click.Choice(['json', 'jsonl', 'csv', 'parquet', 'arrow', 'sqlite']), default=None,
+              help='Results format (default: from the --output extension, else json)')
+@click.option('--beam-width', type=click.IntRange(min=1), default=None,
+              help='Approximate search keeping the best N partial paths per stage (default: exact)')
+@click.option('--previous', '--previous-results', 'previous_results', type=click.Path(exists=True), default=None,
+              help='Previous results file: reuses unchanged SKUs, or with --previous-nodes/--previous-edges '
+                   'updates it after a network change')
+@click.option('--previous-nodes', type=click.Path(exists=True), default=None,
+              help='Nodes CSV the previous results were allocated on')
+@click.option('--previous-edges', type=click.Path(exists=True), default=None,
+              help='Node-Node CSV the previous results were allocated on')
+@click.option('--metrics-out', type=click.Path(), default=None,
+              help='Write per-phase timings and counters as JSON here, and Prometheus text beside it (.prom)')
+@click.option('--profile', is_flag=True, default=False,
+              help='Profile the load, build, allocate and write phases (cProfile and tracemalloc); '
+                   'writes .pstats files and a .profile.txt summary next to --output')
+@click.option('--profile-every', type=click.IntRange(min=1), default=1,
+              help='With --profile, profile only every Nth chunk of the allocate phase')
+@click.option('--route', 'route_objective', type=click.Choice(['earliest', 'cheapest']), default=None,
+              help='Route each chunk from its ready date by time-dependent search, honouring lane departure '
+                   'schedules, instead of enumerating paths')
+@click.option('--stockout-samples', type=click.IntRange(min=1), default=None,
+              help='Monte Carlo samples per path for stockout risk (overrides the config)')
+@click.option('--stockout-seed', type=int, default=None, help='Random seed for the stockout simulation')
+@click.option('--demand', type=click.Path(exists=True), default=None,
+              help='Per-SKU x per-FC demand (CSV or Parquet): split each SKU across FCs by demand share; '
+                   'the split rows are written next to --output (.splits.csv)')
+@click.option('--sensitivity', is_flag=True, default=False,
+              help='Write each SKU\'s runner-up path and the lane rate change that would switch it '
+                   '(.sensitivity.csv), and the break-even change per SKU and lane (.breakeven.csv), next to --output')
+def allocate(products, nodes, edges, snapshot, config, output, output_format, beam_width,
+             previous_results, previous_nodes, previous_edges, metrics_out, profile, profile_every,
+             route_objective, stockout_samples, stockout_seed, demand, sensitivity):
     """Run supply chain allocation."""
+    if snapshot and (nodes or edges):
+        raise click.UsageError("--snapshot replaces --nodes/--edges")
+    if not snapshot and not (nodes and edges):
+        raise click.UsageError("--nodes and --edges are required unless --snapshot is given")
+    if snapshot and previous_nodes:
+        raise click.UsageError("--previous-nodes/--previous-edges require --nodes/--edges")
+    if bool(previous_nodes) != bool(previous_edges):
+        raise click.UsageError("--previous-nodes and --previous-edges must be given together")
+    if previous_nodes and not previous_results:
+        raise click.UsageError("--previous-nodes/--previous-edges require --previous")
+    if route_objective and beam_width:
+        raise click.UsageError("--route and --beam-width are alternative searches")
+    if previous_results and beam_width:
+        raise click.UsageError("--beam-width cannot be combined with --previous")
+    if demand and (beam_width or route_objective or previous_results):
+        raise click.UsageError("--demand cannot be combined with --beam-width, --route or --previous")
+    if sensitivity and (beam_width or route_objective or demand):
+        raise click.UsageError("--sensitivity needs exact search: not with --beam-width, --route or --demand")
+    
+    from .utils import load_products, load_nodes, load_edges, validate_network_integrity, load_results, write_results
+    from .utils.metrics import Metrics
+    from .utils.profiling import Profiler
+    from .graph import NetworkBuilder, NetworkSnapshot
+    from .evaluators import create_evaluator, load_evaluator_config
+    from .allocation import (
+        Allocator, BeamSearchAllocator, IncrementalAllocator, ReuseAllocator, SensitivityAnalyzer, SplitAllocator,
+        diff_networks
+    )
+    
+    metrics = Metrics()
+    if profile:
+        metrics.profiler = Profiler(sample_every=profile_every)
     click.echo("Loading data...")
     
     # Load CSV data
-    products_data = load_products(Path(products))
-    nodes_data = load_nodes(Path(nodes))
-    edges_data = load_edges(Path(edges))
+    with metrics.phase("load"):
+        products_data = load_products(Path(products))
     
-    # Validate network integrity
-    validate_network_integrity(nodes_data, edges_data)
+    if snapshot:
+        # Compiled network: no CSV parsing, row validation or path enumeration
+        with metrics.phase("load"):
+            network_snapshot = NetworkSnapshot(Path(snapshot))
+            evaluator_config = network_snapshot.config
+        with metrics.phase("build"):
+            builder = network_snapshot.to_builder()
+        nodes_data = list(builder.nodes_data.values())
+        edges_data = builder.edges_data
+        click.echo(f"Loaded {len(products_data)} products and network snapshot {snapshot} "
+                   f"({len(nodes_data)} nodes, {len(edges_data)} edges)")
+    else:
+        network_snapshot = None
+        with metrics.phase("load"):
+            nodes_data = load_nodes(Path(nodes))
+            edges_data = load_edges(Path(edges))
+        
+        # Validate network integrity
+        with metrics.phase("validate"):
+            validate_network_integrity(nodes_data, edges_data)
+        
+        click.echo(f"Loaded {len(products_data)} products, {len(nodes_data)} nodes, {len(edges_data)} edges")
+        
+        # Build network graph
+        click.echo("Building network graph...")
+        with metrics.phase("build"):
+            builder = NetworkBuilder()
+            builder.build(nodes_data, edges_data)
+        with metrics.phase("validate"):
+            builder.validate_connectivity()
+        
+        stats = builder.get_stats()
+        click.echo(f"Network stats: {stats}")
+        
+        # Load evaluator configuration
+        click.echo("Loading evaluator configuration...")
+        with metrics.phase("load"):
+            evaluator_config = load_evaluator_config(Path(config))
     
-    click.echo(f"Loaded {len(products_data)} products, {len(nodes_data)} nodes, {len(edges_data)} edges")
+    evaluator = create_evaluator(evaluator_config)
     
-    # Build network graph
-    click.echo("Building network graph...")
-    builder = NetworkBuilder()
-    graph = builder.build(nodes_data, edges_data)
-    builder.validate_connectivity()
+    # Create allocator
+    if previous_results and previous_nodes:
+        with metrics.phase("load"):
+            old_nodes = load_nodes(Path(previous_nodes))
+            old_edges = load_edges(Path(previous_edges))
+            diff = diff_networks(old_nodes, old_edges, nodes_data, edges_data)
+            previous = load_results(Path(previous_results))
+        click.echo(f"Incremental mode: {diff}")
+        allocator = IncrementalAllocator(builder, evaluator, diff, previous, old_nodes, old_edges, metrics=metrics)
+    elif previous_results:
+        click.echo(f"Reusing unchanged allocations from {previous_results}")
+        with metrics.phase("load"):
+            previous = load_results(Path(previous_results))
+        allocator = ReuseAllocator(builder, evaluator, previous, metrics=metrics)
+    elif demand:
+        from .utils import load_demand
+        try:
+            with metrics.phase("load"):
+                demand_data = load_demand(Path(demand))
+            allocator = SplitAllocator(builder, evaluator, demand_data, metrics=metrics)
+        except (ImportError, ValueError) as e:
+            raise click.ClickException(str(e))
+        click.echo(f"Splitting SKUs across {len(demand_data.columns)} FCs by demand for "
+                   f"{len(demand_data)} SKUs from {demand}")
+    elif beam_width:
+        click.echo(f"Using beam search (width {beam_width})")
+        allocator = BeamSearchAllocator(builder, evaluator, beam_width=beam_width, metrics=metrics)
+    else:
+        allocator = Allocator(builder, evaluator, metrics=metrics)
     
-    stats = builder.get_stats()
-    click.echo(f"Network stats: {stats}")
+    if network_snapshot and not beam_width:
+        allocator.path_finder = network_snapshot.path_finder(builder)
     
-    # Load evaluator configuration
-    click.echo("Loading evaluator configuration...")
-    evaluator_config = load_evaluator_config(Path(config))
-    evaluator = create_evaluator(evaluator_config)
+    if route_objective:
+        click.echo(f"Routing from ready dates by time-dependent search ({route_objective})")
+        allocator.route_objective = route_objective
     
-    # Create allocator
-    allocator = Allocator(builder, evaluator)
+    if allocator.stockout is not None:
+        if stockout_samples is not None:
+            allocator.stockout.samples = stockout_samples
+        if stockout_seed is not None:
+            allocator.stockout.seed = stockout_seed
+    elif stockout_samples is not None or stockout_seed is not None:
+        raise click.UsageError("--stockout-samples/--stockout-seed need a \"stockout\" section in --config")
     
     # Allocate products
     click.echo("Running allocation...")
     results = allocator.allocate_products(products_data)
     
     click.echo(f"Allocated {len(results)} products")
+    if previous_results:
+        click.echo(f"Incremental stats: {allocator.stats}")
     
     # Save results
-    output_data = [result.dict() for result in results]
-    with open(output, 'w') as f:
-        json.dump(output_data, f, indent=2, default=str)
+    try:
+        with metrics.phase("serialization"):
+            write_results(results, Path(output), output_format)
+    except ImportError as e:
+        raise click.ClickException(str(e))
     
     click.echo(f"Results saved to {output}")
     
@@ -69,11 +220,198 @@ def main(products, nodes, edges, config, output):
     click.echo(f"  Total products allocated: {len(results)}")
     click.echo(f"  Total cost: ${total_cost:,.2f}")
     click.echo(f"  Average lead time: {avg_lead_time:.1f} days")
+    footprint = allocator.path_plan_footprint()
+    if footprint["trees"] or footprint["origins"]:
+        click.echo(f"  Path plans: {footprint['paths']:,} paths from {footprint['origins']} origins "
+                   f"({footprint['bytes'] / 2**20:,.1f} MiB)")
+    if allocator.stockout is not None:
+        click.echo(f"  At stockout risk: {sum(r.stockout_risk for r in results)}")
+    if getattr(allocator, "split_report", None) is not None:
+        report = allocator.split_report
+        split_path = Path(output).with_suffix(".splits.csv")
+        report.to_csv(split_path, index=False)
+        click.echo(f"  Split rows: {len(report)} for {report['razin'].nunique()} SKUs, saved to {split_path}")
+    if sensitivity:
+        with metrics.phase("sensitivity"):
+            skus, lanes = SensitivityAnalyzer(allocator).analyze(products_data, results)
+        sku_path = Path(output).with_suffix(".sensitivity.csv")
+        lane_path = Path(output).with_suffix(".breakeven.csv")
+        skus.to_csv(sku_path, index=False)
+        lanes.to_csv(lane_path, index=False)
+        click.echo(f"  Sensitivity: {int(skus['runner_up'].notna().sum())} SKUs with a runner-up path, "
+                   f"{int((skus['critical_change'].abs() <= 0.1).sum())} switch within a 10% lane rate change; "
+                   f"saved to {sku_path} and {lane_path}")
+    if allocator.consolidation_report is not None:
+        report = allocator.consolidation_report
+        click.echo(f"  Total cost with shared containers: ${sum(r.consolidated_cost for r in results):,.2f}")
+        click.echo(f"\nContainers by ocean lane:\n{report.to_string(index=False, float_format='{:,.2f}'.format)}")
     
     # Show cache stats
     if hasattr(evaluator.evaluate, 'cache_stats'):
         stats = evaluator.evaluate.cache_stats()
         click.echo(f"\nCache performance: {stats}")
+        metrics.set_gauge("evaluator_cache_hits", stats.hits)
+        metrics.set_gauge("evaluator_cache_misses", stats.misses)
+        metrics.set_gauge("evaluator_cache_size", stats.size)
+    
+    if metrics_out:
+        for name, count in getattr(allocator, "stats", {}).items():
+            metrics.incr("previous_results_chunks", count, outcome=name)
+        metrics.attach("evaluator_methods", evaluator.method_stats())
+        json_path, prom_path = metrics.write(Path(metrics_out))
+        click.echo(f"\nPhase timings:\n{metrics.summary()}")
+        click.echo(f"\nEvaluator methods by total time:\n{evaluator.method_stats().report(top=15)}")
+        click.echo(f"Metrics saved to {json_path} and {prom_path}")
+    
+    if profile:
+        written = metrics.profiler.save(Path(output))
+        click.echo(f"\nProfile saved to {', '.join(str(path) for path in written)}")
+
+
+
+@main.command(name="compile")
+@click.option('--nodes', type=click.Path(exists=True), required=True, help='Nodes CSV file')
+@click.option('--edges', type=click.Path(exists=True), required=True, help='Node-Node CSV file')
+@click.option('--config', type=click.Path(), default='config/evaluators.json', help='Evaluator config')
+@click.option('--output', type=click.Path(), default='network.snap', help='Snapshot file')
+@click.option('--max-hops', type=click.IntRange(min=1), default=5, help='Path length cutoff for path plans')
+def compile_network(nodes, edges, config, output, max_hops):
+    """Compile a network and evaluator config into an mmap-able snapshot."""
+    from .utils import load_nodes, load_edges, validate_network_integrity
+    from .graph import NetworkBuilder, compile_snapshot
+    from .evaluators import load_evaluator_config
+    
+    nodes_data = load_nodes(Path(nodes))
+    edges_data = load_edges(Path(edges))
+    validate_network_integrity(nodes_data, edges_data)
+    
+    builder = NetworkBuilder()
+    builder.build(nodes_data, edges_data)
+    builder.validate_connectivity()
+    
+    summary = compile_snapshot(builder, load_evaluator_config(Path(config)), Path(output), max_hops=max_hops)
+    click.echo(f"Compiled snapshot to {output}: {summary}")
+
+
+@main.command()
+@click.option('--products', type=click.Path(exists=True), required=True, help='Products CSV file')
+@click.option('--nodes', type=click.Path(exists=True), required=True, help='Base nodes CSV file')
+@click.option('--edges', type=click.Path(exists=True), required=True, help='Base Node-Node CSV file')
+@click.option('--config', type=click.Path(), default='config/evaluators.json', help='Base evaluator config')
+@click.option('--scenarios', type=click.Path(exists=True), required=True,
+              help='Scenarios JSON: named lists of rate, lane and node deltas against the base')
+@click.option('--workers', type=click.IntRange(min=1), default=None,
+              help='Worker processes (default: one per CPU; 1 runs in this process)')
+@click.option('--output', type=click.Path(), default='scenarios.csv',
+              help='Comparison table CSV; changed allocations are written beside it (.changes.csv)')
+def sweep(products, nodes, edges, config, scenarios, workers, output):
+    """Compare what-if scenarios against one base allocation."""
+    from .utils import load_products, load_nodes, load_edges, validate_network_integrity
+    from .evaluators import load_evaluator_config
+    from .allocation import ScenarioRunner, load_scenarios
+    
+    products_data = load_products(Path(products))
+    nodes_data = load_nodes(Path(nodes))
+    edges_data = load_edges(Path(edges))
+    validate_network_integrity(nodes_data, edges_data)
+    try:
+        scenario_list = load_scenarios(Path(scenarios))
+    except (KeyError, ValueError) as e:
+        raise click.ClickException(f"Invalid scenarios file {scenarios}: {e}")
+    
+    runner = ScenarioRunner(products_data, nodes_data, edges_data, load_evaluator_config(Path(config)), workers=workers)
+    click.echo(f"Allocating base: {len(products_data)} products, {len(nodes_data)} nodes, {len(edges_data)} edges")
+    runner.allocate_base()
+    click.echo(f"Running {len(scenario_list)} scenarios...")
+    try:
+        summary, changes = runner.run(scenario_list)
+    except ValueError as e:
+        raise click.ClickException(str(e))
+    
+    summary.to_csv(output, index=False)
+    changes_path = Path(output).with_suffix(".changes.csv")
+    changes.to_csv(changes_path, index=False)
+    click.echo(f"\n{summary.to_string(index=False, float_format='{:,.2f}'.format)}")
+    click.echo(f"\nComparison saved to {output}, {len(changes)} changed allocations to {changes_path}")
+
+
+@main.command(name="import-results")
+@click.argument('results', nargs=-1, required=True, type=click.Path(exists=True))
+@click.option('--db', type=click.Path(), default='results.db', help='Results store (SQLite) to import into')
+def import_results(results, db):
+    """Import results files (any format) into a SQLite results store, one run each."""
+    from .utils import ResultsStore
+    
+    with ResultsStore(Path(db)) as store:
+        for results_file in results:
+            run_id, count = store.import_file(Path(results_file))
+            click.echo(f"Imported {count} results from {results_file} as run {run_id}")
+
+
+@main.command()
+@click.option('--db', type=click.Path(exists=True), default='results.db', help='Results store (SQLite)')
+@click.option('--run', 'run_id', type=int, default=None, help='Run id (default: latest run)')
+@click.option('--all-runs', is_flag=True, help='Query every run in the store')
+@click.option('--razin', default=None, help='Product SKU')
+@click.option('--destination', default=None, help='Destination FC')
+@click.option('--lane', nargs=2, default=None, metavar='FROM TO', help='Lane used by the selected path')
+@click.option('--node', default=None, help='Node on the selected path')
+@click.option('--path', 'path_hash', default=None, help='Path hash')
+@click.option('--lead-time', default=None, metavar='MIN-MAX', help='Lead-time band in days, e.g. 10-20 or 30-')
+@click.option('--order-by', type=click.Choice(['cost', 'lead_time', 'cm3', 'razin']), default=None)
+@click.option('--limit', type=int, default=None)
+@click.option('--json', 'as_json', is_flag=True, help='Print JSON lines instead of a table')
+@click.option('--list-runs', is_flag=True, help='List runs in the store and exit')
+def query(db, run_id, all_runs, razin, destination, lane, node, path_hash, lead_time,
+          order_by, limit, as_json, list_runs):
+    """Query a SQLite results store."""
+    import json
+    from .utils import ResultsStore
+    
+    min_lead_time = max_lead_time = None
+    if lead_time:
+        low, _, high = lead_time.partition('-')
+        try:
+            min_lead_time = int(low) if low else None
+            max_lead_time = int(high) if high else None
+        except ValueError:
+            raise click.BadParameter("expected MIN-MAX, e.g. 10-20", param_hint='--lead-time')
+    
+    with ResultsStore(Path(db)) as store:
+        if list_runs:
+            for run in store.runs():
+                click.echo(f"{run['run_id']}\t{run['created_at']}\t{run['results']}\t{run['source']}")
+            return
+        
+        if run_id is None and not all_runs:
+            run_id = store.latest_run()
+        
+        rows = store.query(
+            run_id=run_id,
+            razin=razin,
+            destination=destination,
+            lane=tuple(lane) if lane else None,
+            node=node,
+            path=path_hash,
+            min_lead_time=min_lead_time,
+            max_lead_time=max_lead_time,
+            order_by=order_by,
+            limit=limit
+        )
+        
+        count = 0
+        for row in rows:
+            count += 1
+            if as_json:
+                click.echo(json.dumps(row))
+            else:
+                click.echo(
+                    f"{row['razin']}\t{row['total_cost']:,.2f}\t{row['total_lead_time']}d\t"
+                    f"{row['cm3_score']:.4g}\t{' -> '.join(row['selected_path'])}"
+                )
+        
+        if not as_json:
+            click.echo(f"{count} results")
 
 
 if __name__ == "__main__":
@@ -2,7 +2,7 @@
 
 from .product import Product, Chunk
 from .network import Node, Edge, NetworkGraph
-from .evaluation import EvaluationContext, AllocationResult
+from .evaluation import EvaluationContext, PathEvaluation, AllocationResult
 
 __all__ = [
     "Product",
@@ -11,5 +11,6 @@ __all__ = [
     "Edge",
     "NetworkGraph",
     "EvaluationContext",
+    "PathEvaluation",
     "AllocationResult",
 ]
\ No newline at end of file
@@ -1,13 +1,20 @@
 """Evaluation context and result models."""
 
-from pydantic import BaseModel, Field
-from typing import List, Dict, Any, Optional
+from pydantic import BaseModel, ConfigDict, Field
+from typing import List, Dict, Any, Optional, Sequence
 from datetime import datetime
 
 from .product import Chunk
 from .network import Node, Edge
 
 
+# Product fields an evaluator can read for a chunk (formulas see them by these names)
+CHUNK_FIELDS = {"qty", "cm3", "mc_volume", "parcels_per_mc", "is_oversize", "hazmat_class"}
+
+# Memo key fields when an evaluator does not say what a method reads
+ALL_KEY_FIELDS = tuple(sorted(CHUNK_FIELDS)) + ("razin",)
+
+
 class EvaluationContext(BaseModel):
     """Context for evaluator execution."""
     
@@ -16,11 +23,16 @@ class EvaluationContext(BaseModel):
     to_node: Optional[str] = Field(None, description="Destination node")
     current_node: Optional[str] = Field(None, description="Current node")
     method: str = Field(..., description="Evaluator method name")
+    kind: Optional[str] = Field(None, description="What is evaluated: cost, feasibility or lt")
     supplemental_data: Dict[str, Any] = Field(default_factory=dict)
     
     @property
     def cache_key(self) -> str:
-        """Generate cache key for memoization."""
+        """Memo key over every product field and the SKU."""
+        return self.key_for(ALL_KEY_FIELDS)
+    
+    def key_for(self, fields: Sequence[str]) -> str:
+        """Memo key of the method, node or edge, and the given product fields."""
         parts = [self.method]
         
         if self.from_node and self.to_node:
@@ -28,12 +40,8 @@ class EvaluationContext(BaseModel):
         elif self.current_node:
             parts.append(self.current_node)
         
-        # Add relevant chunk attributes
-        parts.extend([
-            str(self.chunk.qty),
-            str(self.chunk.product.is_oversize),
-            self.chunk.product.razin
-        ])
+        product = self.chunk.product
+        parts.extend([str(getattr(product, field)) for field in fields])
         
         return ":".join(parts)
 
@@ -52,6 +60,9 @@ class PathEvaluation(BaseModel):
 class AllocationResult(BaseModel):
     """Final allocation result."""
     
+    # Write an infinite CM3 score (zero-cost path) as Infinity, not null
+    model_config = ConfigDict(ser_json_inf_nan="constants")
+    
     chunk_id: str = Field(..., description="Allocated chunk")
     razin: str = Field(..., description="Product SKU")
     selected_path: List[str] = Field(..., description="Chosen path")
@@ -60,4 +71,6 @@ class AllocationResult(BaseModel):
     cm3_score: float = Field(...)
     eta: datetime = Field(..., description="Estimated arrival")
     feasible: bool = Field(...)
-    stockout_risk: bool = Field(default=False)
\ No newline at end of file
+    stockout_risk: bool = Field(default=False)
+    stockout_probability: float = Field(default=0.0, ge=0, le=1, description="Share of simulated lead times past the buffer")
+    consolidated_cost: Optional[float] = Field(default=None, ge=0, description="Cost with shared ocean containers")
\ No newline at end of file
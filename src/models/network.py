@@ -1,8 +1,7 @@
 """Network graph data models."""
 
-from pydantic import BaseModel, Field, validator
+from pydantic import BaseModel, Field, validator, model_validator
 from typing import Optional, List, Dict, Any
-import networkx as nx
 
 
 class Node(BaseModel):
@@ -16,11 +15,12 @@ class Node(BaseModel):
     feasibility_method: str = Field(default="1", description="Feasibility evaluator")
     lt_method: str = Field(default="0", description="Lead time evaluator")
     
-    @validator("name")
-    def default_supplier(cls, v, values):
-        if not v and values.get("node_group") == "Supplier":
-            return "Supplier"
-        return v
+    @model_validator(mode="after")
+    def default_supplier(self):
+        # Runs after all fields are set: node_group is declared after name
+        if not self.name and self.node_group == "Supplier":
+            self.name = "Supplier"
+        return self
 
 
 class Edge(BaseModel):
@@ -31,12 +31,21 @@ class Edge(BaseModel):
     cost_method: str = Field(default="0", description="Cost evaluator")
     feasibility_method: str = Field(default="1", description="Feasibility evaluator")
     lt_method: str = Field(default="0", description="Lead time evaluator")
+    carriers: Optional[str] = Field(None, description="Semicolon-separated carriers serving the lane")
+    departures: Optional[str] = Field(None, description="Semicolon-separated departure weekdays, e.g. Mon;Thu")
     
     @validator("node1", "node2")
     def validate_nodes(cls, v):
         if not v or not v.strip():
             raise ValueError("Node cannot be empty")
         return v.strip()
+    
+    @validator("carriers", "departures", pre=True)
+    def blank_to_none(cls, v):
+        # Blank CSV cells arrive as NaN
+        if v is None or v != v or not str(v).strip():
+            return None
+        return str(v).strip()
 
 
 class NetworkGraph(BaseModel):
@@ -48,8 +57,10 @@ class NetworkGraph(BaseModel):
     class Config:
         arbitrary_types_allowed = True
     
-    def to_networkx(self) -> nx.DiGraph:
+    def to_networkx(self) -> "nx.DiGraph":
         """Convert to NetworkX directed graph."""
+        import networkx as nx
+        
         G = nx.DiGraph()
         
         # Add nodes with attributes
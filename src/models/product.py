@@ -5,6 +5,10 @@ from typing import Optional
 from datetime import date
 
 
+# Origin of products without an origin column, as in single-supplier networks
+DEFAULT_ORIGIN = "Supplier"
+
+
 class Product(BaseModel):
     """Product/SKU definition from Products.csv."""
     
@@ -16,12 +20,28 @@ class Product(BaseModel):
     is_oversize: int = Field(..., ge=0, le=1, description="Oversize flag")
     parcels_per_mc: int = Field(..., gt=0, description="Units per master carton")
     currency: str = Field(default="USD", description="Currency")
+    hazmat_class: Optional[str] = Field(None, description="Hazmat class, e.g. Class 9")
+    ready_date: Optional[date] = Field(None, description="Date the goods are ready at the origin")
+    origin: Optional[str] = Field(None, description="Supplier node the product ships from")
     
     @validator("razin", "asin")
     def validate_not_empty(cls, v):
         if not v or not v.strip():
             raise ValueError("Cannot be empty")
         return v.strip()
+    
+    @validator("hazmat_class", "origin", pre=True)
+    def blank_to_none(cls, v):
+        # Blank CSV cells arrive as NaN
+        if v is None or v != v or not str(v).strip():
+            return None
+        return str(v).strip()
+    
+    @validator("ready_date", pre=True)
+    def blank_date_to_none(cls, v):
+        if v is None or v != v or (isinstance(v, str) and not v.strip()):
+            return None
+        return v
 
 
 class Chunk(BaseModel):
@@ -29,7 +49,7 @@ class Chunk(BaseModel):
     
     chunk_id: str = Field(..., description="Unique chunk identifier")
     product: Product = Field(..., description="Source product")
-    origin: str = Field(default="Supplier", description="Starting location")
+    origin: str = Field(default=DEFAULT_ORIGIN, description="Starting location")
     ready_date: Optional[date] = Field(None, description="Availability date")
     
     @property
@@ -0,0 +1,6 @@
+"""Long-lived allocation service keeping the graph and caches warm."""
+
+from .server import AllocationService, serve_http, serve_stdin
+from .client import AllocationClient
+
+__all__ = ["AllocationService", "serve_http", "serve_stdin", "AllocationClient"]
@@ -0,0 +1,36 @@
+"""Command-line entry point for the allocation service."""
+
+import asyncio
+
+import click
+
+from .server import AllocationService, serve_http, serve_stdin
+
+
+@click.command()
+@click.option('--nodes', type=click.Path(exists=True), required=True, help='Nodes CSV file')
+@click.option('--edges', type=click.Path(exists=True), required=True, help='Node-Node CSV file')
+@click.option('--config', type=click.Path(), default='config/evaluators.json', help='Evaluator config')
+@click.option('--beam-width', type=click.IntRange(min=1), default=None,
+              help='Approximate search keeping the best N partial paths per stage (default: exact)')
+@click.option('--host', default='127.0.0.1', help='HTTP bind address')
+@click.option('--port', type=int, default=8765, help='HTTP port')
+@click.option('--stdin', 'use_stdin', is_flag=True, help='Serve JSON-lines requests on stdin instead of HTTP')
+def main(nodes, edges, config, beam_width, host, port, use_stdin):
+    """Run the allocation service with the network and caches kept warm."""
+    # Only the stdin client, the process owner, may reload from other files
+    service = AllocationService(nodes, edges, config, beam_width=beam_width, reload_paths=use_stdin)
+    
+    try:
+        if use_stdin:
+            asyncio.run(serve_stdin(service))
+        else:
+            asyncio.run(serve_http(service, host, port))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        service.executor.shutdown(wait=False)
+
+
+if __name__ == "__main__":
+    main()
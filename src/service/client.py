@@ -0,0 +1,45 @@
+"""Client for the allocation service."""
+
+import json
+from typing import Any, Dict, List, Optional
+from urllib import request as urlrequest
+from urllib.error import HTTPError
+
+from ..models import Product
+
+
+class AllocationClient:
+    """Talks to a running allocation service over HTTP."""
+    
+    def __init__(self, url: str = "http://127.0.0.1:8765", timeout: float = 300.0):
+        self.url = url.rstrip("/")
+        self.timeout = timeout
+    
+    def _call(self, method: str, path: str, payload: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        data = json.dumps(payload).encode() if payload is not None else None
+        req = urlrequest.Request(
+            f"{self.url}{path}",
+            data=data,
+            method=method,
+            headers={"Content-Type": "application/json"}
+        )
+        
+        try:
+            with urlrequest.urlopen(req, timeout=self.timeout) as response:
+                return json.loads(response.read())
+        except HTTPError as e:
+            error = json.loads(e.read() or b"{}").get("error", e.reason)
+            raise RuntimeError(f"Allocation service error {e.code}: {error}") from None
+    
+    def allocate(self, products: List[Any]) -> Dict[str, Any]:
+        """Allocate products given as Product models or plain dicts."""
+        rows = [p.model_dump() if isinstance(p, Product) else p for p in products]
+        return self._call("POST", "/allocate", {"products": rows})
+    
+    def status(self) -> Dict[str, Any]:
+        """Fetch service, network and cache status."""
+        return self._call("GET", "/status")
+    
+    def reload(self) -> Dict[str, Any]:
+        """Re-read the server's network and evaluator config files."""
+        return self._call("POST", "/reload", {})
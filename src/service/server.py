@@ -0,0 +1,282 @@
+"""Asyncio JSON-over-HTTP and stdin JSON-lines allocation server."""
+
+import asyncio
+import json
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from ..models import Product
+from ..utils import load_nodes, load_edges, validate_network_integrity
+from ..graph import NetworkBuilder
+from ..evaluators import create_evaluator, load_evaluator_config, apply_evaluator_config
+from ..allocation import Allocator, BeamSearchAllocator, diff_networks
+from ..allocation.incremental import evict_changed_entries
+
+
+class AllocationService:
+    """Holds the network, evaluator and allocator for the life of the process.
+    
+    All allocations and reloads run on one worker thread: the evaluator
+    cache is shared process state, and serializing access keeps reloads
+    from swapping the network under a running allocation. The event loop
+    stays free to accept connections and answer status requests.
+    
+    Reloads re-read the files given at startup. Only with ``reload_paths``
+    (the stdin mode, whose client is the process owner) may a reload name
+    other files; HTTP clients cannot point the server at arbitrary paths.
+    """
+    
+    def __init__(self, nodes_path: Path, edges_path: Path, config_path: Path,
+                 beam_width: Optional[int] = None, reload_paths: bool = False):
+        self.nodes_path = Path(nodes_path)
+        self.edges_path = Path(edges_path)
+        self.config_path = Path(config_path)
+        self.beam_width = beam_width
+        self.reload_paths = reload_paths
+        
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="allocator")
+        self.started_at = time.time()
+        self.counters = {"requests": 0, "allocated": 0, "errors": 0, "reloads": 0, "in_flight": 0}
+        
+        self.nodes, self.edges = self._load_network(self.nodes_path, self.edges_path)
+        self.builder = self._build(self.nodes, self.edges)
+        self.evaluator = create_evaluator(load_evaluator_config(self.config_path))
+        self.allocator = self._make_allocator()
+    
+    def _load_network(self, nodes_path: Path, edges_path: Path) -> Tuple[list, list]:
+        """Load and validate node and edge CSVs."""
+        nodes = load_nodes(nodes_path)
+        edges = load_edges(edges_path)
+        validate_network_integrity(nodes, edges)
+        return nodes, edges
+    
+    def _build(self, nodes: list, edges: list) -> NetworkBuilder:
+        """Build and validate the network graph."""
+        builder = NetworkBuilder()
+        builder.build(nodes, edges)
+        builder.validate_connectivity()
+        return builder
+    
+    def _make_allocator(self) -> Allocator:
+        if self.beam_width:
+            return BeamSearchAllocator(self.builder, self.evaluator, beam_width=self.beam_width)
+        return Allocator(self.builder, self.evaluator)
+    
+    def allocate(self, rows: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Allocate a batch of product rows and return JSON-ready results."""
+        start_time = time.perf_counter()
+        products = [Product(**row) for row in rows]
+        results = self.allocator.allocate_products(products)
+        self.counters["allocated"] += len(results)
+        
+        return {
+            "allocated": len(results),
+            "elapsed": time.perf_counter() - start_time,
+            "results": [result.model_dump(mode="json") for result in results]
+        }
+    
+    def reload(self, nodes: Optional[str] = None, edges: Optional[str] = None,
+               config: Optional[str] = None) -> Dict[str, Any]:
+        """Hot-reload the network and/or evaluator config.
+        
+        Paths default to the ones loaded at startup, so an empty request
+        re-reads the same files; other paths need ``reload_paths``. Only
+        cache entries for changed nodes, edges and evaluator methods are
+        evicted.
+        """
+        if (nodes or edges or config) and not self.reload_paths:
+            raise ValueError("Reload paths are fixed to the files the service was started with")
+        nodes_path = Path(nodes) if nodes else self.nodes_path
+        edges_path = Path(edges) if edges else self.edges_path
+        config_path = Path(config) if config else self.config_path
+        
+        # Load everything before swapping anything, so a bad file leaves
+        # the running state untouched
+        new_config = load_evaluator_config(config_path)
+        new_nodes, new_edges = self._load_network(nodes_path, edges_path)
+        diff = diff_networks(self.nodes, self.edges, new_nodes, new_edges)
+        builder = self._build(new_nodes, new_edges) if not diff.is_empty else self.builder
+        
+        if new_config.get("evaluator_type", "simple") != self.evaluator.config.get("evaluator_type", "simple"):
+            self.evaluator = create_evaluator(new_config)
+            self.evaluator.evaluate.clear_cache()
+            changed_methods = set(new_config.get("evaluators", {}))
+        else:
+            evict_changed_entries(self.evaluator, diff)
+            changed_methods = apply_evaluator_config(self.evaluator, new_config)
+        
+        self.builder = builder
+        self.nodes, self.edges = new_nodes, new_edges
+        self.nodes_path, self.edges_path, self.config_path = nodes_path, edges_path, config_path
+        self.allocator = self._make_allocator()
+        self.counters["reloads"] += 1
+        
+        return {
+            "network_diff": str(diff),
+            "changed_methods": sorted(changed_methods)
+        }
+    
+    def status(self) -> Dict[str, Any]:
+        """Service, network and cache status."""
+        status = {
+            "uptime": time.time() - self.started_at,
+            "counters": dict(self.counters),
+            "network": {
+                "nodes": str(self.nodes_path),
+                "edges": str(self.edges_path),
+                "config": str(self.config_path),
+                "total_nodes": self.builder.graph.number_of_nodes(),
+                "total_edges": self.builder.graph.number_of_edges(),
+                "beam_width": self.beam_width
+            }
+        }
+        
+        if hasattr(self.evaluator.evaluate, 'cache_stats'):
+            stats = self.evaluator.evaluate.cache_stats()
+            status["cache"] = {
+                "hits": stats.hits,
+                "misses": stats.misses,
+                "hit_rate": stats.hit_rate,
+                "size": stats.size
+            }
+        
+        # Slowest evaluator methods, cumulative since start
+        status["evaluator_methods"] = self.evaluator.method_stats().to_dict()[:10]
+        
+        return status
+    
+    async def handle(self, op: str, payload: Dict[str, Any]) -> Dict[str, Any]:
+        """Dispatch one request; allocate and reload run on the worker thread."""
+        loop = asyncio.get_running_loop()
+        self.counters["requests"] += 1
+        
+        if op == "status":
+            return self.status()
+        
+        self.counters["in_flight"] += 1
+        try:
+            if op == "allocate":
+                return await loop.run_in_executor(self.executor, self.allocate, payload.get("products", []))
+            if op == "reload":
+                return await loop.run_in_executor(
+                    self.executor,
+                    lambda: self.reload(payload.get("nodes"), payload.get("edges"), payload.get("config"))
+                )
+        finally:
+            self.counters["in_flight"] -= 1
+        
+        raise KeyError(op)
+
+
+ROUTES = {
+    ("GET", "/status"): "status",
+    ("POST", "/allocate"): "allocate",
+    ("POST", "/reload"): "reload",
+}
+
+STATUS_TEXT = {200: "OK", 400: "Bad Request", 404: "Not Found", 500: "Internal Server Error"}
+
+
+async def _read_request(reader: asyncio.StreamReader) -> Tuple[str, str, bytes]:
+    """Read a minimal HTTP/1.1 request: request line, headers and body."""
+    request_line = (await reader.readline()).decode("latin-1").strip()
+    if not request_line:
+        raise ConnectionResetError
+    method, target, _ = request_line.split(" ", 2)
+    
+    content_length = 0
+    while True:
+        line = (await reader.readline()).decode("latin-1").strip()
+        if not line:
+            break
+        name, _, value = line.partition(":")
+        if name.strip().lower() == "content-length":
+            content_length = int(value.strip())
+    
+    body = await reader.readexactly(content_length) if content_length else b""
+    return method.upper(), target.split("?", 1)[0], body
+
+
+def _write_response(writer: asyncio.StreamWriter, status: int, payload: Dict[str, Any]) -> None:
+    body = json.dumps(payload).encode()
+    head = (
+        f"HTTP/1.1 {status} {STATUS_TEXT[status]}\r\n"
+        "Content-Type: application/json\r\n"
+        f"Content-Length: {len(body)}\r\n"
+        "Connection: close\r\n\r\n"
+    )
+    writer.write(head.encode("latin-1") + body)
+
+
+async def _dispatch(service: AllocationService, op: Optional[str], payload: Any) -> Tuple[int, Dict[str, Any]]:
+    """Run one operation and map failures to status codes."""
+    if op is None:
+        return 404, {"error": "Unknown endpoint"}
+    if not isinstance(payload, dict):
+        return 400, {"error": "Request body must be a JSON object"}
+    
+    try:
+        return 200, await service.handle(op, payload)
+    except (ValueError, TypeError, KeyError) as e:
+        service.counters["errors"] += 1
+        return 400, {"error": str(e)}
+    except Exception as e:
+        service.counters["errors"] += 1
+        return 500, {"error": f"{type(e).__name__}: {e}"}
+
+
+async def serve_http(service: AllocationService, host: str = "127.0.0.1", port: int = 8765) -> None:
+    """Serve GET /status, POST /allocate and POST /reload until cancelled."""
+    
+    async def on_connection(reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            method, path, body = await _read_request(reader)
+            try:
+                payload = json.loads(body) if body else {}
+            except json.JSONDecodeError as e:
+                status, response = 400, {"error": f"Invalid JSON: {e}"}
+            else:
+                status, response = await _dispatch(service, ROUTES.get((method, path)), payload)
+            _write_response(writer, status, response)
+            await writer.drain()
+        except (ConnectionResetError, asyncio.IncompleteReadError, ValueError):
+            pass
+        finally:
+            writer.close()
+    
+    server = await asyncio.start_server(on_connection, host, port)
+    print(f"Allocation service listening on http://{host}:{port}", file=sys.stderr)
+    async with server:
+        await server.serve_forever()
+
+
+async def serve_stdin(service: AllocationService) -> None:
+    """Serve JSON-lines requests from stdin, one JSON response line each.
+    
+    Each line is an object with an ``op`` of ``allocate``, ``status`` or
+    ``reload`` plus that operation's fields; an optional ``id`` is echoed.
+    """
+    loop = asyncio.get_running_loop()
+    
+    while True:
+        line = await loop.run_in_executor(None, sys.stdin.readline)
+        if not line:
+            break
+        if not line.strip():
+            continue
+        
+        try:
+            request = json.loads(line)
+        except json.JSONDecodeError as e:
+            status, response = 400, {"error": f"Invalid JSON: {e}"}
+            request = {}
+        else:
+            op = request.get("op") if isinstance(request, dict) else None
+            status, response = await _dispatch(service, op if op in ROUTES.values() else None, request)
+        
+        response = {"id": request.get("id") if isinstance(request, dict) else None, "status": status, **response}
+        sys.stdout.write(json.dumps(response) + "\n")
+        sys.stdout.flush()
@@ -1,6 +1,48 @@
 """Utility functions."""
 
 from .memoization import memoize, CacheStats
-from .csv_loader import load_products, load_nodes, load_edges, validate_network_integrity
+from .csv_loader import (
+    load_products, load_nodes, load_edges, load_hazmat_rules, load_demand, parse_carriers, parse_departures,
+    validate_network_integrity
+)
+from .results_io import (
+    RESULT_FORMATS,
+    load_results,
+    iter_result_rows,
+    open_result_writer,
+    write_results,
+    infer_format,
+)
+from .results_summary import ResultsSummary, QuantileSketch, summarize_files
+from .results_store import ResultsStore
+from .metrics import Metrics
+from .profiling import Profiler
+from .fingerprint import network_fingerprint, config_fingerprint, chunk_fingerprint
 
-__all__ = ["memoize", "CacheStats", "load_products", "load_nodes", "load_edges", "validate_network_integrity"]
\ No newline at end of file
+__all__ = [
+    "memoize",
+    "CacheStats",
+    "load_products",
+    "load_nodes",
+    "load_edges",
+    "load_hazmat_rules",
+    "load_demand",
+    "parse_carriers",
+    "parse_departures",
+    "validate_network_integrity",
+    "RESULT_FORMATS",
+    "load_results",
+    "iter_result_rows",
+    "open_result_writer",
+    "write_results",
+    "infer_format",
+    "ResultsSummary",
+    "QuantileSketch",
+    "summarize_files",
+    "ResultsStore",
+    "Metrics",
+    "Profiler",
+    "network_fingerprint",
+    "config_fingerprint",
+    "chunk_fingerprint",
+]
\ No newline at end of file
@@ -0,0 +1,248 @@
+"""In-process benchmark harness.
+
+Benchmarks run in the current interpreter, so timings exclude interpreter
+startup and imports. Each benchmark is warmed up, then timed over several
+repeats; a final untimed run under tracemalloc records its peak traced
+memory. Results can be saved as a JSON baseline and later runs compared
+against it, flagging benchmarks that got slower or use more memory.
+"""
+
+import fnmatch
+import gc
+import json
+import platform
+import statistics
+import time
+import tracemalloc
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+
+class BenchmarkResult:
+    """Timings (seconds per call) and peak memory of one benchmark."""
+    
+    def __init__(self, name: str, group: str, times: List[float], number: int = 1,
+                 peak_bytes: Optional[int] = None):
+        self.name = name
+        self.group = group
+        self.times = times
+        self.number = number
+        self.peak_bytes = peak_bytes
+    
+    @property
+    def best(self) -> float:
+        return min(self.times)
+    
+    @property
+    def median(self) -> float:
+        return statistics.median(self.times)
+    
+    @property
+    def stdev(self) -> float:
+        return statistics.stdev(self.times) if len(self.times) > 1 else 0.0
+    
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "name": self.name,
+            "group": self.group,
+            "number": self.number,
+            "times": self.times,
+            "best": self.best,
+            "median": self.median,
+            "stdev": self.stdev,
+            "peak_bytes": self.peak_bytes
+        }
+    
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "BenchmarkResult":
+        return cls(data["name"], data.get("group", ""), data["times"], data.get("number", 1),
+                   data.get("peak_bytes"))
+
+
+class Benchmark:
+    """A named callable; ``setup`` builds its input once, outside the timings."""
+    
+    def __init__(self, name: str, func: Callable, group: str = "micro",
+                 setup: Optional[Callable[[], Any]] = None, number: int = 1):
+        self.name = name
+        self.func = func
+        self.group = group
+        self.setup = setup
+        self.number = number
+    
+    def run(self, repeat: int = 5, warmup: int = 1, memory: bool = True) -> BenchmarkResult:
+        """Warm up, time ``repeat`` rounds of ``number`` calls, then measure peak memory."""
+        if self.setup is not None:
+            state = self.setup()
+            call = lambda: self.func(state)
+        else:
+            call = self.func
+        
+        for _ in range(warmup):
+            call()
+        
+        times = []
+        for _ in range(repeat):
+            gc.collect()
+            start = time.perf_counter()
+            for _ in range(self.number):
+                call()
+            times.append((time.perf_counter() - start) / self.number)
+        
+        peak_bytes = None
+        if memory:
+            gc.collect()
+            tracemalloc.start()
+            try:
+                call()
+                peak_bytes = tracemalloc.get_traced_memory()[1]
+            finally:
+                tracemalloc.stop()
+        
+        return BenchmarkResult(self.name, self.group, times, self.number, peak_bytes)
+
+
+class BenchmarkSuite:
+    """Ordered collection of benchmarks."""
+    
+    def __init__(self):
+        self.benchmarks: Dict[str, Benchmark] = {}
+    
+    def add(self, name: str, func: Callable, group: str = "micro",
+            setup: Optional[Callable[[], Any]] = None, number: int = 1) -> Benchmark:
+        if name in self.benchmarks:
+            raise ValueError(f"Duplicate benchmark name: {name}")
+        benchmark = Benchmark(name, func, group, setup, number)
+        self.benchmarks[name] = benchmark
+        return benchmark
+    
+    def select(self, pattern: Optional[str] = None) -> List[Benchmark]:
+        """Benchmarks whose name or group matches a glob pattern (all if None)."""
+        if pattern is None:
+            return list(self.benchmarks.values())
+        return [
+            benchmark for benchmark in self.benchmarks.values()
+            if fnmatch.fnmatch(benchmark.name, pattern) or fnmatch.fnmatch(benchmark.group, pattern)
+        ]
+    
+    def run(self, pattern: Optional[str] = None, repeat: int = 5, warmup: int = 1, memory: bool = True,
+            progress: Optional[Callable[[BenchmarkResult], None]] = None) -> List[BenchmarkResult]:
+        results = []
+        for benchmark in self.select(pattern):
+            result = benchmark.run(repeat, warmup, memory)
+            if progress is not None:
+                progress(result)
+            results.append(result)
+        return results
+
+
+def save_baseline(results: List[BenchmarkResult], filepath: Path) -> None:
+    """Write results as a JSON baseline, with the interpreter and platform."""
+    data = {
+        "created_at": datetime.now().isoformat(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "results": [result.to_dict() for result in results]
+    }
+    with open(filepath, "w") as f:
+        json.dump(data, f, indent=2)
+
+
+def load_baseline(filepath: Path) -> Dict[str, BenchmarkResult]:
+    """Baseline results by benchmark name."""
+    with open(filepath) as f:
+        data = json.load(f)
+    return {entry["name"]: BenchmarkResult.from_dict(entry) for entry in data["results"]}
+
+
+class Comparison:
+    """A result against its baseline; ratios above 1 mean slower or larger."""
+    
+    def __init__(self, result: BenchmarkResult, baseline: Optional[BenchmarkResult],
+                 threshold: float, memory_threshold: float):
+        self.result = result
+        self.baseline = baseline
+        self.time_ratio = None
+        self.memory_ratio = None
+        
+        if baseline is None:
+            self.status = "new"
+            return
+        
+        # Best-of-N is the least noisy estimate of the undisturbed run time
+        self.time_ratio = result.best / baseline.best if baseline.best > 0 else None
+        if result.peak_bytes is not None and baseline.peak_bytes:
+            self.memory_ratio = result.peak_bytes / baseline.peak_bytes
+        
+        slower = self.time_ratio is not None and self.time_ratio > 1 + threshold
+        larger = self.memory_ratio is not None and self.memory_ratio > 1 + memory_threshold
+        faster = self.time_ratio is not None and self.time_ratio < 1 / (1 + threshold)
+        
+        if slower or larger:
+            self.status = "REGRESSION"
+        elif faster:
+            self.status = "improved"
+        else:
+            self.status = "ok"
+    
+    @property
+    def regressed(self) -> bool:
+        return self.status == "REGRESSION"
+
+
+def compare_results(results: List[BenchmarkResult], baseline: Dict[str, BenchmarkResult],
+                    threshold: float = 0.10, memory_threshold: float = 0.20) -> List[Comparison]:
+    """Compare results to a baseline; ``threshold`` is the tolerated relative slowdown."""
+    return [
+        Comparison(result, baseline.get(result.name), threshold, memory_threshold)
+        for result in results
+    ]
+
+
+def format_results(results: List[BenchmarkResult]) -> str:
+    """Table of best, median and peak memory per benchmark."""
+    lines = [f"  {'benchmark':<44}{'best':>12}{'median':>12}{'stdev':>10}{'peak mem':>12}"]
+    for result in results:
+        lines.append(
+            f"  {result.name:<44}{_duration(result.best):>12}{_duration(result.median):>12}"
+            f"{_percent(result.stdev / result.median if result.median else 0):>10}{_size(result.peak_bytes):>12}"
+        )
+    return "\n".join(lines)
+
+
+def format_comparison(comparisons: List[Comparison]) -> str:
+    """Table of time and memory changes against the baseline."""
+    lines = [f"  {'benchmark':<44}{'baseline':>12}{'current':>12}{'time':>9}{'memory':>9}  status"]
+    for comparison in comparisons:
+        baseline = comparison.baseline
+        lines.append(
+            f"  {comparison.result.name:<44}"
+            f"{_duration(baseline.best) if baseline else '-':>12}{_duration(comparison.result.best):>12}"
+            f"{_change(comparison.time_ratio):>9}{_change(comparison.memory_ratio):>9}  {comparison.status}"
+        )
+    return "\n".join(lines)
+
+
+def _duration(seconds: float) -> str:
+    for unit, scale in (("s", 1), ("ms", 1e-3), ("us", 1e-6)):
+        if seconds >= scale:
+            return f"{seconds / scale:.2f}{unit}"
+    return f"{seconds / 1e-9:.0f}ns"
+
+
+def _size(size: Optional[int]) -> str:
+    if size is None:
+        return "-"
+    for unit, scale in (("GiB", 1 << 30), ("MiB", 1 << 20), ("KiB", 1 << 10)):
+        if size >= scale:
+            return f"{size / scale:.1f}{unit}"
+    return f"{size}B"
+
+
+def _percent(value: float) -> str:
+    return f"{value * 100:.1f}%"
+
+
+def _change(ratio: Optional[float]) -> str:
+    return "-" if ratio is None else f"{(ratio - 1) * 100:+.1f}%"
@@ -1,7 +1,10 @@
-"""CSV data loading utilities."""
+"""CSV data loading utilities.
 
-import pandas as pd
-from typing import List, Dict, Any
+pandas is imported inside each loader rather than at module level, so
+importing ``src.utils`` (e.g. for memoization) stays cheap.
+"""
+
+from typing import List, Dict, Any, Optional, Set
 from pathlib import Path
 
 from ..models import Product, Node, Edge
@@ -9,6 +12,8 @@ from ..models import Product, Node, Edge
 
 def load_products(filepath: Path) -> List[Product]:
     """Load products from CSV."""
+    import pandas as pd
+    
     df = pd.read_csv(filepath)
     
     # Normalize column names
@@ -32,6 +37,8 @@ def load_products(filepath: Path) -> List[Product]:
 
 def load_nodes(filepath: Path) -> List[Node]:
     """Load nodes from CSV."""
+    import pandas as pd
+    
     df = pd.read_csv(filepath)
     
     # Normalize column names
@@ -57,6 +64,8 @@ def load_nodes(filepath: Path) -> List[Node]:
 
 def load_edges(filepath: Path) -> List[Edge]:
     """Load edges from CSV."""
+    import pandas as pd
+    
     df = pd.read_csv(filepath)
     
     # Normalize column names
@@ -81,6 +90,97 @@ def load_edges(filepath: Path) -> List[Edge]:
     return edges
 
 
+def load_hazmat_rules(filepath: Path) -> Dict[str, Set[str]]:
+    """Load the carriers allowed per hazmat class.
+    
+    ``allowed_carriers`` is a semicolon-separated list; a trailing "only"
+    is dropped, so "Ground transport only" allows carrier "Ground transport".
+    """
+    import pandas as pd
+    
+    df = pd.read_csv(filepath)
+    df.columns = df.columns.str.strip().str.lower().str.replace(' ', '_')
+    
+    rules = {}
+    for hazmat_class, allowed in zip(df['hazmat_class'], df['allowed_carriers']):
+        rules[str(hazmat_class).strip()] = parse_carriers(allowed)
+    
+    return rules
+
+
+def load_demand(filepath: Path) -> "pd.DataFrame":
+    """Load a per-SKU, per-FC demand matrix from CSV or Parquet.
+    
+    Wide files have a SKU column (``Razin (SKU)`` or ``razin``) and one
+    column per FC. Long files have ``razin``, ``destination`` and
+    ``demand`` columns instead. Returns demand indexed by SKU with one
+    column per FC; blank cells are 0 and repeated rows are summed.
+    """
+    import pandas as pd
+    
+    filepath = Path(filepath)
+    if filepath.suffix.lower() in (".parquet", ".pq"):
+        df = pd.read_parquet(filepath)
+    else:
+        df = pd.read_csv(filepath)
+    
+    # SKU, destination and demand columns are matched like product columns; FC columns keep their names
+    names = {column: str(column).strip().lower().replace(' ', '_') for column in df.columns}
+    sku_columns = [column for column, name in names.items() if name in ('razin', 'razin_(sku)')]
+    if not sku_columns:
+        raise ValueError(f"Demand file {filepath} has no SKU column")
+    if {'destination', 'demand'} <= set(names.values()):
+        df = df.rename(columns={column: name for column, name in names.items() if name in ('destination', 'demand')})
+        df = df.rename(columns={sku_columns[0]: 'razin'})
+        df = df.pivot_table(index='razin', columns='destination', values='demand', aggfunc='sum', fill_value=0)
+    else:
+        df = df.rename(columns={sku_columns[0]: 'razin'}).groupby('razin').sum()
+    
+    demand = df.fillna(0).astype(float)
+    demand.index = demand.index.astype(str).str.strip()
+    demand.columns = demand.columns.astype(str)
+    demand.columns.name = None
+    if (demand.values < 0).any():
+        raise ValueError(f"Demand file {filepath} has negative demand")
+    return demand
+
+
+def parse_carriers(value: Optional[str]) -> Set[str]:
+    """Split a semicolon-separated carrier list."""
+    if not value:
+        return set()
+    carriers = set()
+    for carrier in str(value).split(';'):
+        carrier = carrier.strip()
+        if carrier.lower().endswith(' only'):
+            carrier = carrier[:-len(' only')].strip()
+        if carrier:
+            carriers.add(carrier)
+    return carriers
+
+
+WEEKDAYS = ("mon", "tue", "wed", "thu", "fri", "sat", "sun")
+
+
+def parse_departures(value: Optional[str]) -> Optional[Set[int]]:
+    """Split a semicolon-separated list of departure weekdays into weekday numbers.
+    
+    Days are matched on their first three letters ("Mon", "monday"); a
+    blank value means the lane departs any day and gives None.
+    """
+    if not value:
+        return None
+    weekdays = set()
+    for day in str(value).split(';'):
+        day = day.strip().lower()
+        if not day:
+            continue
+        if day[:3] not in WEEKDAYS:
+            raise ValueError(f"Unknown departure day: {day!r}")
+        weekdays.add(WEEKDAYS.index(day[:3]))
+    return weekdays or None
+
+
 def validate_network_integrity(nodes: List[Node], edges: List[Edge]) -> None:
     """Validate that all edge nodes exist in node list."""
     node_names = {node.name for node in nodes}
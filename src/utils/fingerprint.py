@@ -0,0 +1,30 @@
+"""Content fingerprints for deterministic chunk identifiers."""
+
+import hashlib
+import json
+from typing import Any, Dict, Iterable
+
+from ..models import Product, Node, Edge
+
+
+def _digest(payload: str) -> str:
+    """Hex SHA-1 digest of a string."""
+    return hashlib.sha1(payload.encode()).hexdigest()
+
+
+def network_fingerprint(nodes: Iterable[Node], edges: Iterable[Edge]) -> str:
+    """Fingerprint a network independent of CSV row order."""
+    # Unset optional columns are left out, so adding one does not change ids
+    node_rows = sorted(node.model_dump_json(exclude_none=True) for node in nodes)
+    edge_rows = sorted(edge.model_dump_json(exclude_none=True) for edge in edges)
+    return _digest("\n".join(node_rows + ["--"] + edge_rows))
+
+
+def config_fingerprint(config: Dict[str, Any]) -> str:
+    """Fingerprint an evaluator configuration."""
+    return _digest(json.dumps(config, sort_keys=True, default=str))
+
+
+def chunk_fingerprint(product: Product, context_fingerprint: str, length: int = 16) -> str:
+    """Content-addressed chunk id from a product row and run context."""
+    return _digest(context_fingerprint + product.model_dump_json(exclude_none=True))[:length]
@@ -1,7 +1,9 @@
 """Memoization utilities for evaluator caching."""
 
 from functools import wraps
-from typing import Dict, Any, Callable, Optional
+from time import perf_counter_ns
+from typing import Dict, Any, Callable, List, Optional, Set, Tuple
+from collections import defaultdict
 import hashlib
 import json
 from datetime import datetime
@@ -25,10 +27,18 @@ class CacheStats:
 
 
 class EvaluatorCache:
-    """Cache for evaluator results."""
+    """Cache for evaluator results.
+    
+    Entries can be tagged with the evaluator method, node and edge they were
+    computed for. Secondary indexes on those tags make invalidation exact and
+    proportional to the number of affected entries.
+    """
     
     def __init__(self):
         self._cache: Dict[str, Any] = {}
+        self._by_method: Dict[str, Set[str]] = defaultdict(set)
+        self._by_node: Dict[str, Set[str]] = defaultdict(set)
+        self._by_edge: Dict[Tuple[str, str], Set[str]] = defaultdict(set)
         self.stats = CacheStats()
     
     def _hash_key(self, key: str) -> str:
@@ -44,60 +54,331 @@ class EvaluatorCache:
         self.stats.misses += 1
         return None
     
-    def set(self, key: str, value: Any) -> None:
-        """Store value in cache."""
+    def set(self, key: str, value: Any, method: Optional[str] = None,
+            node: Optional[str] = None, edge: Optional[Tuple[str, str]] = None) -> None:
+        """Store value in cache, indexed by method, node and edge if given."""
         hashed = self._hash_key(key)
+        if hashed in self._cache:
+            self._remove(hashed)
+        
         self._cache[hashed] = {
             "value": value,
             "timestamp": datetime.now(),
-            "key": key
+            "key": key,
+            "method": method,
+            "node": node,
+            "edge": edge
         }
+        
+        if method is not None:
+            self._by_method[method].add(hashed)
+        if node is not None:
+            self._by_node[node].add(hashed)
+        if edge is not None:
+            self._by_edge[edge].add(hashed)
+            # Edge entries also depend on both endpoint nodes
+            for endpoint in edge:
+                self._by_node[endpoint].add(hashed)
+        
         self.stats.size = len(self._cache)
     
     def clear(self) -> None:
         """Clear all cached values."""
         self._cache.clear()
+        self._by_method.clear()
+        self._by_node.clear()
+        self._by_edge.clear()
         self.stats = CacheStats()
     
-    def invalidate(self, pattern: str) -> None:
-        """Invalidate entries matching pattern."""
-        to_remove = []
-        for hashed, entry in self._cache.items():
-            if pattern in entry["key"]:
-                to_remove.append(hashed)
+    def invalidate(self, pattern: Optional[str] = None, method: Optional[str] = None,
+                   node: Optional[str] = None, edge: Optional[Tuple[str, str]] = None) -> int:
+        """Invalidate entries and return how many were removed.
+        
+        ``method``, ``node`` and ``edge`` use the secondary indexes and match
+        exactly; a node also matches edge entries it is an endpoint of.
+        ``pattern`` falls back to a substring scan over every stored key.
+        """
+        to_remove: Set[str] = set()
+        
+        if method is not None:
+            to_remove |= self._by_method.get(method, set())
+        if node is not None:
+            to_remove |= self._by_node.get(node, set())
+        if edge is not None:
+            to_remove |= self._by_edge.get(tuple(edge), set())
+        if pattern is not None:
+            to_remove |= {
+                hashed for hashed, entry in self._cache.items()
+                if pattern in entry["key"]
+            }
         
         for hashed in to_remove:
-            del self._cache[hashed]
+            self._remove(hashed)
         
         self.stats.size = len(self._cache)
+        return len(to_remove)
+    
+    def _remove(self, hashed: str) -> None:
+        """Remove one entry and its index references."""
+        entry = self._cache.pop(hashed)
+        
+        if entry["method"] is not None:
+            self._discard(self._by_method, entry["method"], hashed)
+        if entry["node"] is not None:
+            self._discard(self._by_node, entry["node"], hashed)
+        if entry["edge"] is not None:
+            self._discard(self._by_edge, entry["edge"], hashed)
+            for endpoint in entry["edge"]:
+                self._discard(self._by_node, endpoint, hashed)
+    
+    @staticmethod
+    def _discard(index: Dict[Any, Set[str]], tag: Any, hashed: str) -> None:
+        """Drop an entry from an index bucket, removing empty buckets."""
+        bucket = index.get(tag)
+        if bucket is None:
+            return
+        bucket.discard(hashed)
+        if not bucket:
+            del index[tag]
+
+
+# Latency histogram buckets hold values below powers of two from 512 ns to ~8.4 ms
+# (last is +Inf); a value's bucket comes from its bit length, which is cheaper
+# than bisecting
+_FIRST_BUCKET_BITS = 10
+LATENCY_BUCKETS_NS = tuple(2 ** bits for bits in range(_FIRST_BUCKET_BITS - 1, 24))
+_BUCKET_OF_BITS = [
+    min(max(bits - _FIRST_BUCKET_BITS + 1, 0), len(LATENCY_BUCKETS_NS))
+    for bits in range(65)
+]
+
+
+class MethodStats:
+    """Calls, cache hits/misses and latency histogram for one method and kind."""
+    
+    __slots__ = ("hits", "misses", "total_ns", "miss_ns", "buckets")
+    
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        self.total_ns = 0
+        # Time spent in calls that ran the evaluator (cache misses or uncached)
+        self.miss_ns = 0
+        self.buckets = [0] * (len(LATENCY_BUCKETS_NS) + 1)
+    
+    @property
+    def calls(self) -> int:
+        return sum(self.buckets)
+    
+    def record(self, elapsed_ns: int, hit: Optional[bool]) -> None:
+        self.buckets[_BUCKET_OF_BITS[elapsed_ns.bit_length()]] += 1
+        self.total_ns += elapsed_ns
+        if hit:
+            self.hits += 1
+        else:
+            self.miss_ns += elapsed_ns
+            if hit is not None:
+                self.misses += 1
+    
+    def percentile(self, q: float) -> float:
+        """Latency percentile in nanoseconds, as the (exclusive) upper bound of its bucket."""
+        rank = q * self.calls
+        seen = 0
+        for bound, count in zip(LATENCY_BUCKETS_NS + (float("inf"),), self.buckets):
+            seen += count
+            if seen >= rank and count:
+                return bound
+        return 0.0
+    
+    def merge(self, other: "MethodStats") -> None:
+        self.hits += other.hits
+        self.misses += other.misses
+        self.total_ns += other.total_ns
+        self.miss_ns += other.miss_ns
+        self.buckets = [a + b for a, b in zip(self.buckets, other.buckets)]
+
+
+# (method, target, kind), e.g. ("cluster_costs", "edge", "cost")
+MethodKey = Tuple[str, str, str]
+
+
+class MethodStatsTable:
+    """Evaluator call accounting per method, target (node/edge) and kind."""
+    
+    def __init__(self):
+        # Keyed by (method, is_edge, kind) on the hot path; see ``stats``
+        self._stats: Dict[Tuple[str, bool, Optional[str]], MethodStats] = {}
+    
+    def record(self, context: Any, elapsed_ns: int, hit: Optional[bool]) -> None:
+        """Record one evaluator call for the method and kind of a context."""
+        try:
+            key = (context.method, context.to_node is not None, context.kind)
+        except AttributeError:
+            key = (getattr(context, "method", "?"), _context_edge(context) is not None,
+                   getattr(context, "kind", None))
+        stats = self._stats.get(key)
+        if stats is None:
+            stats = self._stats[key] = MethodStats()
+        
+        # MethodStats.record, inlined: this runs on every evaluator call
+        stats.buckets[_BUCKET_OF_BITS[elapsed_ns.bit_length()]] += 1
+        stats.total_ns += elapsed_ns
+        if hit:
+            stats.hits += 1
+        else:
+            stats.miss_ns += elapsed_ns
+            if hit is not None:
+                stats.misses += 1
+    
+    @property
+    def stats(self) -> Dict[MethodKey, MethodStats]:
+        """Stats keyed by (method, "node" or "edge", kind)."""
+        return {
+            (method, "edge" if is_edge else "node", kind or "?"): stats
+            for (method, is_edge, kind), stats in self._stats.items()
+        }
+    
+    def clear(self) -> None:
+        self._stats.clear()
+    
+    def by_method(self) -> Dict[str, MethodStats]:
+        """Stats merged over targets and kinds."""
+        merged: Dict[str, MethodStats] = {}
+        for (method, _, _), stats in self.stats.items():
+            merged.setdefault(method, MethodStats()).merge(stats)
+        return merged
+    
+    def ranked(self) -> List[Tuple[MethodKey, MethodStats]]:
+        """Entries ordered by total time, slowest first."""
+        return sorted(self.stats.items(), key=lambda item: item[1].total_ns, reverse=True)
+    
+    def to_dict(self) -> List[Dict[str, Any]]:
+        return [
+            {
+                "method": method,
+                "target": target,
+                "kind": kind,
+                "calls": stats.calls,
+                "hits": stats.hits,
+                "misses": stats.misses,
+                "total_seconds": stats.total_ns / 1e9,
+                "evaluate_seconds": stats.miss_ns / 1e9,
+                "p50_us": stats.percentile(0.5) / 1e3,
+                "p99_us": stats.percentile(0.99) / 1e3,
+                "buckets_ns": dict(zip([str(b) for b in LATENCY_BUCKETS_NS] + ["+Inf"], stats.buckets))
+            }
+            for (method, target, kind), stats in self.ranked()
+        ]
+    
+    def report(self, top: Optional[int] = None) -> str:
+        """Methods ranked by total time."""
+        lines = [
+            f"  {'method':<16}{'target':<7}{'kind':<12}{'calls':>9}{'hit %':>8}"
+            f"{'total ms':>10}{'eval ms':>10}{'p50 us':>9}{'p99 us':>9}"
+        ]
+        for (method, target, kind), stats in self.ranked()[:top]:
+            lookups = stats.hits + stats.misses
+            hit_rate = f"{stats.hits / lookups:.1%}" if lookups else "-"
+            lines.append(
+                f"  {method:<16}{target:<7}{kind:<12}{stats.calls:>9}{hit_rate:>8}"
+                f"{stats.total_ns / 1e6:>10.2f}{stats.miss_ns / 1e6:>10.2f}"
+                f"{stats.percentile(0.5) / 1e3:>9g}{stats.percentile(0.99) / 1e3:>9g}"
+            )
+        return "\n".join(lines)
+    
+    def to_prometheus(self, prefix: str = "allocation") -> str:
+        """Latency histograms and call counters in Prometheus text format."""
+        name = f"{prefix}_evaluator_latency_seconds"
+        lines = [f"# HELP {name} Evaluator call latency per method and kind", f"# TYPE {name} histogram"]
+        calls = [f"# TYPE {prefix}_evaluator_cache_hits_total counter"]
+        
+        for (method, target, kind), stats in self.ranked():
+            labels = f'method="{method}",target="{target}",kind="{kind}"'
+            cumulative = 0
+            for bound, count in zip(LATENCY_BUCKETS_NS, stats.buckets):
+                cumulative += count
+                lines.append(f'{name}_bucket{{{labels},le="{bound / 1e9:g}"}} {cumulative}')
+            lines.append(f'{name}_bucket{{{labels},le="+Inf"}} {stats.calls}')
+            lines.append(f"{name}_sum{{{labels}}} {stats.total_ns / 1e9}")
+            lines.append(f"{name}_count{{{labels}}} {stats.calls}")
+            calls.append(f"{prefix}_evaluator_cache_hits_total{{{labels}}} {stats.hits}")
+        
+        return "\n".join(lines + calls) + "\n"
 
 
 # Global cache instance
 _evaluator_cache = EvaluatorCache()
 
+# Global per-method call accounting, shared by memoized and instrumented evaluators
+_method_stats = MethodStatsTable()
+
+
+def _context_edge(context: Any) -> Optional[Tuple[str, str]]:
+    """Return the (from, to) edge a context is evaluated on, if any."""
+    from_node = getattr(context, "from_node", None)
+    to_node = getattr(context, "to_node", None)
+    if from_node and to_node:
+        return (from_node, to_node)
+    return None
+
 
 def memoize(func: Callable) -> Callable:
     """Decorator to memoize evaluator functions."""
     
     @wraps(func)
-    def wrapper(context, *args, **kwargs):
-        # Use context's cache_key property
-        cache_key = context.cache_key if hasattr(context, "cache_key") else str(context)
+    def wrapper(*args, **kwargs):
+        # Evaluator methods are called as (self, context), plain functions as (context)
+        context = args[1] if len(args) > 1 else args[0]
+        
+        # Key on the product fields the evaluator's method reads, else on the context's own key
+        key_fields = getattr(args[0], "key_fields", None) if len(args) > 1 else None
+        if key_fields is not None and hasattr(context, "key_for"):
+            cache_key = context.key_for(key_fields(context.method))
+        elif hasattr(context, "cache_key"):
+            cache_key = context.cache_key
+        else:
+            cache_key = str(context)
+        
+        start = perf_counter_ns()
         
         # Check cache
         cached_value = _evaluator_cache.get(cache_key)
         if cached_value is not None:
+            _method_stats.record(context, perf_counter_ns() - start, hit=True)
             return cached_value
         
         # Compute and cache
-        result = func(context, *args, **kwargs)
-        _evaluator_cache.set(cache_key, result)
+        result = func(*args, **kwargs)
+        _evaluator_cache.set(
+            cache_key,
+            result,
+            method=getattr(context, "method", None),
+            node=getattr(context, "current_node", None),
+            edge=_context_edge(context)
+        )
+        _method_stats.record(context, perf_counter_ns() - start, hit=False)
         
         return result
     
     # Add cache management methods
     wrapper.cache_stats = lambda: _evaluator_cache.stats
     wrapper.clear_cache = lambda: _evaluator_cache.clear()
-    wrapper.invalidate_cache = lambda pattern: _evaluator_cache.invalidate(pattern)
+    wrapper.invalidate_cache = _evaluator_cache.invalidate
+    wrapper.method_stats = lambda: _method_stats
+    
+    return wrapper
+
+
+def instrument(func: Callable) -> Callable:
+    """Decorator recording per-method call accounting for uncached evaluators."""
+    
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        context = args[1] if len(args) > 1 else args[0]
+        start = perf_counter_ns()
+        result = func(*args, **kwargs)
+        _method_stats.record(context, perf_counter_ns() - start, hit=None)
+        return result
     
+    wrapper.method_stats = lambda: _method_stats
     return wrapper
\ No newline at end of file
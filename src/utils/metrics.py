@@ -0,0 +1,193 @@
+"""Per-phase timing and counters for allocation runs.
+
+``Metrics.phase`` accumulates wall time, CPU time and call counts per
+named phase; coarse phases also record the net change in allocated
+memory blocks and the number of garbage collections. Counters are
+labelled (e.g. evaluator calls per method). A run's metrics can be
+exported as JSON or in the Prometheus text exposition format.
+"""
+
+import gc
+import json
+import sys
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterator, Optional, Tuple
+
+
+class PhaseStats:
+    """Accumulated measurements for one phase."""
+    
+    def __init__(self):
+        self.calls = 0
+        self.wall_seconds = 0.0
+        self.cpu_seconds = 0.0
+        self.alloc_blocks = 0
+        self.gc_collections = 0
+        # Whether allocation counts were recorded for this phase
+        self.tracked = False
+    
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "calls": self.calls,
+            "wall_seconds": self.wall_seconds,
+            "cpu_seconds": self.cpu_seconds,
+            "alloc_blocks": self.alloc_blocks if self.tracked else None,
+            "gc_collections": self.gc_collections if self.tracked else None
+        }
+
+
+def _gc_collections() -> int:
+    return sum(generation["collections"] for generation in gc.get_stats())
+
+
+class Metrics:
+    """Phase timers and labelled counters for one run."""
+    
+    def __init__(self):
+        self.phases: Dict[str, PhaseStats] = defaultdict(PhaseStats)
+        self.counters: Dict[Tuple[str, Tuple[Tuple[str, str], ...]], float] = defaultdict(float)
+        self.gauges: Dict[str, float] = {}
+        # Named providers with their own to_dict() and to_prometheus()
+        self.sections: Dict[str, Any] = {}
+        # Optional Profiler; coarse phases are also profiled when set
+        self.profiler: Optional[Any] = None
+    
+    @contextmanager
+    def phase(self, name: str, allocations: bool = True) -> Iterator[None]:
+        """Time a block under ``name``.
+        
+        Set ``allocations=False`` for fine-grained phases entered per chunk:
+        counting allocated blocks walks the allocator arenas and would
+        dominate a short phase.
+        """
+        profiling = None
+        if self.profiler is not None:
+            profiled = self.profiler.phase_for(name)
+            if profiled is not None:
+                profiling = self.profiler.phase(profiled)
+                profiling.__enter__()
+        
+        stats = self.phases[name]
+        if allocations:
+            blocks, collections = sys.getallocatedblocks(), _gc_collections()
+        wall, cpu = time.perf_counter(), time.process_time()
+        try:
+            yield
+        finally:
+            stats.wall_seconds += time.perf_counter() - wall
+            stats.cpu_seconds += time.process_time() - cpu
+            stats.calls += 1
+            if allocations:
+                stats.tracked = True
+                stats.alloc_blocks += sys.getallocatedblocks() - blocks
+                stats.gc_collections += _gc_collections() - collections
+            if profiling is not None:
+                profiling.__exit__(None, None, None)
+    
+    def incr(self, name: str, value: float = 1, **labels: str) -> None:
+        """Add to a counter, optionally labelled."""
+        self.counters[(name, tuple(sorted(labels.items())))] += value
+    
+    def counter(self, name: str, **labels: str) -> float:
+        return self.counters.get((name, tuple(sorted(labels.items()))), 0)
+    
+    def set_gauge(self, name: str, value: float) -> None:
+        self.gauges[name] = value
+    
+    def attach(self, name: str, section: Any) -> None:
+        """Include another provider's metrics in both exports."""
+        self.sections[name] = section
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Phases, counters and gauges as JSON-serializable data."""
+        counters: Dict[str, Any] = {}
+        for (name, labels), value in sorted(self.counters.items()):
+            value = int(value) if float(value).is_integer() else value
+            if labels:
+                counters.setdefault(name, {})[",".join(f"{k}={v}" for k, v in labels)] = value
+            else:
+                counters[name] = value
+        
+        data = {
+            "phases": {name: stats.to_dict() for name, stats in self.phases.items()},
+            "counters": counters,
+            "gauges": dict(self.gauges)
+        }
+        for name, section in self.sections.items():
+            data[name] = section.to_dict()
+        return data
+    
+    def to_prometheus(self, prefix: str = "allocation") -> str:
+        """Render in the Prometheus text exposition format."""
+        lines = []
+        
+        phase_metrics = [
+            ("phase_wall_seconds_total", "counter", "Wall-clock seconds spent in each phase", "wall_seconds", False),
+            ("phase_cpu_seconds_total", "counter", "Process CPU seconds spent in each phase", "cpu_seconds", False),
+            ("phase_calls_total", "counter", "Times each phase was entered", "calls", False),
+            ("phase_alloc_blocks", "gauge", "Net change in allocated memory blocks per phase", "alloc_blocks", True),
+            ("phase_gc_collections_total", "counter", "Garbage collections during each phase", "gc_collections", True),
+        ]
+        for metric, kind, help_text, attr, tracked_only in phase_metrics:
+            lines.append(f"# HELP {prefix}_{metric} {help_text}")
+            lines.append(f"# TYPE {prefix}_{metric} {kind}")
+            for name, stats in self.phases.items():
+                if tracked_only and not stats.tracked:
+                    continue
+                lines.append(f'{prefix}_{metric}{{phase="{_escape(name)}"}} {getattr(stats, attr)}')
+        
+        by_name: Dict[str, list] = defaultdict(list)
+        for (name, labels), value in sorted(self.counters.items()):
+            by_name[name].append((labels, value))
+        for name, samples in by_name.items():
+            lines.append(f"# TYPE {prefix}_{name}_total counter")
+            for labels, value in samples:
+                lines.append(f"{prefix}_{name}_total{_labels(labels)} {_number(value)}")
+        
+        for name, value in sorted(self.gauges.items()):
+            lines.append(f"# TYPE {prefix}_{name} gauge")
+            lines.append(f"{prefix}_{name} {_number(value)}")
+        
+        text = "\n".join(lines) + "\n"
+        for section in self.sections.values():
+            text += section.to_prometheus(prefix)
+        return text
+    
+    def write(self, filepath: Path) -> Tuple[Path, Path]:
+        """Write JSON to ``filepath`` and Prometheus text next to it (``.prom``)."""
+        json_path = Path(filepath)
+        prom_path = json_path.with_suffix(".prom")
+        
+        with open(json_path, "w") as f:
+            json.dump(self.to_dict(), f, indent=2)
+        with open(prom_path, "w") as f:
+            f.write(self.to_prometheus())
+        
+        return json_path, prom_path
+    
+    def summary(self) -> str:
+        """Human-readable phase table."""
+        lines = [f"  {'phase':<22}{'calls':>8}{'wall s':>10}{'cpu s':>10}{'blocks':>10}"]
+        for name, stats in self.phases.items():
+            blocks = stats.alloc_blocks if stats.tracked else "-"
+            lines.append(
+                f"  {name:<22}{stats.calls:>8}{stats.wall_seconds:>10.3f}{stats.cpu_seconds:>10.3f}{blocks:>10}"
+            )
+        return "\n".join(lines)
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(labels: Tuple[Tuple[str, str], ...]) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{key}="{_escape(value)}"' for key, value in labels) + "}"
+
+
+def _number(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
@@ -0,0 +1,145 @@
+"""Built-in profiling: cProfile and tracemalloc per run phase.
+
+A ``Profiler`` attached to ``Metrics`` profiles the coarse phases of a run
+(load, build, allocate, write) separately. Each phase gets its own
+``cProfile.Profile`` and tracemalloc allocation totals by source line.
+On large runs the allocate phase can be sampled: only every Nth chunk is
+profiled, which keeps the (tracemalloc-dominated) overhead proportional
+to 1/N.
+"""
+
+import cProfile
+import io
+import pstats
+import time
+import tracemalloc
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+
+# Metrics phase name -> profile phase
+PROFILE_PHASES = {
+    "load": "load",
+    "validate": "build",
+    "build": "build",
+    "allocate": "allocate",
+    "serialization": "write",
+}
+
+
+class PhaseProfile:
+    """cProfile stats and allocation totals for one phase."""
+    
+    def __init__(self):
+        self.profile = cProfile.Profile()
+        self.allocations: Dict[Tuple[str, int], List[int]] = {}
+        self.peak_bytes = 0
+        self.wall_seconds = 0.0
+        self.samples = 0
+    
+    def add_snapshot(self, snapshot: tracemalloc.Snapshot) -> None:
+        """Add a snapshot's live allocations, by source line."""
+        for stat in snapshot.statistics("lineno"):
+            frame = stat.traceback[0]
+            totals = self.allocations.setdefault((frame.filename, frame.lineno), [0, 0])
+            totals[0] += stat.size
+            totals[1] += stat.count
+    
+    def top_allocations(self, limit: int) -> List[Tuple[str, int, int, int]]:
+        """(file, line, bytes, blocks) for the largest allocation sites."""
+        ranked = sorted(self.allocations.items(), key=lambda item: item[1][0], reverse=True)
+        return [(filename, lineno, size, count) for (filename, lineno), (size, count) in ranked[:limit]]
+
+
+class Profiler:
+    """Profiles run phases; pass ``sample_every`` > 1 to sample chunks."""
+    
+    def __init__(self, sample_every: int = 1, top: int = 15):
+        if sample_every < 1:
+            raise ValueError(f"sample_every must be positive, got {sample_every}")
+        self.sample_every = sample_every
+        self.top = top
+        self.phases: Dict[str, PhaseProfile] = {}
+        self._active: Optional[str] = None
+    
+    @property
+    def sampling(self) -> bool:
+        return self.sample_every > 1
+    
+    def samples(self, index: int) -> bool:
+        """Whether the chunk at ``index`` is profiled."""
+        return index % self.sample_every == 0
+    
+    def phase_for(self, metrics_phase: str) -> Optional[str]:
+        """Profile phase covering a Metrics phase, if it is profiled as a whole."""
+        name = PROFILE_PHASES.get(metrics_phase)
+        if name == "allocate" and self.sampling:
+            # Profiled per sampled chunk by the allocator instead
+            return None
+        return name
+    
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        """Profile a block under ``name``; nested phases count toward the outer one."""
+        if self._active is not None:
+            yield
+            return
+        
+        profile = self.phases.setdefault(name, PhaseProfile())
+        self._active = name
+        tracing = tracemalloc.is_tracing()
+        if not tracing:
+            tracemalloc.start()
+        tracemalloc.reset_peak()
+        start = time.perf_counter()
+        profile.profile.enable()
+        try:
+            yield
+        finally:
+            profile.profile.disable()
+            profile.wall_seconds += time.perf_counter() - start
+            profile.samples += 1
+            profile.peak_bytes = max(profile.peak_bytes, tracemalloc.get_traced_memory()[1])
+            profile.add_snapshot(tracemalloc.take_snapshot())
+            if not tracing:
+                tracemalloc.stop()
+            self._active = None
+    
+    def save(self, output: Path) -> List[Path]:
+        """Write ``<output>.<phase>.pstats`` files and ``<output>.profile.txt``."""
+        output = Path(output)
+        written = []
+        
+        for name, profile in self.phases.items():
+            path = output.with_suffix(f".{name}.pstats")
+            profile.profile.dump_stats(str(path))
+            written.append(path)
+        
+        summary_path = output.with_suffix(".profile.txt")
+        with open(summary_path, "w") as f:
+            f.write(self.summary())
+        written.append(summary_path)
+        
+        return written
+    
+    def summary(self) -> str:
+        """Text report: top functions by cumulative time and top allocation sites."""
+        out = io.StringIO()
+        
+        for name, profile in self.phases.items():
+            out.write(f"{'=' * 72}\n")
+            out.write(f"PHASE {name}: {profile.wall_seconds:.3f}s profiled, "
+                      f"peak traced memory {profile.peak_bytes / 1024:.1f} KiB")
+            if name == "allocate" and self.sampling:
+                out.write(f", {profile.samples} chunks sampled (1 in {self.sample_every})")
+            out.write(f"\n{'=' * 72}\n")
+            
+            stats = pstats.Stats(profile.profile, stream=out)
+            stats.strip_dirs().sort_stats("cumulative").print_stats(self.top)
+            
+            out.write(f"Top allocation sites (live at end of phase):\n")
+            for filename, lineno, size, count in profile.top_allocations(self.top):
+                out.write(f"  {size / 1024:>10.1f} KiB {count:>8} blocks  {filename}:{lineno}\n")
+            out.write("\n")
+        
+        return out.getvalue()
@@ -0,0 +1,323 @@
+"""Allocation results file utilities.
+
+Results can be written as a JSON array, JSON Lines, CSV, columnar
+Parquet/Arrow (the latter two need the optional ``pyarrow`` dependency), or
+into an indexed SQLite store (see ``results_store``).
+Writers serialize straight from ``AllocationResult`` records: JSON formats
+use pydantic's compiled ``model_dump_json`` per record and CSV/columnar
+formats read the attributes into rows or column batches, so no
+intermediate dict is built per result and nothing is buffered beyond one
+column batch.
+"""
+
+import csv
+import json
+import re
+from abc import ABC, abstractmethod
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional
+from pathlib import Path
+
+from ..models import AllocationResult
+
+
+RESULT_FORMATS = ("json", "jsonl", "csv", "parquet", "arrow", "sqlite")
+RESULT_FIELDS = list(AllocationResult.model_fields)
+
+# Separator for ``selected_path`` in CSV cells
+PATH_SEPARATOR = "|"
+
+_SUFFIX_FORMATS = {
+    ".json": "json",
+    ".jsonl": "jsonl",
+    ".ndjson": "jsonl",
+    ".csv": "csv",
+    ".parquet": "parquet",
+    ".arrow": "arrow",
+    ".feather": "arrow",
+    ".db": "sqlite",
+    ".sqlite": "sqlite",
+    ".sqlite3": "sqlite",
+}
+
+
+def infer_format(filepath: Path, default: str = "json") -> str:
+    """Results format implied by a file extension."""
+    return _SUFFIX_FORMATS.get(Path(filepath).suffix.lower(), default)
+
+
+def _require_pyarrow(fmt: str):
+    try:
+        import pyarrow
+    except ImportError:
+        raise ImportError(f"The {fmt} results format requires pyarrow (pip install pyarrow)") from None
+    return pyarrow
+
+
+class ResultWriter(ABC):
+    """Streams allocation results to a file; use as a context manager."""
+    
+    def __init__(self, filepath: Path):
+        self.filepath = Path(filepath)
+        self.count = 0
+    
+    @abstractmethod
+    def write(self, result: AllocationResult) -> None:
+        """Write one result."""
+        pass
+    
+    def write_all(self, results: Iterable[AllocationResult]) -> int:
+        """Write every result and return the number written."""
+        for result in results:
+            self.write(result)
+        return self.count
+    
+    @abstractmethod
+    def close(self) -> None:
+        """Finish the file and release it."""
+        pass
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exc):
+        self.close()
+
+
+class JsonResultWriter(ResultWriter):
+    """Compact JSON array, one record per line."""
+    
+    def __init__(self, filepath: Path):
+        super().__init__(filepath)
+        self._file = open(self.filepath, "w")
+        self._file.write("[")
+    
+    def write(self, result: AllocationResult) -> None:
+        self._file.write("\n" if self.count == 0 else ",\n")
+        self._file.write(result.model_dump_json())
+        self.count += 1
+    
+    def close(self) -> None:
+        self._file.write("\n]\n" if self.count else "]\n")
+        self._file.close()
+
+
+class JsonLinesResultWriter(ResultWriter):
+    """One JSON record per line."""
+    
+    def __init__(self, filepath: Path):
+        super().__init__(filepath)
+        self._file = open(self.filepath, "w")
+    
+    def write(self, result: AllocationResult) -> None:
+        self._file.write(result.model_dump_json())
+        self._file.write("\n")
+        self.count += 1
+    
+    def close(self) -> None:
+        self._file.close()
+
+
+def _csv_cell(value: Any) -> Any:
+    if isinstance(value, list):
+        return PATH_SEPARATOR.join(value)
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return value
+
+
+class CsvResultWriter(ResultWriter):
+    """CSV with a header row; paths are joined with ``PATH_SEPARATOR``."""
+    
+    def __init__(self, filepath: Path):
+        super().__init__(filepath)
+        self._file = open(self.filepath, "w", newline="")
+        self._writer = csv.writer(self._file)
+        self._writer.writerow(RESULT_FIELDS)
+    
+    def write(self, result: AllocationResult) -> None:
+        self._writer.writerow([_csv_cell(getattr(result, field)) for field in RESULT_FIELDS])
+        self.count += 1
+    
+    def close(self) -> None:
+        self._file.close()
+
+
+class ArrowResultWriter(ResultWriter):
+    """Columnar Parquet or Arrow IPC file, written in column batches."""
+    
+    def __init__(self, filepath: Path, fmt: str = "parquet", batch_size: int = 65536):
+        self._pa = _require_pyarrow(fmt)
+        super().__init__(filepath)
+        self.fmt = fmt
+        self.batch_size = batch_size
+        self._columns: Dict[str, list] = {field: [] for field in RESULT_FIELDS}
+        self._schema = None
+        self._writer = None
+    
+    def write(self, result: AllocationResult) -> None:
+        for field, column in self._columns.items():
+            column.append(getattr(result, field))
+        self.count += 1
+        if len(self._columns[RESULT_FIELDS[0]]) >= self.batch_size:
+            self._flush()
+    
+    def write_columns(self, columns: Dict[str, Any]) -> None:
+        """Write one batch from column arrays (lists or NumPy arrays)."""
+        self._flush()
+        self._write_batch(columns)
+        self.count += len(columns[RESULT_FIELDS[0]])
+    
+    def _flush(self) -> None:
+        if self._columns[RESULT_FIELDS[0]]:
+            self._write_batch(self._columns)
+            self._columns = {field: [] for field in RESULT_FIELDS}
+    
+    def _write_batch(self, columns: Dict[str, Any]) -> None:
+        table = self._pa.Table.from_pydict({field: columns[field] for field in RESULT_FIELDS}, schema=self._schema)
+        if self._writer is None:
+            self._schema = table.schema
+            self._writer = self._open(table.schema)
+        self._writer.write_table(table)
+    
+    def _open(self, schema):
+        if self.fmt == "parquet":
+            import pyarrow.parquet as pq
+            return pq.ParquetWriter(str(self.filepath), schema)
+        import pyarrow.ipc as ipc
+        return ipc.new_file(str(self.filepath), schema)
+    
+    def close(self) -> None:
+        self._flush()
+        if self._writer is None:
+            # Empty run: still write a readable file with the empty schema
+            self._write_batch({field: [] for field in RESULT_FIELDS})
+        self._writer.close()
+
+
+def open_result_writer(filepath: Path, fmt: Optional[str] = None) -> ResultWriter:
+    """Open a streaming writer; the format defaults to the file extension."""
+    fmt = fmt or infer_format(filepath)
+    if fmt == "json":
+        return JsonResultWriter(filepath)
+    if fmt == "jsonl":
+        return JsonLinesResultWriter(filepath)
+    if fmt == "csv":
+        return CsvResultWriter(filepath)
+    if fmt in ("parquet", "arrow"):
+        return ArrowResultWriter(filepath, fmt=fmt)
+    if fmt == "sqlite":
+        from .results_store import open_sqlite_writer
+        return open_sqlite_writer(filepath, source="allocation")
+    raise ValueError(f"Unknown results format: {fmt}")
+
+
+def write_results(results: Iterable[AllocationResult], filepath: Path, fmt: Optional[str] = None) -> int:
+    """Write allocation results and return the number written."""
+    with open_result_writer(filepath, fmt) as writer:
+        return writer.write_all(results)
+
+
+def _parse_bool(value: str) -> bool:
+    return value.strip().lower() in ("true", "1")
+
+
+def _parse_optional_float(value: str) -> Optional[float]:
+    return float(value) if value.strip() else None
+
+
+_CSV_CONVERTERS: Dict[str, Callable[[str], Any]] = {
+    "selected_path": lambda value: value.split(PATH_SEPARATOR) if value else [],
+    "total_cost": float,
+    "total_lead_time": int,
+    "cm3_score": float,
+    "eta": datetime.fromisoformat,
+    "feasible": _parse_bool,
+    "stockout_risk": _parse_bool,
+    "stockout_probability": float,
+    "consolidated_cost": _parse_optional_float,
+}
+
+
+def iter_result_rows(filepath: Path, fmt: Optional[str] = None) -> Iterator[Dict[str, Any]]:
+    """Yield result rows as dicts from any results format, reading incrementally."""
+    fmt = fmt or infer_format(filepath)
+    
+    if fmt == "json":
+        with open(filepath, 'r') as f:
+            yield from _iter_json_array(f)
+    elif fmt == "jsonl":
+        with open(filepath, 'r') as f:
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+    elif fmt == "csv":
+        with open(filepath, 'r', newline='') as f:
+            for row in csv.DictReader(f):
+                yield {
+                    key: _CSV_CONVERTERS[key](value) if key in _CSV_CONVERTERS else value
+                    for key, value in row.items()
+                }
+    elif fmt in ("parquet", "arrow"):
+        _require_pyarrow(fmt)
+        for batch in _iter_batches(filepath, fmt):
+            yield from batch.to_pylist()
+    elif fmt == "sqlite":
+        # Latest run in the store
+        from .results_store import iter_store_rows
+        yield from iter_store_rows(filepath)
+    else:
+        raise ValueError(f"Unknown results format: {fmt}")
+
+
+_WHITESPACE = re.compile(r"\s*")
+
+
+def _iter_json_array(f, chunk_size: int = 1 << 16) -> Iterator[Any]:
+    """Yield the elements of a top-level JSON array without loading the whole file."""
+    decoder = json.JSONDecoder()
+    buffer, pos = "", 0
+    started = False
+    
+    while True:
+        pos = _WHITESPACE.match(buffer, pos).end()
+        if pos < len(buffer):
+            char = buffer[pos]
+            if not started:
+                if char != "[":
+                    raise ValueError(f"Expected a JSON array in {f.name}")
+                started = True
+                pos += 1
+                continue
+            if char == "]":
+                return
+            if char == ",":
+                pos += 1
+                continue
+            try:
+                item, pos = decoder.raw_decode(buffer, pos)
+                yield item
+                continue
+            except json.JSONDecodeError:
+                pass  # element spans the chunk boundary
+        
+        more = f.read(chunk_size)
+        if not more:
+            raise ValueError(f"Unterminated JSON array in {f.name}")
+        buffer, pos = buffer[pos:] + more, 0
+
+
+def _iter_batches(filepath: Path, fmt: str):
+    if fmt == "parquet":
+        import pyarrow.parquet as pq
+        yield from pq.ParquetFile(str(filepath)).iter_batches()
+    else:
+        import pyarrow.ipc as ipc
+        reader = ipc.open_file(str(filepath))
+        for i in range(reader.num_record_batches):
+            yield reader.get_batch(i)
+
+
+def load_results(filepath: Path, fmt: Optional[str] = None) -> List[AllocationResult]:
+    """Load allocation results from a results file in any supported format."""
+    return [AllocationResult(**row) for row in iter_result_rows(filepath, fmt)]
@@ -0,0 +1,331 @@
+"""Embedded SQLite store for allocation results.
+
+Each write (an allocation run or an imported results file) becomes a row
+in ``runs``. Results reference a normalized ``paths`` table, one row per
+distinct path, keyed by a path hash, and ``path_nodes`` lists every node
+of a path with its position so lane queries are indexed joins. Results
+are indexed on razin, destination, path and lead time.
+"""
+
+import hashlib
+import sqlite3
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from ..models import AllocationResult
+from .results_io import ResultWriter, iter_result_rows
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    run_id INTEGER PRIMARY KEY,
+    source TEXT,
+    created_at TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS paths (
+    path_id INTEGER PRIMARY KEY,
+    path_hash TEXT NOT NULL UNIQUE,
+    origin TEXT,
+    destination TEXT,
+    hops INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS path_nodes (
+    path_id INTEGER NOT NULL REFERENCES paths(path_id),
+    position INTEGER NOT NULL,
+    node TEXT NOT NULL,
+    PRIMARY KEY (path_id, position)
+);
+CREATE TABLE IF NOT EXISTS results (
+    run_id INTEGER NOT NULL REFERENCES runs(run_id),
+    chunk_id TEXT NOT NULL,
+    razin TEXT NOT NULL,
+    path_id INTEGER NOT NULL REFERENCES paths(path_id),
+    destination TEXT,
+    total_cost REAL NOT NULL,
+    total_lead_time INTEGER NOT NULL,
+    cm3_score REAL NOT NULL,
+    eta TEXT NOT NULL,
+    feasible INTEGER NOT NULL,
+    stockout_risk INTEGER NOT NULL,
+    stockout_probability REAL NOT NULL DEFAULT 0,
+    consolidated_cost REAL
+);
+"""
+
+# Results columns added after the first release, with their definitions
+ADDED_COLUMNS = {
+    "stockout_probability": "REAL NOT NULL DEFAULT 0",
+    "consolidated_cost": "REAL",
+}
+
+# Created after bulk loads rather than maintained row by row
+INDEXES = """
+CREATE INDEX IF NOT EXISTS idx_results_razin ON results (razin);
+CREATE INDEX IF NOT EXISTS idx_results_destination ON results (destination);
+CREATE INDEX IF NOT EXISTS idx_results_path ON results (path_id);
+CREATE INDEX IF NOT EXISTS idx_results_lead_time ON results (total_lead_time);
+CREATE INDEX IF NOT EXISTS idx_results_run ON results (run_id);
+CREATE INDEX IF NOT EXISTS idx_path_nodes_node ON path_nodes (node, path_id, position);
+"""
+
+ORDER_COLUMNS = {
+    "cost": "r.total_cost",
+    "lead_time": "r.total_lead_time",
+    "cm3": "r.cm3_score",
+    "razin": "r.razin",
+}
+
+
+def path_hash(path: Sequence[str]) -> str:
+    """Stable hash of a node sequence."""
+    return hashlib.sha1("\x1f".join(path).encode()).hexdigest()[:16]
+
+
+class ResultsStore:
+    """SQLite database of allocation results from one or more runs."""
+    
+    def __init__(self, filepath: Path):
+        self.filepath = Path(filepath)
+        self.conn = sqlite3.connect(str(self.filepath))
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(SCHEMA)
+        # Stores written by earlier versions lack the newer columns
+        columns = {row[1] for row in self.conn.execute("PRAGMA table_info(results)")}
+        for column, definition in ADDED_COLUMNS.items():
+            if column not in columns:
+                with self.conn:
+                    self.conn.execute(f"ALTER TABLE results ADD COLUMN {column} {definition}")
+        self._path_ids: Dict[Tuple[str, ...], int] = {}
+        self._paths_by_id: Dict[int, Tuple[str, ...]] = {}
+    
+    def start_run(self, source: Optional[str] = None) -> int:
+        """Register a new run and return its id."""
+        with self.conn:
+            cursor = self.conn.execute(
+                "INSERT INTO runs (source, created_at) VALUES (?, ?)",
+                (source, datetime.now().isoformat())
+            )
+        return cursor.lastrowid
+    
+    def path_id(self, path: Sequence[str]) -> int:
+        """Id of a path, inserting it and its nodes on first use."""
+        key = tuple(path)
+        if key in self._path_ids:
+            return self._path_ids[key]
+        
+        digest = path_hash(key)
+        row = self.conn.execute("SELECT path_id FROM paths WHERE path_hash = ?", (digest,)).fetchone()
+        if row is None:
+            cursor = self.conn.execute(
+                "INSERT INTO paths (path_hash, origin, destination, hops) VALUES (?, ?, ?, ?)",
+                (digest, key[0] if key else None, key[-1] if key else None, max(len(key) - 1, 0))
+            )
+            path_id = cursor.lastrowid
+            self.conn.executemany(
+                "INSERT INTO path_nodes (path_id, position, node) VALUES (?, ?, ?)",
+                [(path_id, position, node) for position, node in enumerate(key)]
+            )
+        else:
+            path_id = row[0]
+        
+        self._path_ids[key] = path_id
+        self._paths_by_id[path_id] = key
+        return path_id
+    
+    def path_nodes(self, path_id: int) -> Tuple[str, ...]:
+        """Node sequence of a stored path."""
+        if path_id not in self._paths_by_id:
+            rows = self.conn.execute(
+                "SELECT node FROM path_nodes WHERE path_id = ? ORDER BY position", (path_id,)
+            )
+            path = tuple(node for (node,) in rows)
+            self._paths_by_id[path_id] = path
+            self._path_ids[path] = path_id
+        return self._paths_by_id[path_id]
+    
+    def writer(self, source: Optional[str] = None, batch_size: int = 10000) -> "SqliteResultWriter":
+        """Writer that appends results as a new run."""
+        return SqliteResultWriter(self, self.start_run(source), batch_size)
+    
+    def import_file(self, filepath: Path, batch_size: int = 10000) -> Tuple[int, int]:
+        """Import a results file in any supported format; returns (run id, rows)."""
+        with self.writer(str(filepath), batch_size) as writer:
+            for row in iter_result_rows(Path(filepath)):
+                writer.write_row(row)
+        return writer.run_id, writer.count
+    
+    def create_indexes(self) -> None:
+        self.conn.executescript(INDEXES)
+    
+    def latest_run(self) -> Optional[int]:
+        row = self.conn.execute("SELECT MAX(run_id) FROM runs").fetchone()
+        return row[0]
+    
+    def runs(self) -> List[Dict[str, Any]]:
+        """Runs with their result counts."""
+        rows = self.conn.execute(
+            "SELECT runs.run_id, source, created_at, COUNT(results.run_id) FROM runs "
+            "LEFT JOIN results ON results.run_id = runs.run_id "
+            "GROUP BY runs.run_id ORDER BY runs.run_id"
+        )
+        return [
+            {"run_id": run_id, "source": source, "created_at": created_at, "results": count}
+            for run_id, source, created_at, count in rows
+        ]
+    
+    def query(self, run_id: Optional[int] = None, razin: Optional[str] = None,
+              destination: Optional[str] = None, lane: Optional[Tuple[str, str]] = None,
+              node: Optional[str] = None, path: Optional[str] = None,
+              min_lead_time: Optional[int] = None, max_lead_time: Optional[int] = None,
+              order_by: Optional[str] = None, limit: Optional[int] = None) -> Iterator[Dict[str, Any]]:
+        """Yield result rows matching every given filter.
+        
+        ``lane`` is a (from, to) pair of consecutive path nodes, ``node`` any
+        node on the path and ``path`` a path hash.
+        """
+        clauses, params = [], []
+        
+        if run_id is not None:
+            clauses.append("r.run_id = ?")
+            params.append(run_id)
+        if razin is not None:
+            clauses.append("r.razin = ?")
+            params.append(razin)
+        if destination is not None:
+            clauses.append("r.destination = ?")
+            params.append(destination)
+        if path is not None:
+            clauses.append("p.path_hash = ?")
+            params.append(path)
+        if min_lead_time is not None:
+            clauses.append("r.total_lead_time >= ?")
+            params.append(min_lead_time)
+        if max_lead_time is not None:
+            clauses.append("r.total_lead_time <= ?")
+            params.append(max_lead_time)
+        if node is not None:
+            clauses.append("r.path_id IN (SELECT path_id FROM path_nodes WHERE node = ?)")
+            params.append(node)
+        if lane is not None:
+            clauses.append(
+                "r.path_id IN (SELECT a.path_id FROM path_nodes a JOIN path_nodes b "
+                "ON b.path_id = a.path_id AND b.position = a.position + 1 "
+                "WHERE a.node = ? AND b.node = ?)"
+            )
+            params.extend(lane)
+        
+        sql = (
+            "SELECT r.run_id, r.chunk_id, r.razin, r.path_id, p.path_hash, "
+            "r.total_cost, r.total_lead_time, r.cm3_score, r.eta, r.feasible, r.stockout_risk, "
+            "r.stockout_probability, r.consolidated_cost "
+            "FROM results r JOIN paths p ON p.path_id = r.path_id"
+        )
+        if clauses:
+            sql += " WHERE " + " AND ".join(clauses)
+        if order_by is not None:
+            sql += f" ORDER BY {ORDER_COLUMNS[order_by]}"
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(limit)
+        
+        for row in self.conn.execute(sql, params):
+            run, chunk_id, razin_, path_id, digest, cost, lead_time, cm3_score, eta, feasible, stockout, probability, consolidated = row
+            yield {
+                "run_id": run,
+                "chunk_id": chunk_id,
+                "razin": razin_,
+                "path_hash": digest,
+                "selected_path": list(self.path_nodes(path_id)),
+                "total_cost": cost,
+                "total_lead_time": lead_time,
+                "cm3_score": cm3_score,
+                "eta": eta,
+                "feasible": bool(feasible),
+                "stockout_risk": bool(stockout),
+                "stockout_probability": probability,
+                "consolidated_cost": consolidated
+            }
+    
+    def close(self) -> None:
+        self.conn.close()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exc):
+        self.close()
+
+
+class SqliteResultWriter(ResultWriter):
+    """Appends results to a ResultsStore run in batched transactions."""
+    
+    def __init__(self, store: ResultsStore, run_id: int, batch_size: int = 10000):
+        super().__init__(store.filepath)
+        self.store = store
+        self.run_id = run_id
+        self.batch_size = batch_size
+        self._batch: List[tuple] = []
+        self._owns_store = False
+    
+    def write(self, result: AllocationResult) -> None:
+        self._append(
+            result.chunk_id, result.razin, result.selected_path, result.total_cost,
+            result.total_lead_time, result.cm3_score, result.eta, result.feasible, result.stockout_risk,
+            result.stockout_probability, result.consolidated_cost
+        )
+    
+    def write_row(self, row: Dict[str, Any]) -> None:
+        """Write a result row as read by ``iter_result_rows``."""
+        self._append(
+            row["chunk_id"], row["razin"], row["selected_path"], row["total_cost"],
+            row["total_lead_time"], row["cm3_score"], row["eta"], row["feasible"], row.get("stockout_risk", False),
+            row.get("stockout_probability", 0.0), row.get("consolidated_cost")
+        )
+    
+    def _append(self, chunk_id, razin, path, cost, lead_time, cm3_score, eta, feasible, stockout,
+                probability, consolidated) -> None:
+        self._batch.append((
+            self.run_id, chunk_id, razin, self.store.path_id(path), path[-1] if path else None,
+            float(cost), int(lead_time), float(cm3_score),
+            eta.isoformat() if isinstance(eta, datetime) else str(eta),
+            int(bool(feasible)), int(bool(stockout)), float(probability),
+            None if consolidated is None else float(consolidated)
+        ))
+        self.count += 1
+        if len(self._batch) >= self.batch_size:
+            self._flush()
+    
+    def _flush(self) -> None:
+        with self.store.conn:
+            self.store.conn.executemany(
+                "INSERT INTO results (run_id, chunk_id, razin, path_id, destination, total_cost, "
+                "total_lead_time, cm3_score, eta, feasible, stockout_risk, stockout_probability, consolidated_cost) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                self._batch
+            )
+        self._batch = []
+    
+    def close(self) -> None:
+        self._flush()
+        self.store.create_indexes()
+        if self._owns_store:
+            self.store.close()
+
+
+def open_sqlite_writer(filepath: Path, source: Optional[str] = None) -> SqliteResultWriter:
+    """Open a store and a writer for a new run; closing the writer closes the store."""
+    store = ResultsStore(filepath)
+    writer = store.writer(source)
+    writer._owns_store = True
+    return writer
+
+
+def iter_store_rows(filepath: Path, run_id: Optional[int] = None) -> Iterator[Dict[str, Any]]:
+    """Result rows of one run (default: the latest) in ``iter_result_rows`` form."""
+    with ResultsStore(filepath) as store:
+        run_id = store.latest_run() if run_id is None else run_id
+        for row in store.query(run_id=run_id):
+            del row["run_id"], row["path_hash"]
+            yield row
@@ -0,0 +1,207 @@
+"""One-pass, mergeable summaries of allocation results.
+
+``ResultsSummary`` consumes result rows one at a time and keeps only
+aggregates (totals, path and destination counters, per-length cost sums,
+a lead-time histogram and a quantile sketch of CM3 scores), so memory is
+bounded by the number of distinct paths rather than the number of rows.
+Summaries of separate files merge exactly, which lets many files be
+summarized in parallel and combined.
+"""
+
+import math
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from .results_io import iter_result_rows
+
+
+# Upper bounds (inclusive) of the lead-time histogram bins, in days
+LEAD_TIME_BINS = [(10, "0-10"), (20, "11-20"), (30, "21-30"), (40, "31-40"), (50, "41-50")]
+LEAD_TIME_OVERFLOW = "50+"
+
+
+class QuantileSketch:
+    """Mergeable log-bucket quantile sketch with relative accuracy ``alpha``.
+    
+    Values are counted in buckets ``(gamma^(k-1), gamma^k]`` with
+    ``gamma = (1 + alpha) / (1 - alpha)``, so any quantile is returned within
+    a relative error of ``alpha``. Each bucket also sums a per-value weight,
+    which gives tail aggregates (e.g. the cost of the top quartile) without
+    keeping the values.
+    """
+    
+    def __init__(self, alpha: float = 0.01):
+        if not 0 < alpha < 1:
+            raise ValueError("alpha must be between 0 and 1")
+        self.alpha = alpha
+        self.gamma = (1 + alpha) / (1 - alpha)
+        self._log_gamma = math.log(self.gamma)
+        self.count = 0
+        # bucket key -> [count, weight sum]; negatives are keyed by magnitude
+        self._positive: Dict[int, List[float]] = {}
+        self._negative: Dict[int, List[float]] = {}
+        self._zero = [0, 0.0]
+        self._infinite = [0, 0.0]
+    
+    def _key(self, value: float) -> int:
+        return math.ceil(math.log(value) / self._log_gamma)
+    
+    def _bucket(self, value: float) -> List[float]:
+        if value == 0:
+            return self._zero
+        if math.isinf(value):
+            return self._infinite
+        buckets = self._positive if value > 0 else self._negative
+        key = self._key(abs(value))
+        if key not in buckets:
+            buckets[key] = [0, 0.0]
+        return buckets[key]
+    
+    def add(self, value: float, weight: float = 0.0) -> None:
+        """Count one value, attaching a weight to its bucket."""
+        if math.isnan(value):
+            return
+        bucket = self._bucket(value)
+        bucket[0] += 1
+        bucket[1] += weight
+        self.count += 1
+    
+    def merge(self, other: "QuantileSketch") -> None:
+        """Add another sketch's counts into this one."""
+        if other.gamma != self.gamma:
+            raise ValueError("Cannot merge sketches with different accuracy")
+        for mine, theirs in ((self._positive, other._positive), (self._negative, other._negative)):
+            for key, (count, weight) in theirs.items():
+                bucket = mine.setdefault(key, [0, 0.0])
+                bucket[0] += count
+                bucket[1] += weight
+        for mine, theirs in ((self._zero, other._zero), (self._infinite, other._infinite)):
+            mine[0] += theirs[0]
+            mine[1] += theirs[1]
+        self.count += other.count
+    
+    def _ordered(self) -> Iterable[Tuple[float, List[float]]]:
+        """Buckets in ascending value order, with a representative value."""
+        for key in sorted(self._negative, reverse=True):
+            yield -self._value(key), self._negative[key]
+        yield 0.0, self._zero
+        for key in sorted(self._positive):
+            yield self._value(key), self._positive[key]
+        yield math.inf, self._infinite
+    
+    def _value(self, key: int) -> float:
+        return 2 * self.gamma ** key / (self.gamma + 1)
+    
+    def quantile(self, q: float) -> float:
+        """Estimate the q-quantile (NaN when empty)."""
+        if self.count == 0:
+            return math.nan
+        rank = q * (self.count - 1)
+        seen = 0
+        for value, (count, _) in self._ordered():
+            seen += count
+            if seen > rank:
+                return value
+        return math.inf
+    
+    def tail(self, threshold: float) -> Tuple[int, float]:
+        """Count and weight sum of values in buckets above the threshold's bucket."""
+        count, weight = 0, 0.0
+        for value, bucket in self._ordered():
+            if value > threshold:
+                count += bucket[0]
+                weight += bucket[1]
+        return int(count), weight
+
+
+class ResultsSummary:
+    """Aggregates for the allocation results report, built in one pass."""
+    
+    def __init__(self, alpha: float = 0.01):
+        self.sources: List[str] = []
+        self.count = 0
+        self.total_cost = 0.0
+        self.total_lead_time = 0
+        self.cm3_sum = 0.0
+        self.paths: Counter = Counter()
+        self.destinations: Counter = Counter()
+        self.cost_by_length: Dict[int, List[float]] = {}
+        self.lead_times: Counter = Counter()
+        self.cm3 = QuantileSketch(alpha)
+    
+    def add(self, row: Dict[str, Any]) -> None:
+        """Add one result row."""
+        path = tuple(row["selected_path"])
+        cost = float(row["total_cost"])
+        lead_time = int(row["total_lead_time"])
+        cm3_score = float(row["cm3_score"])
+        
+        self.count += 1
+        self.total_cost += cost
+        self.total_lead_time += lead_time
+        self.cm3_sum += cm3_score
+        self.paths[path] += 1
+        if path:
+            self.destinations[path[-1]] += 1
+        
+        by_length = self.cost_by_length.setdefault(len(path), [0.0, 0])
+        by_length[0] += cost
+        by_length[1] += 1
+        
+        self.lead_times[_lead_time_bin(lead_time)] += 1
+        self.cm3.add(cm3_score, weight=cost)
+    
+    def update(self, rows: Iterable[Dict[str, Any]]) -> "ResultsSummary":
+        """Add every row from an iterable."""
+        for row in rows:
+            self.add(row)
+        return self
+    
+    def merge(self, other: "ResultsSummary") -> "ResultsSummary":
+        """Combine another summary into this one."""
+        self.sources.extend(other.sources)
+        self.count += other.count
+        self.total_cost += other.total_cost
+        self.total_lead_time += other.total_lead_time
+        self.cm3_sum += other.cm3_sum
+        self.paths.update(other.paths)
+        self.destinations.update(other.destinations)
+        for length, (cost, count) in other.cost_by_length.items():
+            by_length = self.cost_by_length.setdefault(length, [0.0, 0])
+            by_length[0] += cost
+            by_length[1] += count
+        self.lead_times.update(other.lead_times)
+        self.cm3.merge(other.cm3)
+        return self
+    
+    @classmethod
+    def from_file(cls, filepath: Path, alpha: float = 0.01) -> "ResultsSummary":
+        """Summarize a results file in any supported format."""
+        summary = cls(alpha).update(iter_result_rows(Path(filepath)))
+        summary.sources.append(str(filepath))
+        return summary
+    
+    def high_cm3(self, q: float = 0.75) -> Tuple[float, int, float]:
+        """Estimated CM3 q-quantile, and the count and total cost of results above it."""
+        threshold = self.cm3.quantile(q)
+        count, cost = self.cm3.tail(threshold)
+        return threshold, count, cost
+
+
+def _lead_time_bin(lead_time: int) -> str:
+    for upper, label in LEAD_TIME_BINS:
+        if lead_time <= upper:
+            return label
+    return LEAD_TIME_OVERFLOW
+
+
+def summarize_files(filepaths: List[Path], workers: Optional[int] = None,
+                    alpha: float = 0.01) -> List[ResultsSummary]:
+    """Summarize several results files, in parallel processes when workers > 1."""
+    if workers == 1 or len(filepaths) < 2:
+        return [ResultsSummary.from_file(path, alpha) for path in filepaths]
+    
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(ResultsSummary.from_file, filepaths, [alpha] * len(filepaths)))
@@ -1,12 +1,18 @@
 """Test allocation algorithm."""
 
+import numpy as np
+import pandas as pd
 import pytest
-from datetime import datetime
+from datetime import date, datetime
 
 from src.models import Product, Chunk, Node, Edge
 from src.graph import NetworkBuilder
-from src.evaluators import SimpleEvaluator
-from src.allocation import Allocator
+from src.evaluators import SimpleEvaluator, TableEvaluator, LookupTable
+from src.allocation import (
+    Allocator, BeamSearchAllocator, IncrementalAllocator, ReuseAllocator, Scenario, ScenarioRunner,
+    SensitivityAnalyzer, SplitAllocator, StockoutSimulator, diff_networks, pack_sorted, split_quantities
+)
+from src.utils import Metrics, Profiler
 
 
 def create_test_network():
@@ -62,4 +68,595 @@ def test_simple_allocation():
     assert result.selected_path == ["Supplier", "Port1", "Port2", "FC"]
     assert result.total_lead_time == 30  # 7 + 21 + 2
     assert result.total_cost == 150  # 100 + 50
-    assert result.feasible is True
\ No newline at end of file
+    assert result.feasible is True
+
+
+def test_beam_search_matches_exact():
+    """Test beam search finds the exact optimum when the beam is wide enough."""
+    nodes = [
+        Node(name="Supplier", node_group="Supplier", stage=1, cluster="Source"),
+        Node(name="Port1", node_group="Source Port", stage=2, cluster="CN"),
+        Node(name="WH1", node_group="WH", stage=3, cluster="US", cost_method="10"),
+        Node(name="WH2", node_group="WH", stage=3, cluster="US", cost_method="80"),
+        Node(name="FC", node_group="FC", stage=4, cluster="US")
+    ]
+    
+    edges = [
+        Edge(node1="Supplier", node2="Port1", lt_method="7"),
+        # Cheap first leg leads to the expensive warehouse
+        Edge(node1="Port1", node2="WH1", cost_method="100", lt_method="21"),
+        Edge(node1="Port1", node2="WH2", cost_method="20", lt_method="21"),
+        Edge(node1="WH1", node2="FC", cost_method="5", lt_method="2"),
+        Edge(node1="WH2", node2="FC", cost_method="5", lt_method="2")
+    ]
+    
+    network = NetworkBuilder()
+    network.build(nodes, edges)
+    evaluator = SimpleEvaluator({"evaluator_type": "simple"})
+    
+    product = Product(
+        razin="BEAM1",
+        asin="A1",
+        qty=100,
+        cm3=2.0,
+        mc_volume=0.1,
+        is_oversize=0,
+        parcels_per_mc=10
+    )
+    
+    exact = Allocator(network, evaluator).allocate_products([product])[0]
+    beam = BeamSearchAllocator(network, evaluator, beam_width=2).allocate_products([product])[0]
+    
+    assert beam.selected_path == exact.selected_path == ["Supplier", "Port1", "WH2", "FC"]
+    assert beam.total_cost == exact.total_cost == 105
+    
+    # The cheaper partial path through WH1 ends on a dear last leg: a beam of one prunes the optimum
+    trap_edges = [
+        Edge(node1="Supplier", node2="Port1", lt_method="7"),
+        Edge(node1="Port1", node2="WH1", cost_method="20", lt_method="21"),
+        Edge(node1="Port1", node2="WH2", cost_method="5", lt_method="21"),
+        Edge(node1="WH1", node2="FC", cost_method="200", lt_method="2"),
+        Edge(node1="WH2", node2="FC", cost_method="5", lt_method="2")
+    ]
+    trap = NetworkBuilder()
+    trap.build(nodes, trap_edges)
+    evaluator.evaluate.clear_cache()
+    
+    exact = Allocator(trap, evaluator).allocate_products([product])[0]
+    narrow = BeamSearchAllocator(trap, evaluator, beam_width=1).allocate_products([product])[0]
+    wide = BeamSearchAllocator(trap, evaluator, beam_width=2).allocate_products([product])[0]
+    
+    assert exact.selected_path == wide.selected_path == ["Supplier", "Port1", "WH2", "FC"]
+    assert exact.total_cost == wide.total_cost == 90
+    assert narrow.selected_path == ["Supplier", "Port1", "WH1", "FC"]
+    assert narrow.total_cost - exact.total_cost == 140
+    
+    with pytest.raises(ValueError):
+        BeamSearchAllocator(network, evaluator, beam_width=0)
+
+
+def test_incremental_reallocation():
+    """Test incremental mode switches only when a changed lane is better."""
+    network = create_test_network()
+    evaluator = SimpleEvaluator({"evaluator_type": "simple"})
+    
+    product = Product(
+        razin="INC1",
+        asin="A1",
+        qty=100,
+        cm3=2.0,
+        mc_volume=0.1,
+        is_oversize=0,
+        parcels_per_mc=10
+    )
+    previous = Allocator(network, evaluator).allocate_products([product])
+    
+    # Add a cheaper direct lane from Port1 to FC
+    nodes = list(network.nodes_data.values())
+    old_edges = list(network.edges_data)
+    new_edges = old_edges + [Edge(node1="Port1", node2="FC", cost_method="90", lt_method="30")]
+    
+    diff = diff_networks(nodes, old_edges, nodes, new_edges)
+    assert diff.added_edges == {("Port1", "FC")}
+    
+    updated = NetworkBuilder()
+    updated.build(nodes, new_edges)
+    allocator = IncrementalAllocator(updated, evaluator, diff, previous, nodes, old_edges)
+    results = allocator.allocate_products([product])
+    
+    assert results[0].selected_path == ["Supplier", "Port1", "FC"]
+    assert results[0].total_cost == 90
+    assert allocator.stats["switched"] == 1
+    
+    # With no network change, only the SKU whose product row changed is re-solved
+    changed = product.model_copy(update={"razin": "INC2", "cm3": 4.0})
+    previous = Allocator(updated, evaluator).allocate_products([product, changed.model_copy(update={"cm3": 2.0})])
+    allocator = IncrementalAllocator(updated, evaluator, diff_networks(nodes, new_edges, nodes, new_edges),
+                                     previous, nodes, new_edges)
+    results = allocator.allocate_products([product, changed])
+    
+    assert allocator.stats == {"carried": 1, "switched": 0, "resolved": 1, "new": 0}
+    assert [r.cm3_score for r in results] == [
+        r.cm3_score for r in Allocator(updated, evaluator).allocate_products([product, changed])]
+    assert results[1].cm3_score == 2 * previous[1].cm3_score
+
+
+def test_reuse_previous_results():
+    """Test chunk ids are content-addressed and unchanged SKUs are reused."""
+    network = create_test_network()
+    evaluator = SimpleEvaluator({"evaluator_type": "simple"})
+    
+    products = [
+        Product(razin=f"REUSE{i}", asin="A1", qty=100 * i, cm3=2.0,
+                mc_volume=0.1, is_oversize=0, parcels_per_mc=10)
+        for i in range(1, 4)
+    ]
+    previous = Allocator(network, evaluator).allocate_products(products)
+    again = Allocator(network, evaluator).allocate_products(products)
+    assert [r.chunk_id for r in previous] == [r.chunk_id for r in again]
+    
+    # Modify one SKU
+    products[1] = products[1].model_copy(update={"qty": 250})
+    allocator = ReuseAllocator(network, evaluator, previous)
+    results = allocator.allocate_products(products)
+    
+    assert allocator.stats == {"reused": 2, "allocated": 1}
+    assert results[1].chunk_id != previous[1].chunk_id
+    assert results[0].chunk_id == previous[0].chunk_id
+
+
+def test_allocation_metrics():
+    """Test phases and counters recorded during allocation."""
+    network = create_test_network()
+    evaluator = SimpleEvaluator({"evaluator_type": "simple"})
+    metrics = Metrics()
+    
+    products = [
+        Product(razin=f"MET{i}", asin="A1", qty=100, cm3=2.0,
+                mc_volume=0.1, is_oversize=0, parcels_per_mc=10)
+        for i in range(3)
+    ]
+    Allocator(network, evaluator, metrics=metrics).allocate_products(products)
+    
+    assert metrics.phases["evaluation"].calls == 3
+    assert metrics.counter("paths_enumerated") == 3
+    assert metrics.counter("chunks_allocated") == 3
+    assert metrics.counter("evaluator_calls", method="100") == 3
+    
+    text = metrics.to_prometheus()
+    assert 'allocation_phase_calls_total{phase="path_enumeration"} 3' in text
+    assert 'allocation_evaluator_calls_total{method="100"} 3' in text
+
+
+def test_profiling_samples_chunks(tmp_path):
+    """Test that the profiler samples every Nth chunk and saves its reports."""
+    network = create_test_network()
+    evaluator = SimpleEvaluator({"evaluator_type": "simple"})
+    metrics = Metrics()
+    metrics.profiler = Profiler(sample_every=2)
+    
+    products = [
+        Product(razin=f"PRO{i}", asin="A1", qty=100, cm3=2.0,
+                mc_volume=0.1, is_oversize=0, parcels_per_mc=10)
+        for i in range(5)
+    ]
+    results = Allocator(network, evaluator, metrics=metrics).allocate_products(products)
+    
+    assert len(results) == 5
+    assert metrics.phases["allocate"].calls == 1
+    assert metrics.profiler.phases["allocate"].samples == 3
+    
+    written = metrics.profiler.save(tmp_path / "results.json")
+    assert [path.name for path in written] == ["results.allocate.pstats", "results.profile.txt"]
+    assert "3 chunks sampled (1 in 2)" in (tmp_path / "results.profile.txt").read_text()
+
+
+def test_feasibility_index_prunes_per_class(tmp_path):
+    """Test oversize and hazmat classes are pruned before paths are enumerated."""
+    rules = tmp_path / "hazmat_rules.csv"
+    rules.write_text("product_category,hazmat_class,allowed_carriers,special_requirements\n"
+                     "Batteries,Class 9,DHL;UPS,UN3480 packaging\n")
+    
+    nodes = [
+        Node(name="Supplier", node_group="Supplier", stage=1, cluster="Source"),
+        Node(name="PortA", node_group="Port", stage=2, cluster="US_West"),
+        Node(name="PortB", node_group="Port", stage=2, cluster="US_South"),
+        Node(name="FC", node_group="FC", stage=3, cluster="US_West")
+    ]
+    edges = [
+        Edge(node1="Supplier", node2="PortA", cost_method="100", feasibility_method="cluster_feas", carriers="FedEx"),
+        Edge(node1="Supplier", node2="PortB", cost_method="50", feasibility_method="cluster_feas", carriers="DHL"),
+        Edge(node1="PortA", node2="FC", carriers="DHL"),
+        Edge(node1="PortB", node2="FC", carriers="UPS")
+    ]
+    network = NetworkBuilder()
+    network.build(nodes, edges)
+    
+    evaluator = SimpleEvaluator({"evaluator_type": "simple", "hazmat_rules": str(rules)})
+    evaluator.evaluate.clear_cache()
+    allocator = Allocator(network, evaluator)
+    
+    def product(razin, is_oversize=0, hazmat_class=None):
+        return Product(razin=razin, asin="A1", qty=100, cm3=2.0, mc_volume=0.1, is_oversize=is_oversize,
+                       parcels_per_mc=10, hazmat_class=hazmat_class)
+    
+    results = allocator.allocate_products([
+        product("PLAIN"),
+        product("BIG", is_oversize=1),
+        product("BATTERY", hazmat_class="Class 9"),
+        product("BIG_BATTERY", is_oversize=1, hazmat_class="Class 9")
+    ])
+    paths = {result.razin: result.selected_path for result in results}
+    
+    # Oversize cannot land in US_South; batteries need DHL or UPS on every lane
+    assert paths == {
+        "PLAIN": ["Supplier", "PortB", "FC"],
+        "BIG": ["Supplier", "PortA", "FC"],
+        "BATTERY": ["Supplier", "PortB", "FC"]
+    }
+    assert len(allocator.feasibility.classes) == 4
+    
+    big = allocator._create_chunks([product("BIG", is_oversize=1)])[0]
+    assert not allocator.feasibility.graph_for(allocator.feasibility.classify(big)).has_edge("Supplier", "PortB")
+    assert not allocator.feasibility.path_allows(["Supplier", "PortB", "FC"], big)
+
+
+def test_stockout_simulation():
+    """Test stockout probabilities follow lane reliability and are reproducible."""
+    network = create_test_network()
+    shipping_times = LookupTable.from_columns(
+        [["CN", "Source"], ["US", "CN"]],
+        {"transit_days": [20.0, 5.0], "reliability_score": [0.5, 1.0]}
+    )
+    simulator = StockoutSimulator(network.graph, shipping_times, samples=20000, seed=7, buffer_days=2.0,
+                                  delay_factor=0.5, threshold=0.3)
+    
+    reliable = ["Supplier", "Port1"]
+    unreliable = ["Supplier", "Port1", "Port2", "FC"]
+    probabilities = simulator.probabilities([unreliable, reliable, unreliable])
+    
+    # Late half the time, then past the buffer with probability exp(-2 / 10)
+    assert probabilities[1] == 0.0
+    assert probabilities[0] == probabilities[2]
+    assert probabilities[0] == pytest.approx(0.5 * 0.8187, abs=0.02)
+    assert (simulator.probabilities([unreliable]) == probabilities[:1]).all()
+    
+    evaluator = SimpleEvaluator({"evaluator_type": "simple"})
+    allocator = Allocator(network, evaluator)
+    assert allocator.stockout is None
+    allocator.stockout = simulator
+    result = allocator.allocate_products([
+        Product(razin="R1", asin="A1", qty=100, cm3=2.0, mc_volume=0.1, is_oversize=0, parcels_per_mc=10)
+    ])[0]
+    assert result.stockout_probability == probabilities[0]
+    assert result.stockout_risk
+    assert {"stockout_probability", "stockout_risk"} <= result.model_fields_set
+
+
+def test_scheduled_routing():
+    """Test lanes wait for their weekly departures and routing starts from the ready date."""
+    nodes = [
+        Node(name="Supplier", node_group="Supplier", stage=1, cluster="Source"),
+        Node(name="Weekly", node_group="Port", stage=2, cluster="CN"),
+        Node(name="Daily", node_group="Port", stage=2, cluster="CN"),
+        Node(name="FC", node_group="FC", stage=3, cluster="US")
+    ]
+    edges = [
+        Edge(node1="Supplier", node2="Weekly", lt_method="1"),
+        Edge(node1="Supplier", node2="Daily", lt_method="1"),
+        Edge(node1="Weekly", node2="FC", cost_method="100", lt_method="10", departures="Mon"),
+        Edge(node1="Daily", node2="FC", cost_method="300", lt_method="15")
+    ]
+    network = NetworkBuilder()
+    network.build(nodes, edges)
+    evaluator = SimpleEvaluator({"evaluator_type": "simple"})
+    evaluator.evaluate.clear_cache()
+    allocator = Allocator(network, evaluator)
+    
+    def allocate(ready_date):
+        product = Product(razin="R1", asin="A1", qty=100, cm3=2.0, mc_volume=0.1, is_oversize=0,
+                          parcels_per_mc=10, ready_date=ready_date)
+        return allocator.allocate_products([product])[0]
+    
+    # Ready Sunday: at the port Monday, sails at once
+    result = allocate(date(2026, 5, 3))
+    assert result.selected_path == ["Supplier", "Weekly", "FC"]
+    assert result.total_lead_time == 11
+    assert result.eta == datetime(2026, 5, 14)
+    
+    # Ready Monday: waits six days for the next sailing
+    assert allocate(date(2026, 5, 4)).total_lead_time == 17
+    
+    allocator.route_objective = "earliest"
+    result = allocate(date(2026, 5, 4))
+    assert result.selected_path == ["Supplier", "Daily", "FC"]
+    assert result.total_lead_time == 16
+    assert allocate(date(2026, 5, 3)).selected_path == ["Supplier", "Weekly", "FC"]
+    
+    allocator.route_objective = "cheapest"
+    result = allocate(date(2026, 5, 4))
+    assert result.selected_path == ["Supplier", "Weekly", "FC"]
+    assert result.total_lead_time == 17
+
+
+def test_container_consolidation(tmp_path):
+    """Test chunks on one ocean lane share containers and the lane is re-priced."""
+    volumes = np.sort(np.random.default_rng(3).uniform(0.5, 30, 500))[::-1]
+    containers, loads = pack_sorted(volumes, 67.7)
+    assert (loads <= 67.7).all()
+    assert np.allclose(np.bincount(containers, volumes), loads)
+    assert len(loads) <= np.ceil(volumes.sum() / 67.7) + 2
+    
+    rates = tmp_path / "ocean_rates.csv"
+    rates.write_text("origin_port,dest_port,container_type,base_rate,fuel_surcharge_pct,peak_season_surcharge\n"
+                     "Port1,Port2,20ft,2000,0,0\n"
+                     "Port1,Port2,40ft,3000,0,0\n")
+    network = create_test_network()
+    evaluator = SimpleEvaluator({"evaluator_type": "simple",
+                                 "consolidation": {"ocean_rates": str(rates), "container_types": ["20ft", "40ft"]}})
+    evaluator.evaluate.clear_cache()
+    allocator = Allocator(network, evaluator)
+    
+    # 70 m3 fills a 40ft and leaves 2.3 m3, which shares a 20ft with the 10 and 15 m3 chunks
+    products = [
+        Product(razin=f"R{i}", asin="A1", qty=cartons * 10, cm3=2.0, mc_volume=1.0, is_oversize=0, parcels_per_mc=10)
+        for i, cartons in enumerate([10, 15, 70])
+    ]
+    results = allocator.allocate_products(products)
+    report = allocator.consolidation_report
+    
+    assert report[["origin_port", "dest_port", "chunks", "containers"]].values.tolist() == [["Port1", "Port2", 3, 2]]
+    assert report["cost_before"][0] == 300
+    assert report["cost_after"][0] == pytest.approx(3000 + 2000)
+    for result in results:
+        assert result.consolidated_cost is not None
+        assert "consolidated_cost" in result.model_fields_set
+    assert sum(r.consolidated_cost for r in results) == pytest.approx(
+        sum(r.total_cost for r in results) - report["cost_before"][0] + report["cost_after"][0])
+    
+    # A row listed twice has one chunk id but ships twice
+    results = allocator.allocate_products(products + products[:1])
+    report = allocator.consolidation_report
+    assert len({r.chunk_id for r in results}) == 3
+    assert report[["chunks", "volume_m3"]].values.tolist() == [[4, 105.0]]
+    assert report["cost_before"][0] == 400
+    assert sum(r.consolidated_cost for r in results) == pytest.approx(
+        sum(r.total_cost for r in results) - report["cost_before"][0] + report["cost_after"][0])
+
+
+def test_split_allocation():
+    """Test products split across FCs by demand, each split routed to its own FC."""
+    assert split_quantities(np.array([10, 7, 5]), np.array([[1, 1, 1], [0, 0, 0], [2, 1, 0]])).tolist() == [
+        [4, 3, 3], [0, 0, 0], [3, 2, 0]]
+    
+    nodes = [
+        Node(name="Supplier", node_group="Supplier", stage=1, cluster="Source"),
+        Node(name="Port1", node_group="Source Port", stage=2, cluster="CN"),
+        Node(name="Port2", node_group="Destination Port", stage=3, cluster="US"),
+        Node(name="FC_A", node_group="FC", stage=4, cluster="US"),
+        Node(name="FC_B", node_group="FC", stage=4, cluster="US")
+    ]
+    edges = [
+        Edge(node1="Supplier", node2="Port1", lt_method="7"),
+        Edge(node1="Port1", node2="FC_A", cost_method="per_unit", lt_method="30"),
+        Edge(node1="Port1", node2="Port2", cost_method="10", lt_method="21"),
+        Edge(node1="Port2", node2="FC_A", cost_method="20", lt_method="2"),
+        Edge(node1="Port1", node2="FC_B", cost_method="100", lt_method="25")
+    ]
+    network = NetworkBuilder()
+    network.build(nodes, edges)
+    evaluator = SimpleEvaluator({"evaluator_type": "simple",
+                                 "evaluators": {"per_unit": {"formula": "qty * 0.5"}}})
+    evaluator.evaluate.clear_cache()
+    
+    demand = pd.DataFrame({"FC_A": [3.0, 1.0], "FC_B": [1.0, 0.0]}, index=["R1", "R2"])
+    allocator = SplitAllocator(network, evaluator, demand)
+    products = [
+        Product(razin=razin, asin="A1", qty=qty, cm3=2.0, mc_volume=0.1, is_oversize=0, parcels_per_mc=10)
+        for razin, qty in [("R1", 40), ("R2", 100), ("R3", 10)]
+    ]
+    results = allocator.allocate_products(products)
+    
+    # Small splits go direct (0.5 per unit), large ones through Port2 (30 flat)
+    assert [(r.razin, r.selected_path[1:], r.total_cost) for r in results] == [
+        ("R1", ["Port1", "FC_A"], 15.0),
+        ("R1", ["Port1", "FC_B"], 100.0),
+        ("R2", ["Port1", "Port2", "FC_A"], 30.0),
+        ("R3", ["Port1", "FC_A"], 5.0)
+    ]
+    report = allocator.split_report
+    assert report[["razin", "destination", "qty"]].values.tolist() == [
+        ["R1", "FC_A", 30], ["R1", "FC_B", 10], ["R2", "FC_A", 100], ["R3", "FC_A", 10]]
+    assert report["share"].tolist() == [0.75, 0.25, 1.0, 1.0]
+    assert report["chunk_id"].tolist() == [r.chunk_id for r in results]
+    
+    with pytest.raises(ValueError, match="unknown destinations"):
+        SplitAllocator(network, evaluator, pd.DataFrame({"FC_X": [1.0]}, index=["R1"]))
+
+
+def test_scenario_sweep():
+    """Test scenarios re-solve incrementally and match fresh allocations."""
+    network = create_test_network()
+    nodes = list(network.nodes_data.values())
+    edges = [
+        edge.model_copy(update={"cost_method": "ocean"}) if (edge.node1, edge.node2) == ("Port1", "Port2") else edge
+        for edge in network.edges_data
+    ] + [Edge(node1="Port1", node2="FC", cost_method="200", lt_method="30")]
+    config = {"evaluator_type": "simple", "evaluators": {"ocean": {"formula": "qty * rate", "rate": 1.0}}}
+    products = [
+        Product(razin=f"SC{i}", asin="A1", qty=100, cm3=2.0, mc_volume=0.1, is_oversize=0, parcels_per_mc=10)
+        for i in range(3)
+    ]
+    scenarios = [
+        Scenario("ocean x2", [{"scale": "evaluators.ocean", "factor": 2}]),
+        Scenario("direct closed", [{"close_lane": ["Port1", "FC"]}]),
+        Scenario("new FC", [
+            {"node": {"name": "FC2", "node_group": "FC", "stage": 4, "cluster": "US"}},
+            {"edge": {"node1": "Port2", "node2": "FC2", "cost_method": "10", "lt_method": "1"}}
+        ])
+    ]
+    SimpleEvaluator(config).evaluate.clear_cache()
+    
+    runner = ScenarioRunner(products, nodes, edges, config, workers=1)
+    summary, changes = runner.run(scenarios)
+    
+    assert summary["scenario"].tolist() == ["base", "ocean x2", "direct closed", "new FC"]
+    assert summary["total_cost"].tolist() == [450.0, 600.0, 450.0, 330.0]
+    assert summary["changed"].tolist() == [0, 3, 0, 3]
+    assert summary["carried"].tolist() == [0, 0, 3, 0]
+    assert summary["plans_reused"].tolist() == [False, True, False, False]
+    assert set(changes["path"]) == {"Supplier|Port1|FC", "Supplier|Port1|Port2|FC2"}
+    
+    # Each scenario matches a fresh allocation, and the sweep leaves the base intact
+    for scenario, total_cost in zip(scenarios, summary["total_cost"].tolist()[1:]):
+        scenario_nodes, scenario_edges, scenario_config = scenario.apply(nodes, edges, config)
+        builder = NetworkBuilder()
+        builder.build(scenario_nodes, scenario_edges)
+        evaluator = SimpleEvaluator(scenario_config)
+        evaluator.evaluate.clear_cache()
+        assert sum(r.total_cost for r in Allocator(builder, evaluator).allocate_products(products)) == total_cost
+    assert config["evaluators"]["ocean"]["rate"] == 1.0
+    assert runner.evaluator.config is config
+    
+    with pytest.raises(ValueError, match="Unknown lane"):
+        Scenario("bad", [{"close_lane": ["FC", "Port1"]}]).apply(nodes, edges, config)
+
+
+def test_scenario_sweep_table_evaluator():
+    """Test rate deltas reach a table evaluator's settings and match fresh allocations."""
+    network = create_test_network()
+    nodes = list(network.nodes_data.values())
+    edges = [
+        edge.model_copy(update={"cost_method": "cluster_costs"}) if edge.node1 != "Supplier" else edge
+        for edge in network.edges_data
+    ] + [Edge(node1="Port1", node2="FC", cost_method="200", lt_method="30")]
+    config = {"evaluator_type": "table",
+              "evaluators": {"cluster_costs": {"default_rate": 100, "base_rates": {"CN_to_US": 500}}}}
+    products = [
+        Product(razin=f"TB{i}", asin="A1", qty=100, cm3=2.0, mc_volume=0.1, is_oversize=0, parcels_per_mc=10)
+        for i in range(2)
+    ]
+    scenarios = [
+        Scenario("default rate", [{"set": "evaluators.cluster_costs.default_rate", "value": 2000}]),
+        Scenario("pair rates x5", [{"scale": "evaluators.cluster_costs.base_rates", "factor": 5}])
+    ]
+    TableEvaluator(config).evaluate.clear_cache()
+    
+    runner = ScenarioRunner(products, nodes, edges, config, workers=1)
+    summary, _ = runner.run(scenarios)
+    
+    # 50 to Port2 and 10 on to the FC, until either rate makes the 200 direct lane cheaper
+    assert summary["total_cost"].tolist() == [120.0, 400.0, 400.0]
+    assert summary["changed"].tolist() == [0, 2, 2]
+    for scenario, total_cost in zip(scenarios, summary["total_cost"].tolist()[1:]):
+        scenario_nodes, scenario_edges, scenario_config = scenario.apply(nodes, edges, config)
+        builder = NetworkBuilder()
+        builder.build(scenario_nodes, scenario_edges)
+        evaluator = TableEvaluator(scenario_config)
+        evaluator.evaluate.clear_cache()
+        assert sum(r.total_cost for r in Allocator(builder, evaluator).allocate_products(products)) == total_cost
+    assert runner.evaluator.default_rate == 100
+
+
+def test_sensitivity_analysis():
+    """Test runner-up paths and lane break-evens against hand-computed costs."""
+    nodes = [
+        Node(name="Supplier", node_group="Supplier", stage=1, cluster="Source"),
+        Node(name="Port1", node_group="Source Port", stage=2, cluster="CN"),
+        Node(name="Port2", node_group="Destination Port", stage=3, cluster="US"),
+        Node(name="FC_A", node_group="FC", stage=4, cluster="US"),
+        Node(name="FC_B", node_group="FC", stage=4, cluster="US")
+    ]
+    edges = [
+        Edge(node1="Supplier", node2="Port1", lt_method="7"),
+        Edge(node1="Port1", node2="FC_A", cost_method="per_unit", lt_method="30"),
+        Edge(node1="Port1", node2="Port2", cost_method="10", lt_method="21"),
+        Edge(node1="Port2", node2="FC_A", cost_method="20", lt_method="2"),
+        Edge(node1="Port1", node2="FC_B", cost_method="100", lt_method="25")
+    ]
+    network = NetworkBuilder()
+    network.build(nodes, edges)
+    evaluator = SimpleEvaluator({"evaluator_type": "simple",
+                                 "evaluators": {"per_unit": {"formula": "qty * 0.5"}}})
+    evaluator.evaluate.clear_cache()
+    
+    allocator = Allocator(network, evaluator)
+    products = [
+        Product(razin=razin, asin="A1", qty=qty, cm3=2.0, mc_volume=0.1, is_oversize=0, parcels_per_mc=10)
+        for razin, qty in [("S50", 50), ("S100", 100)]
+    ]
+    results = allocator.allocate_products(products)
+    skus, lanes = SensitivityAnalyzer(allocator).analyze(products, results)
+    
+    # 50 units: direct 25 beats 30 through Port2; 100 units: 30 through Port2 beats direct 50
+    assert skus[["razin", "path", "cost", "runner_up", "cost_gap"]].values.tolist() == [
+        ["S50", "Supplier|Port1|FC_A", 25.0, "Supplier|Port1|Port2|FC_A", 5.0],
+        ["S100", "Supplier|Port1|Port2|FC_A", 30.0, "Supplier|Port1|FC_A", 20.0]
+    ]
+    assert skus["chunk_id"].tolist() == [r.chunk_id for r in results]
+    assert skus["critical_lane"].tolist() == ["Port1|FC_A", "Port1|FC_A"]
+    assert skus["critical_change"].tolist() == pytest.approx([0.2, -0.4])
+    
+    # Free lanes have no break-even; a lane on the path must rise, one off it fall
+    breakeven = {(row.razin, row.from_node, row.to_node): (row.on_path, row.break_even)
+                 for row in lanes.itertuples()}
+    assert breakeven == {
+        ("S50", "Port1", "FC_A"): (True, pytest.approx(0.2)),
+        ("S50", "Port1", "Port2"): (False, pytest.approx(-0.5)),
+        ("S50", "Port2", "FC_A"): (False, pytest.approx(-0.25)),
+        ("S50", "Port1", "FC_B"): (False, pytest.approx(-0.75)),
+        ("S100", "Port1", "Port2"): (True, pytest.approx(2.0)),
+        ("S100", "Port2", "FC_A"): (True, pytest.approx(1.0)),
+        ("S100", "Port1", "FC_A"): (False, pytest.approx(-0.4)),
+        ("S100", "Port1", "FC_B"): (False, pytest.approx(-0.7))
+    }
+    assert lanes["razin"].tolist() == ["S50"] * 4 + ["S100"] * 4
+
+
+def test_import_does_not_load_pandas():
+    """Test importing the allocators leaves pandas to the code that builds frames."""
+    import subprocess
+    import sys
+    from pathlib import Path
+    
+    code = "import sys, src.allocation; print('pandas' in sys.modules)"
+    output = subprocess.run([sys.executable, "-c", code], cwd=Path(__file__).parent.parent,
+                            capture_output=True, text=True, check=True).stdout
+    assert output.strip() == "False"
+
+
+def test_scheduled_routing_respects_max_hops():
+    """Test routing keeps to the path finder's hop limit, even when a longer path reaches a node sooner."""
+    from src.graph import PathFinder
+    
+    nodes = [
+        Node(name="Supplier", node_group="Supplier", stage=1, cluster="Source"),
+        Node(name="Slow", node_group="Port", stage=2, cluster="CN"),
+        Node(name="Fast1", node_group="Port", stage=2, cluster="CN"),
+        Node(name="Fast2", node_group="Port", stage=2, cluster="CN"),
+        Node(name="Hub", node_group="Port", stage=3, cluster="US"),
+        Node(name="FC", node_group="FC", stage=4, cluster="US")
+    ]
+    edges = [
+        Edge(node1="Supplier", node2="Slow", lt_method="10"),
+        Edge(node1="Slow", node2="Hub", lt_method="10"),
+        Edge(node1="Supplier", node2="Fast1", lt_method="1"),
+        Edge(node1="Fast1", node2="Fast2", lt_method="1"),
+        Edge(node1="Fast2", node2="Hub", lt_method="1"),
+        Edge(node1="Hub", node2="FC", lt_method="1")
+    ]
+    network = NetworkBuilder()
+    network.build(nodes, edges)
+    evaluator = SimpleEvaluator({"evaluator_type": "simple"})
+    evaluator.evaluate.clear_cache()
+    allocator = Allocator(network, evaluator)
+    allocator.route_objective = "earliest"
+    product = Product(razin="R1", asin="A1", qty=100, cm3=2.0, mc_volume=0.1, is_oversize=0,
+                      parcels_per_mc=10, ready_date=date(2026, 5, 4))
+    
+    assert allocator.allocate_products([product])[0].selected_path == ["Supplier", "Fast1", "Fast2", "Hub", "FC"]
+    
+    allocator.path_finder = PathFinder(network.graph, max_hops=3)
+    result = allocator.allocate_products([product])[0]
+    assert result.selected_path == ["Supplier", "Slow", "Hub", "FC"]
+    assert result.total_lead_time == 21
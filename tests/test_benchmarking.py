@@ -0,0 +1,41 @@
+"""Test the benchmark harness."""
+
+from src.utils.benchmarking import BenchmarkResult, BenchmarkSuite, compare_results, load_baseline, save_baseline
+
+
+def test_suite_runs_with_warmup_and_repeats():
+    """Test warm-up and timed call counts, setup and memory peaks."""
+    calls = []
+    suite = BenchmarkSuite()
+    suite.add("append", lambda state: calls.append(state), setup=lambda: 1, number=3)
+    suite.add("allocate", lambda: bytearray(1 << 20), group="macro")
+    
+    (result,) = suite.run("append", repeat=4, warmup=2, memory=False)
+    assert len(calls) == 2 + 4 * 3
+    assert len(result.times) == 4
+    assert result.peak_bytes is None
+    
+    (result,) = suite.run("macro", repeat=1, warmup=0)
+    assert result.peak_bytes >= 1 << 20
+
+
+def test_compare_flags_regressions(tmp_path):
+    """Test baseline round trip and regression flags."""
+    baseline = [
+        BenchmarkResult("steady", "micro", [1.0, 1.1]),
+        BenchmarkResult("slower", "micro", [1.0]),
+        BenchmarkResult("faster", "micro", [1.0]),
+        BenchmarkResult("bigger", "micro", [1.0], peak_bytes=1000),
+    ]
+    save_baseline(baseline, tmp_path / "baseline.json")
+    
+    current = [
+        BenchmarkResult("steady", "micro", [1.05]),
+        BenchmarkResult("slower", "micro", [1.5]),
+        BenchmarkResult("faster", "micro", [0.5]),
+        BenchmarkResult("bigger", "micro", [1.0], peak_bytes=2000),
+        BenchmarkResult("added", "micro", [1.0]),
+    ]
+    comparisons = compare_results(current, load_baseline(tmp_path / "baseline.json"), threshold=0.10)
+    
+    assert [c.status for c in comparisons] == ["ok", "REGRESSION", "improved", "REGRESSION", "new"]
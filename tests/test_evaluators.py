@@ -0,0 +1,175 @@
+"""Test table-driven and formula evaluators."""
+
+import json
+
+import numpy as np
+import pytest
+
+from src.evaluators import LookupTable, TableEvaluator, create_evaluator
+from src.evaluators import table
+
+
+@pytest.mark.parametrize("dense_limit", [table.DENSE_LIMIT, 1])
+def test_lookup_table_scalar_and_batched(monkeypatch, dense_limit):
+    """Test scalar and batched lookups agree in the dense and sparse layouts."""
+    monkeypatch.setattr(table, "DENSE_LIMIT", dense_limit)
+    lookup = LookupTable.from_columns(
+        [["CN", "CN", "US", "CN"], ["US", "EU", "EU", "US"]],
+        {"rate": [1.0, 2.0, 3.0, 4.0]}
+    )
+    
+    # Later rows win on duplicate keys
+    assert len(lookup) == 3
+    assert lookup.get("rate", "CN", "US") == 4.0
+    assert lookup.get("rate", "US", "US") is None
+    assert lookup.get("rate", "XX", "US", default=0.0) == 0.0
+    
+    values = lookup.get_many("rate", ["CN", "US", "XX", "US"], ["EU", "EU", "US", "US"])
+    assert values[:2].tolist() == [2.0, 3.0]
+    assert np.isnan(values[2:]).all()
+
+
+def test_table_evaluator_from_rate_files(tmp_path):
+    """Test per-container ocean pricing, warehouse rates and batched costs."""
+    ocean = tmp_path / "ocean.csv"
+    ocean.write_text(
+        "origin_port,dest_port,container_type,base_rate,fuel_surcharge_pct,peak_season_surcharge\n"
+        "SH,LA,40ft,1000,10,300\n"
+        "SH,LA,20ft,600,10,200\n"
+    )
+    warehouses = tmp_path / "warehouses.csv"
+    warehouses.write_text(
+        "warehouse,storage_rate_per_unit_per_day,handling_fee_per_unit,min_storage_days\n"
+        "CA_WH,0.10,0.50,10\n"
+    )
+    evaluator = create_evaluator({
+        "evaluator_type": "table",
+        "tables": {"ocean_rates": str(ocean), "warehouse_rates": str(warehouses)},
+        "evaluators": {
+            "cluster_costs": {"base_rates": {"CN_to_US_West": 200.0}},
+            "wh_cost": {"average_storage_days": 7}
+        }
+    })
+    assert isinstance(evaluator, TableEvaluator)
+    
+    # 1000 units in 100 cartons of 1 m3 fill two 40ft containers at 1100 each
+    costs = evaluator.cluster_costs(
+        ["SH", "Supplier"], ["LA", "SH"], ["CN", "CN"], ["US_West", "US_West"],
+        qty=[1000, 1000], mc_volume=[1.0, 1.0], parcels_per_mc=[10, 10]
+    )
+    assert costs.tolist() == pytest.approx([2200.0, 200.0])
+    
+    # The warehouse minimum of 10 days overrides the configured 7
+    costs = evaluator.warehouse_costs(["CA_WH", "NV_WH"], [100, 100])
+    assert costs.tolist() == pytest.approx([150.0, 70.0])
+
+
+def test_memo_key_covers_fields_the_method_reads(tmp_path):
+    """Test chunks of one SKU differing only in carton volume get their own ocean costs."""
+    from src.models import Product, Chunk, EvaluationContext
+    
+    ocean = tmp_path / "ocean.csv"
+    ocean.write_text(
+        "origin_port,dest_port,container_type,base_rate,fuel_surcharge_pct,peak_season_surcharge\n"
+        "SH,LA,40ft,1000,10,300\n"
+    )
+    evaluator = create_evaluator({"evaluator_type": "table", "tables": {"ocean_rates": str(ocean)}})
+    evaluator.evaluate.clear_cache()
+    
+    def cost(mc_volume):
+        product = Product(razin="R1", asin="A1", qty=5000, cm3=1.0, mc_volume=mc_volume,
+                          is_oversize=0, parcels_per_mc=10)
+        context = EvaluationContext(chunk=Chunk(chunk_id="c1", product=product), from_node="SH",
+                                    to_node="LA", method="cluster_costs", kind="cost")
+        return evaluator.evaluate(context)
+    
+    assert evaluator.key_fields("cluster_costs") == ("mc_volume", "parcels_per_mc", "qty")
+    small, large = cost(0.05), cost(5.0)
+    assert small != large
+    assert cost(0.05) == small
+    evaluator.evaluate.clear_cache()
+
+
+def test_formulas_compile_to_scalar_and_batch(tmp_path):
+    """Test configured formulas agree in scalar and batch form and recompile on reload."""
+    from src.evaluators import reload_evaluator_config
+    from src.models import Product, Chunk, EvaluationContext
+    
+    config = {
+        "evaluator_type": "simple",
+        "evaluators": {
+            "lane_cost": {
+                "formula": "rates(from_cluster, to_cluster, default=50) * ceil(qty / parcels_per_mc) * mc_volume",
+                "rates": {"CN_to_US_West": 10}
+            },
+            "oversize_ok": {"formula": "not is_oversize or to_cluster in ('US_West',)"}
+        }
+    }
+    evaluator = create_evaluator(config)
+    evaluator.evaluate.clear_cache()
+    
+    product = Product(razin="R1", asin="A1", qty=25, cm3=10.0, mc_volume=2.0, is_oversize=1, parcels_per_mc=10)
+    context = EvaluationContext(
+        chunk=Chunk(chunk_id="c1", product=product), from_node="SH", to_node="LA", method="lane_cost",
+        kind="cost", supplemental_data={"from_cluster": "CN", "to_cluster": "US_West"}
+    )
+    assert evaluator.evaluate(context) == 60.0
+    
+    # Same SKU and lane with bigger cartons: the memo key follows the fields the formula reads
+    assert evaluator.key_fields("lane_cost") == ("mc_volume", "parcels_per_mc", "qty")
+    bigger = product.model_copy(update={"mc_volume": 4.0})
+    bigger = context.model_copy(update={"chunk": Chunk(chunk_id="c2", product=bigger)})
+    assert evaluator.evaluate(bigger) == 120.0
+    
+    columns = {"from_cluster": ["CN", "CN"], "to_cluster": ["US_West", "US_East"],
+               "qty": [25, 25], "parcels_per_mc": [10, 10], "mc_volume": [2.0, 2.0], "is_oversize": [1, 1]}
+    assert evaluator.evaluate_batch("lane_cost", columns).tolist() == [60.0, 300.0]
+    assert evaluator.evaluate_batch("oversize_ok", columns).tolist() == [True, False]
+    
+    with pytest.raises(ValueError, match="lane_cost"):
+        create_evaluator({"evaluators": {"lane_cost": {"formula": "__import__('os')"}}})
+    
+    updated = json.loads(json.dumps(config))
+    updated["evaluators"]["lane_cost"]["rates"]["CN_to_US_West"] = 20
+    path = tmp_path / "evaluators.json"
+    path.write_text(json.dumps(updated))
+    assert reload_evaluator_config(evaluator, path) == {"lane_cost"}
+    assert evaluator.evaluate(context) == 120.0
+
+
+def test_shipped_formulas_match_builtin_methods():
+    """Test the formulas in config/evaluators.json reproduce the built-in methods."""
+    from pathlib import Path
+    from src.evaluators import SimpleEvaluator, load_evaluator_config
+    from src.models import Product, Chunk, EvaluationContext
+    
+    config = load_evaluator_config(Path(__file__).parent.parent / "config" / "evaluators.json")
+    evaluator = SimpleEvaluator(config)
+    builtins = {
+        "cluster_costs": evaluator._evaluate_cluster_cost,
+        "cluster_LTs": evaluator._evaluate_cluster_lt,
+        "cluster_feas": evaluator._evaluate_cluster_feasibility,
+        "wh_cost": evaluator._evaluate_warehouse_cost
+    }
+    assert set(builtins) <= set(evaluator.formulas)
+    
+    # Every pair either table lists, and one neither does
+    pairs = {("CN", "US_West"), ("CN", "US_East"), ("US_West", "US_East"), ("3PL_East", "US_East"),
+             ("US_East", "US_West"), ("Source", "CN")}
+    for method in ["cluster_costs", "cluster_LTs"]:
+        table_name = "base_rates" if method == "cluster_costs" else "transit_times"
+        pairs |= {tuple(name.split("_to_", 1)) for name in config["evaluators"][method][table_name]}
+    
+    for is_oversize in [0, 1]:
+        product = Product(razin="R1", asin="A1", qty=250, cm3=10.0, mc_volume=2.0, is_oversize=is_oversize,
+                          parcels_per_mc=10)
+        for from_cluster, to_cluster in sorted(pairs):
+            for method, builtin in builtins.items():
+                context = EvaluationContext(
+                    chunk=Chunk(chunk_id="c1", product=product), from_node="A", to_node="B", current_node="B",
+                    method=method, supplemental_data={"from_cluster": from_cluster, "to_cluster": to_cluster}
+                )
+                expected = builtin(context)
+                value = evaluator.formulas[method](context)
+                assert value == expected, (method, from_cluster, to_cluster)
+                assert type(value) is type(expected), (method, from_cluster, to_cluster)
@@ -0,0 +1,48 @@
+"""Test the test data generator."""
+
+import sys
+from pathlib import Path
+
+import numpy as np
+
+sys.path.append(str(Path(__file__).parent.parent / "scripts"))
+
+import generate_test_data  # noqa: E402
+
+
+def test_same_seed_same_files(tmp_path):
+    """Test a seed reproduces every file byte for byte, and another seed does not."""
+    first = generate_test_data.generate_dataset(tmp_path / "a", "gen", n_products=2000, seed=7, suppliers=2)
+    second = generate_test_data.generate_dataset(tmp_path / "b", "gen", n_products=2000, seed=7, suppliers=2)
+    other = generate_test_data.generate_dataset(tmp_path / "c", "gen", n_products=2000, seed=8, suppliers=2)
+    
+    assert set(first) == set(second) >= {"nodes", "node-node", "products"}
+    for table, path in first.items():
+        assert path.read_bytes() == second[table].read_bytes(), table
+    assert first["products"].read_bytes() != other["products"].read_bytes()
+
+
+def test_product_rows_do_not_depend_on_count(tmp_path, monkeypatch):
+    """Test rows in whole blocks are the same however many products are generated."""
+    monkeypatch.setattr(generate_test_data, "PRODUCT_BLOCK", 256)
+    generate_test_data.generate_products(700, tmp_path / "short.csv", seed=3)
+    generate_test_data.generate_products(900, tmp_path / "long.csv", seed=3)
+    
+    short = (tmp_path / "short.csv").read_text().splitlines()
+    long = (tmp_path / "long.csv").read_text().splitlines()
+    assert len(short) == 701 and len(long) == 901
+    assert short[:1 + 2 * 256] == long[:1 + 2 * 256]
+
+
+def test_csv_format_does_not_depend_on_writer(tmp_path):
+    """Test the block writer matches pandas' CSV output, whole floats included."""
+    df = generate_test_data._product_block(0, 500, 3, np.random.default_rng(0))
+    df.loc[0, "CM3"] = 1.0
+    
+    generate_test_data._write_csv(df, tmp_path / "block.csv")
+    generate_test_data._write_csv(df, tmp_path / "block.csv", append=True)
+    df.to_csv(tmp_path / "pandas.csv", index=False)
+    df.to_csv(tmp_path / "pandas.csv", mode="a", header=False, index=False)
+    
+    assert (tmp_path / "block.csv").read_bytes() == (tmp_path / "pandas.csv").read_bytes()
+    assert ",1.0," in (tmp_path / "block.csv").read_text()
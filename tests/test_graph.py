@@ -0,0 +1,98 @@
+"""Test graph building, path finding and compiled snapshots."""
+
+import pytest
+
+from src.models import Node, Edge
+from src.graph import NetworkBuilder, PathFinder, NetworkSnapshot, compile_snapshot
+
+
+def create_diamond_network():
+    """Supplier -> two ports -> FC."""
+    nodes = [
+        Node(name="Supplier", node_group="Supplier", stage=1, cluster="Source"),
+        Node(name="Port1", node_group="Source Port", stage=2, cluster="CN"),
+        Node(name="Port2", node_group="Source Port", stage=2, cluster="CN", cost_method="wh_cost"),
+        Node(name="FC", node_group="FC", stage=3, cluster="US")
+    ]
+    
+    edges = [
+        Edge(node1="Supplier", node2="Port1", lt_method="7"),
+        Edge(node1="Supplier", node2="Port2", lt_method="5"),
+        Edge(node1="Port1", node2="FC", cost_method="cluster_costs", lt_method="cluster_LTs"),
+        Edge(node1="Port2", node2="FC", cost_method="100", feasibility_method="cluster_feas")
+    ]
+    
+    builder = NetworkBuilder()
+    builder.build(nodes, edges)
+    return builder
+
+
+def test_find_all_paths():
+    """Test simple path enumeration and hop cutoff."""
+    builder = create_diamond_network()
+    
+    paths = PathFinder(builder.graph).find_all_paths("Supplier", {"FC"})
+    assert sorted(paths) == [["Supplier", "Port1", "FC"], ["Supplier", "Port2", "FC"]]
+    
+    assert PathFinder(builder.graph, max_hops=1).find_all_paths("Supplier", {"FC"}) == []
+
+
+def test_path_tree_shared_by_origins():
+    """Test one path tree serves several origins, in all_simple_paths order."""
+    from src.graph.digraph import all_simple_paths
+    
+    builder = create_diamond_network()
+    graph = builder.graph
+    graph.add_node("Supplier2", node_group="Supplier", stage=1, cluster="Source")
+    graph.add_edge("Supplier2", "Port2")
+    graph.add_edge("Port2", "Port1")
+    graph.add_edge("Port1", "Supplier")
+    
+    finder = PathFinder(graph, max_hops=4)
+    for origin in ("Supplier", "Supplier2", "Port1"):
+        expected = list(all_simple_paths(graph, origin, "FC", cutoff=4))
+        assert finder.find_all_paths(origin, {"FC"}) == expected
+    assert ["Supplier2", "Port2", "Port1", "FC"] in finder.find_all_paths("Supplier2", {"FC"})
+    assert finder.find_all_paths("Nowhere", {"FC"}) == []
+    assert finder.find_all_paths("FC", {"FC"}) == []
+    
+    footprint = finder.footprint()
+    assert footprint["trees"] == 1
+    assert footprint["origins"] == 5
+    assert footprint["paths"] == 7
+    assert footprint["bytes"] > 0
+
+
+def test_snapshot_round_trip(tmp_path):
+    """Test a compiled snapshot rebuilds the same network and path plans."""
+    builder = create_diamond_network()
+    output = tmp_path / "network.snap"
+    
+    summary = compile_snapshot(builder, {"evaluator_type": "simple"}, output)
+    assert summary["paths"] == 2
+    
+    with NetworkSnapshot(output) as snapshot:
+        rebuilt = snapshot.to_builder()
+        
+        assert rebuilt.nodes_data == builder.nodes_data
+        assert rebuilt.edges_data == builder.edges_data
+        assert snapshot.config == {"evaluator_type": "simple"}
+        assert set(snapshot.header["arrays"]) == {
+            "node_stage", "node_cluster", "node_group", "node_cost", "node_feas", "node_lt",
+            "edge_indptr", "edge_dst", "edge_cost", "edge_feas", "edge_lt", "edge_carriers",
+            "edge_departures", "path_indptr", "path_nodes"
+        }
+        
+        finder = snapshot.path_finder(rebuilt)
+        assert sorted(finder.find_all_paths("Supplier", {"FC"})) == sorted(
+            PathFinder(builder.graph).find_all_paths("Supplier", {"FC"})
+        )
+
+
+def test_snapshot_rejects_other_files(tmp_path):
+    """Test loading a non-snapshot file fails clearly."""
+    path = tmp_path / "not-a-snapshot"
+    path.write_bytes(b"hello world, definitely not a snapshot")
+    
+    with pytest.raises(ValueError):
+        NetworkSnapshot(path)
@@ -0,0 +1,64 @@
+"""Test evaluator cache."""
+
+import pytest
+from types import SimpleNamespace
+
+from src.utils.memoization import EvaluatorCache, MethodStatsTable
+
+
+def test_indexed_invalidation():
+    """Test method, node and edge invalidation is exact."""
+    cache = EvaluatorCache()
+    cache.set("wh_cost:CN:100:0:R1", 1.0, method="wh_cost", node="CN")
+    cache.set("wh_cost:CN_2:100:0:R1", 2.0, method="wh_cost", node="CN_2")
+    cache.set("cluster_costs:CN:US:100:0:R1", 3.0, method="cluster_costs", edge=("CN", "US"))
+    cache.set("cluster_LTs:CN_2:US:100:0:R1", 4.0, method="cluster_LTs", edge=("CN_2", "US"))
+    
+    # "CN" must not match "CN_2"; edge entries count for their endpoints
+    assert cache.invalidate(node="CN") == 2
+    assert cache.get("wh_cost:CN_2:100:0:R1") == 2.0
+    assert cache.get("cluster_LTs:CN_2:US:100:0:R1") == 4.0
+    
+    assert cache.invalidate(edge=("CN_2", "US")) == 1
+    assert cache.invalidate(method="wh_cost") == 1
+    assert cache.stats.size == 0
+    assert cache.invalidate(method="wh_cost") == 0
+
+
+def test_method_stats_per_kind():
+    """Test calls, hits and latency are kept per method, target and kind."""
+    table = MethodStatsTable()
+    node_cost = SimpleNamespace(method="wh_cost", kind="cost", to_node=None)
+    edge_lt = SimpleNamespace(method="cluster_LTs", kind="lt", to_node="US")
+    
+    table.record(node_cost, 800, hit=False)
+    table.record(node_cost, 300, hit=True)
+    table.record(edge_lt, 50_000, hit=False)
+    table.record(edge_lt, 10 ** 10, hit=None)
+    
+    stats = table.stats
+    assert stats[("wh_cost", "node", "cost")].calls == 2
+    assert stats[("wh_cost", "node", "cost")].hits == 1
+    assert stats[("cluster_LTs", "edge", "lt")].misses == 1
+    assert stats[("cluster_LTs", "edge", "lt")].buckets[-1] == 1
+    
+    # Ranked by total time, slowest first
+    assert table.ranked()[0][0] == ("cluster_LTs", "edge", "lt")
+    assert 'le="+Inf"} 2' in table.to_prometheus()
+
+
+def test_uncached_evaluators_are_instrumented():
+    """Test BaseEvaluator adds call accounting to evaluators without memoize."""
+    from src.evaluators import BaseEvaluator
+    
+    class ConstantEvaluator(BaseEvaluator):
+        def evaluate(self, context):
+            return 1.0
+    
+    evaluator = ConstantEvaluator()
+    evaluator.method_stats().clear()
+    evaluator.evaluate(SimpleNamespace(method="const", kind="cost", to_node=None))
+    
+    stats = evaluator.method_stats().stats[("const", "node", "cost")]
+    assert stats.calls == 1
+    assert stats.hits == stats.misses == 0
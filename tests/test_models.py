@@ -56,6 +56,10 @@ def test_chunk_creation():
     assert chunk.qty == 100
     assert chunk.cm3 == 1.5
     assert chunk.origin == "Supplier"  # Default
+    
+    # Blank origin cells fall back to the default supplier
+    assert Product(**product.model_dump(exclude={"origin"}), origin=float("nan")).origin is None
+    assert Product(**product.model_dump(exclude={"origin"}), origin=" SUP1 ").origin == "SUP1"
 
 
 def test_node_validation():
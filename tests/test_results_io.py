@@ -0,0 +1,109 @@
+"""Test results writers and readers."""
+
+import random
+import pytest
+from datetime import datetime
+
+from src.models import AllocationResult
+from src.utils import load_results, write_results, QuantileSketch, ResultsSummary, ResultsStore
+
+
+def make_results():
+    """Two results, one with a zero-cost path."""
+    return [
+        AllocationResult(
+            chunk_id="c1",
+            razin="R1",
+            selected_path=["Supplier", "Los Angeles", "FC"],
+            total_cost=150.0,
+            total_lead_time=12,
+            cm3_score=0.01,
+            eta=datetime(2026, 5, 1, 12, 30),
+            feasible=True
+        ),
+        AllocationResult(
+            chunk_id="c2",
+            razin="R2",
+            selected_path=["Supplier", "FC"],
+            total_cost=0.0,
+            total_lead_time=3,
+            cm3_score=float("inf"),
+            eta=datetime(2026, 5, 2),
+            feasible=True,
+            stockout_risk=True,
+            stockout_probability=0.25
+        )
+    ]
+
+
+@pytest.mark.parametrize("suffix", ["json", "jsonl", "csv", "db"])
+def test_round_trip(tmp_path, suffix):
+    """Test each format reads back the records it wrote."""
+    results = make_results()
+    path = tmp_path / f"results.{suffix}"
+    
+    assert write_results(results, path) == 2
+    assert load_results(path) == results
+
+
+@pytest.mark.parametrize("fmt", ["parquet", "arrow"])
+def test_columnar_round_trip(tmp_path, fmt):
+    """Test the optional columnar formats."""
+    pytest.importorskip("pyarrow")
+    results = make_results()
+    path = tmp_path / "results.out"
+    
+    write_results(results, path, fmt)
+    assert load_results(path, fmt) == results
+
+
+def test_quantile_sketch_accuracy():
+    """Test sketch quantiles stay within the relative error bound."""
+    rng = random.Random(7)
+    values = [rng.lognormvariate(-6, 1.5) for _ in range(20000)]
+    sketch = QuantileSketch(alpha=0.01)
+    for value in values:
+        sketch.add(value)
+    
+    ordered = sorted(values)
+    for q in (0.1, 0.5, 0.75, 0.99):
+        exact = ordered[int(q * (len(ordered) - 1))]
+        assert abs(sketch.quantile(q) - exact) <= 0.011 * exact
+
+
+def test_summary_merge_matches_single_pass(tmp_path):
+    """Test merged per-file summaries equal one summary over all rows."""
+    results = make_results()
+    write_results(results[:1], tmp_path / "a.jsonl")
+    write_results(results[1:], tmp_path / "b.csv")
+    
+    merged = ResultsSummary.from_file(tmp_path / "a.jsonl").merge(ResultsSummary.from_file(tmp_path / "b.csv"))
+    single = ResultsSummary().update(result.model_dump() for result in results)
+    
+    assert merged.count == single.count == 2
+    assert merged.total_cost == single.total_cost
+    assert merged.paths == single.paths
+    assert merged.lead_times == single.lead_times
+    assert merged.high_cm3() == single.high_cm3()
+
+
+def test_results_store_queries(tmp_path):
+    """Test store filters by SKU, lane and lead-time band across runs."""
+    results = make_results()
+    write_results(results, tmp_path / "run1.jsonl")
+    
+    with ResultsStore(tmp_path / "results.db") as store:
+        store.import_file(tmp_path / "run1.jsonl")
+        with store.writer("second") as writer:
+            writer.write_all(results[:1])
+        
+        assert [run["results"] for run in store.runs()] == [2, 1]
+        assert len(list(store.query(razin="R1"))) == 2
+        assert len(list(store.query(run_id=store.latest_run()))) == 1
+        
+        lane = list(store.query(lane=("Los Angeles", "FC")))
+        assert [row["selected_path"] for row in lane] == [results[0].selected_path] * 2
+        assert list(store.query(lane=("FC", "Los Angeles"))) == []
+        
+        short = list(store.query(max_lead_time=5))
+        assert [row["razin"] for row in short] == ["R2"]
@@ -0,0 +1,68 @@
+"""Test the long-lived allocation service."""
+
+import asyncio
+import json
+from pathlib import Path
+
+from src.evaluators import config_loader
+from src.service import AllocationService, server
+
+
+DATA = Path(__file__).parent.parent / "data"
+
+
+def test_service_allocate_and_reload():
+    """Test allocation, status and hot reload against a warm service."""
+    service = AllocationService(
+        DATA / "examples" / "nodes.csv",
+        DATA / "examples" / "node-node.csv",
+        Path("missing-config.json")
+    )
+    product = {
+        "razin": "SVC1", "asin": "A1", "qty": 100, "cm3": 1.2,
+        "mc_volume": 0.1, "is_oversize": 0, "parcels_per_mc": 10
+    }
+    
+    response = asyncio.run(service.handle("allocate", {"products": [product]}))
+    assert response["allocated"] == 1
+    assert response["results"][0]["selected_path"][-1] in {"FC_West", "FC_East"}
+    
+    reloaded = asyncio.run(service.handle("reload", {}))
+    assert reloaded["changed_methods"] == []
+    
+    status = asyncio.run(service.handle("status", {}))
+    assert status["counters"]["allocated"] == 1
+    assert status["counters"]["reloads"] == 1
+    service.executor.shutdown()
+
+
+def test_service_reload_paths(tmp_path, monkeypatch):
+    """Test reloads keep to the startup files unless enabled, and parse the config once."""
+    nodes, edges = DATA / "examples" / "nodes.csv", DATA / "examples" / "node-node.csv"
+    config = tmp_path / "evaluators.json"
+    config.write_text(json.dumps({"evaluator_type": "simple", "evaluators": {"wh_cost": {"formula": "qty * 0.5"}}}))
+    
+    service = AllocationService(nodes, edges, config)
+    status, response = asyncio.run(server._dispatch(service, "reload", {"config": "/etc/passwd"}))
+    assert status == 400 and "fixed" in response["error"]
+    assert service.counters["reloads"] == 0
+    service.executor.shutdown()
+    
+    parses = []
+    
+    def counting_load(path):
+        parses.append(path)
+        return json.loads(Path(path).read_text())
+    
+    monkeypatch.setattr(server, "load_evaluator_config", counting_load)
+    monkeypatch.setattr(config_loader, "load_evaluator_config", counting_load)
+    service = AllocationService(nodes, edges, config, reload_paths=True)
+    updated = tmp_path / "updated.json"
+    updated.write_text(json.dumps({"evaluator_type": "simple", "evaluators": {"wh_cost": {"formula": "qty * 2"}}}))
+    
+    parses.clear()
+    reloaded = asyncio.run(service.handle("reload", {"config": str(updated)}))
+    assert reloaded["changed_methods"] == ["wh_cost"]
+    assert parses == [updated]
+    assert service.status()["network"]["config"] == str(updated)
+    service.executor.shutdown()